@@ -1,60 +1,362 @@
 import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
+import logging
 import pymysql
+import pymysql.cursors
+from pymysql.constants import SERVER_STATUS
 from fastapi import HTTPException
+from utils.metrics import record_query, pool_wait_seconds, fingerprint
 
 
 load_env = load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class TimedCursor(pymysql.cursors.Cursor):
+    """Cursor that records timing, row counts and a statement fingerprint for every execute."""
+
+    # executemany() funnels through execute(), so batched statements are timed too
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            rows = super().execute(query, args)
+        except Exception:
+            record_query(query, time.perf_counter() - started, 0, failed=True)
+            raise
+        record_query(query, time.perf_counter() - started, rows)
+        return rows
+
 
 def get_connection():
+    """Open a brand-new connection. Prefer `pool.connection()` for request work."""
     return pymysql.connect(
         host=os.getenv('db_host'),
         user=os.getenv('db_user'),
         password=os.getenv('db_password'),
-        db=os.getenv('db_name')
+        db=os.getenv('db_name'),
+        autocommit=True,
+        cursorclass=TimedCursor
     )
 
 
+class PoolTimeout(Exception):
+    pass
+
+
+class _PooledConnection:
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+# ------------------- Connection Pool -------------------
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of pymysql connections.
+
+    Idle connections are pinged on checkout once they have sat unused for
+    `ping_after` seconds, and are recycled once they exceed `max_idle` seconds
+    of idleness or `max_age` seconds of total lifetime.
+    """
+
+    def __init__(self, connect=get_connection, min_size=1, max_size=20,
+                 max_idle=300.0, max_age=3600.0, ping_after=5.0, timeout=10.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Invalid pool size bounds")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.ping_after = ping_after
+        self.timeout = timeout
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._counters = {
+            'created': 0,
+            'recycled': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'failed_pings': 0,
+        }
+
+    # -------- internals (callers hold self._cond unless noted) --------
+    def _expired(self, entry, now):
+        return (now - entry.created_at > self.max_age) or (now - entry.last_used > self.max_idle)
+
+    def _close_quietly(self, conn):
+        # called without the lock held
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _open(self):
+        # called without the lock held, after a slot has been reserved
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._counters['created'] += 1
+        return _PooledConnection(conn)
+
+    def _healthy(self, entry):
+        if time.monotonic() - entry.last_used < self.ping_after:
+            return True
+        try:
+            entry.conn.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self._counters['failed_pings'] += 1
+            return False
+
+    # -------- public API --------
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            stale = None
+            entry = None
+            reserve = False
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout}s waiting for a database connection"
+                        )
+                    self._counters['waits'] += 1
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    entry = self._idle.pop()
+                    if self._expired(entry, time.monotonic()):
+                        stale = entry
+                        entry = None
+                        self._size -= 1
+                        self._counters['recycled'] += 1
+                else:
+                    self._size += 1
+                    reserve = True
+
+            if stale is not None:
+                self._close_quietly(stale.conn)
+                continue
+
+            if reserve:
+                entry = self._open()
+            elif not self._healthy(entry):
+                self._close_quietly(entry.conn)
+                with self._cond:
+                    self._size -= 1
+                    self._counters['discarded'] += 1
+                continue
+
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                self._counters['checkouts'] += 1
+            return entry.conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            # not ours (or already released); just make sure it is closed
+            self._close_quietly(conn)
+            return
+
+        if not discard and conn.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            # never hand out a connection with a half-finished transaction
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        now = time.monotonic()
+        if discard or not conn.open or now - entry.created_at > self.max_age:
+            self._close_quietly(conn)
+            with self._cond:
+                self._size -= 1
+                self._counters['discarded' if discard else 'recycled'] += 1
+                self._cond.notify()
+            return
+
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        started = time.perf_counter()
+        conn = self.acquire(timeout)
+        pool_wait_seconds.observe(time.perf_counter() - started)
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def warm(self):
+        """Open connections until `min_size` are available."""
+        opened = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size:
+                        break
+                    self._size += 1
+                opened.append(self._open())
+        finally:
+            with self._cond:
+                now = time.monotonic()
+                for entry in opened:
+                    entry.last_used = now
+                    self._idle.append(entry)
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+        for entry in idle:
+            self._close_quietly(entry.conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self._counters,
+            }
+
+
+pool = ConnectionPool(
+    min_size=int(os.getenv('db_pool_min_size', 1)),
+    max_size=int(os.getenv('db_pool_max_size', 20)),
+    max_idle=float(os.getenv('db_pool_max_idle', 300)),
+    max_age=float(os.getenv('db_pool_max_age', 3600)),
+    ping_after=float(os.getenv('db_pool_ping_after', 5)),
+    timeout=float(os.getenv('db_pool_timeout', 10)),
+)
+
+
+def pool_stats():
+    return pool.stats()
+
+
 def execute_query(query, params=None, fetch=False):
     try:
-        conn = get_connection()
-        with conn.cursor() as cursor:
-            cursor.execute(query, params or ())
-            if fetch:
-                result = cursor.fetchall()
-            else:
-                conn.commit()
-                result = None
-        conn.close()
+        with pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params or ())
+                # pooled connections run in autocommit mode, so writes are
+                # already committed once execute() returns; callers get the
+                # affected row count back for conditional updates
+                result = cursor.fetchall() if fetch else cursor.rowcount
         return result
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.exception("Query failed: %s", fingerprint(query))
+        raise HTTPException(status_code=500, detail=str(e))
+
+@contextmanager
+def transaction():
+    """
+    Runs a block of statements atomically on a single pooled connection.
+
+        with transaction() as cursor:
+            cursor.execute(...)
+            new_id = cursor.lastrowid
+
+    Commits when the block exits normally and rolls back if it raises.
+    HTTPExceptions raised inside the block are passed through unchanged.
+    """
+    try:
+        with pool.connection() as conn:
+            conn.begin()
+            try:
+                with conn.cursor() as cursor:
+                    yield cursor
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    except HTTPException:
+        raise
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
+        logger.exception("Transaction failed")
         raise HTTPException(status_code=500, detail=str(e))
 
-def show_schema_with_foreign_keys(database: str):
+# ------------------- Schema Introspection -------------------
+_schema_snapshots = {}
+
+def get_schema_snapshot(database: str, refresh: bool = False):
+    """
+    Returns column and foreign key rows for every table in `database`.
+    The INFORMATION_SCHEMA scan is only run once per process unless `refresh` is set.
     """
-    Retrieves each table’s column details and shows foreign key info if applicable.
+    if refresh or database not in _schema_snapshots:
+        query = """
+        SELECT 
+          c.TABLE_NAME, 
+          c.COLUMN_NAME, 
+          c.COLUMN_TYPE, 
+          c.IS_NULLABLE, 
+          c.COLUMN_KEY, 
+          c.EXTRA,
+          k.REFERENCED_TABLE_NAME, 
+          k.REFERENCED_COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS c
+        LEFT JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
+          ON c.TABLE_SCHEMA = k.TABLE_SCHEMA 
+          AND c.TABLE_NAME = k.TABLE_NAME 
+          AND c.COLUMN_NAME = k.COLUMN_NAME 
+          AND k.REFERENCED_TABLE_NAME IS NOT NULL
+        WHERE c.TABLE_SCHEMA = %s
+        ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;
+        """
+        _schema_snapshots[database] = [list(row) for row in execute_query(query, params=(database,), fetch=True)]
+    return _schema_snapshots[database]
+
+
+def show_schema_with_foreign_keys(database: str, schema=None):
     """
-    query = """
-    SELECT 
-      c.TABLE_NAME, 
-      c.COLUMN_NAME, 
-      c.COLUMN_TYPE, 
-      c.IS_NULLABLE, 
-      c.COLUMN_KEY, 
-      c.EXTRA,
-      k.REFERENCED_TABLE_NAME, 
-      k.REFERENCED_COLUMN_NAME
-    FROM INFORMATION_SCHEMA.COLUMNS c
-    LEFT JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE k
-      ON c.TABLE_SCHEMA = k.TABLE_SCHEMA 
-      AND c.TABLE_NAME = k.TABLE_NAME 
-      AND c.COLUMN_NAME = k.COLUMN_NAME 
-      AND k.REFERENCED_TABLE_NAME IS NOT NULL
-    WHERE c.TABLE_SCHEMA = %s
-    ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;
+    Prints each table’s column details and shows foreign key info if applicable.
     """
-    schema = execute_query(query, params=(database,), fetch=True)
+    if schema is None:
+        schema = get_schema_snapshot(database)
     current_table = None
     for row in schema:
         table_name, column_name, column_type, is_nullable, column_key, extra, ref_table, ref_column = row
@@ -67,10 +369,3 @@ def show_schema_with_foreign_keys(database: str):
         if ref_table:
             fk_info = f" [Foreign Key: references {ref_table}({ref_column})]"
         print(f"  {column_name}: {column_type}, Nullable: {is_nullable}, Key: {column_key}, Extra: {extra}{fk_info}")
-
-
-    
-db_con = get_connection()
-print(type(db_con))
-show_schema_with_foreign_keys(os.getenv('db_name'))
-db_con.close()
\ No newline at end of file
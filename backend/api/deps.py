@@ -7,9 +7,12 @@ from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from dotenv import load_dotenv
+import hmac
 import os
+import time
 from pydantic import BaseModel
-from db import get_connection
+from db import pool
+from utils.cache import TTLCache
 from pymysql.connections import Connection
 
 
@@ -27,28 +30,52 @@ oauth2_bearer_dependancy = Annotated[str, Depends(oauth2_bearer)]
 # I technically do not need a db dependency since I will use execute_query() which 
 # handles that part so lets keep it like that
 def get_db():
-    conn = get_connection()
-    try:
+    with pool.connection() as conn:
         yield conn
-    finally:
-        conn.close()
 db_dependancy = Annotated[Connection, Depends(get_db)]
 
-# depends on oauth2_bearer_dependency first. Sees if we have a token or not
-# this checks everytime if we have a loggen in user or not. 
-async def get_current_user(token: oauth2_bearer_dependancy):
+# Recently verified tokens, so a client hitting us every few seconds with the same
+# token skips the signature check. Entries never outlive the token's own `exp`.
+_token_cache = TTLCache(
+    maxsize=int(os.getenv('auth_token_cache_size', 4096)),
+    ttl=float(os.getenv('auth_token_cache_ttl', 300))
+)
+
+def decode_token(token: str) -> dict:
+    principal = _token_cache.get(token)
+    if principal is not None:
+        return principal
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get('sub')
-        role: str = payload.get('role')
-        user_id: int = payload.get('uid')
-
-        if email is None or role is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user - 0')
-        return {'email': email, 'role': role, 'uid':user_id}
-    
     except JWTError:
         raise  HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user - 1')
+
+    email: str = payload.get('sub')
+    role: str = payload.get('role')
+    user_id: int = payload.get('uid')
+
+    if email is None or role is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate user - 0')
+    principal = {'email': email, 'role': role, 'uid':user_id}
+
+    ttl = _token_cache.ttl
+    exp = payload.get('exp')
+    if exp is not None:
+        ttl = min(ttl, exp - time.time())
+    if ttl > 0:
+        _token_cache.set(token, principal, ttl=ttl)
+    return principal
+
+def token_cache_stats():
+    return _token_cache.stats()
+
+# depends on oauth2_bearer_dependency first. Sees if we have a token or not
+# this checks everytime if we have a loggen in user or not. 
+# FastAPI caches a dependency's result per request, so every guard below that
+# depends on this shares one decode.
+async def get_current_user(token: oauth2_bearer_dependancy):
+    return dict(decode_token(token))
     
 #this specific line checks if we have a logged in user or not
 # Annotated tells pythin that userdependency should be a dictionary 
@@ -56,18 +83,36 @@ async def get_current_user(token: oauth2_bearer_dependancy):
 # when get current user is run we either get a token that authenticates the user or otherwise it returns unauth error
 user_dependancy = Annotated[dict, Depends(get_current_user)]
 
-def only_owner(token: oauth2_bearer_dependancy):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        role: str = payload.get('role')
+# Role guards: cheap checks on the principal that get_current_user already resolved
+def require_role(role: str, detail: str):
+    async def guard(user: user_dependancy):
+        if user['role'] != role:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+        return user
+    guard.__name__ = f'only_{role}'
+    return guard
 
-        if role is None or role != 'owner':
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Only home kitchen owners can access this route')
+only_owner = require_role('owner', 'Only home kitchen owners can access this route')
+only_driver = require_role('driver', 'Only drivers can access this route')
+only_admin = require_role('admin', 'Admins only')
+only_customer = require_role('customer', 'Only customers can access this route')
 
-        return {'role': role}
+owner_dependancy = Annotated[dict, Depends(only_owner)]
+driver_dependancy = Annotated[dict, Depends(only_driver)]
+admin_dependancy = Annotated[dict, Depends(only_admin)]
+customer_dependancy = Annotated[dict, Depends(only_customer)]
 
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid token')
+# /metrics: scrapers can't log in for a 20-minute JWT, so they can send a static
+# `Authorization: Bearer <metrics_token>` instead; admins' own tokens work too.
+# With metrics_token unset only admins can read it.
+METRICS_TOKEN = os.getenv('metrics_token')
 
-    
-owner_dependancy = Annotated[dict, Depends(only_owner)]
\ No newline at end of file
+async def only_metrics_reader(token: oauth2_bearer_dependancy):
+    if METRICS_TOKEN and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return {'role': 'metrics'}
+    user = decode_token(token)
+    if user['role'] != 'admin':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Admins only')
+    return dict(user)
+
+metrics_dependancy = Annotated[dict, Depends(only_metrics_reader)]
@@ -1,26 +1,97 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 from fastapi.middleware.cors import CORSMiddleware
 from routers import homekitchen
-from routers import auth, testRoute, me, driver, order, admin
-from fastapi.staticfiles import StaticFiles
+from routers import auth, testRoute, me, driver, order, admin, events, images
+from utils.images import CachedStaticFiles, UploadSizeLimit, UPLOAD_DIR
+from db import pool
+from deps import token_cache_stats, metrics_dependancy
+from utils.metrics import MetricsMiddleware, register_collector, render_metrics
+from utils.hashing import hashing_stats
+from utils.rate_limit import rate_limit_stats
+from utils.userRole import role_cache_stats
+from utils.verify_owner import ownership_cache_stats
+from utils.response_cache import read_cache_stats
+from utils.events import broker
+from routers.order import pending_orders
+from routers.homekitchen import search_index
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+
+def _warm_pool():
+    try:
+        pool.warm()
+    except Exception:
+        # the pool opens connections on demand anyway, so a failed warm-up is not fatal
+        logger.warning("Could not warm the database connection pool", exc_info=True)
+
+
+# Startup must not block on MySQL: the pool is warmed in the background
+# while the worker is already accepting requests.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_task = asyncio.get_running_loop().run_in_executor(None, _warm_pool)
+    yield
+    await warm_task
+    pool.close()
+
+# Routes declare response models, so FastAPI serializes through pydantic-core and
+# ORJSONResponse only has to render plain JSON types
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# StaticFiles refuses to start on a missing directory, and a fresh deployment has no uploads yet
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+app.mount("/uploads", CachedStaticFiles(directory=UPLOAD_DIR), name="uploads")
+
+# Oversized image uploads are cut off before the multipart parser spools them;
+# added before CORS so its 413s still carry the CORS headers
+app.add_middleware(UploadSizeLimit)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=['http://localhost:3000'], # this line allows NEXT JS. might have to change for prod
     allow_credentials=True, #this for auth
     allow_methods=['*'], #if u wanted to, you could restrict use to just POST and GET 
-    allow_headers=['*'] #this can be useful for custom headers
+    allow_headers=['*'], #this can be useful for custom headers
+    expose_headers=['X-Next-After', 'X-Total-Estimate', 'X-Sync-Cursor', 'ETag'] # pagination cursors (utils/pagination.py) and read-cache validators
 )
 
+# Measures every request, including CORS preflights, so it sits outermost
+app.add_middleware(MetricsMiddleware)
+
 @app.get('/')
 def health_check():
     return 'Health check complete'
 
+
+# Point-in-time gauges sampled on every scrape
+def _gauges(prefix, help, stats):
+    return {f"{prefix}_{key}": (f"{help} ({key})", value)
+            for key, value in stats.items() if isinstance(value, (int, float))}
+
+register_collector(lambda: _gauges('db_pool', 'Connection pool', pool.stats()))
+register_collector(lambda: _gauges('auth_hash_pool', 'bcrypt worker pool', hashing_stats()))
+register_collector(lambda: _gauges('token_cache', 'Verified token cache', token_cache_stats()))
+register_collector(lambda: _gauges('role_cache', 'User role cache', role_cache_stats()))
+register_collector(lambda: _gauges('ownership_cache', 'Kitchen ownership cache', ownership_cache_stats()))
+register_collector(lambda: _gauges('read_cache', 'Menu and meal plan read cache', read_cache_stats()))
+register_collector(lambda: _gauges('order_events', 'Order event broker', broker.stats()))
+register_collector(lambda: _gauges('dispatch_index', 'Pending order spatial index', pending_orders.stats()))
+register_collector(lambda: _gauges('search_index', 'Kitchen and menu search index', search_index.stats()))
+register_collector(lambda: {name: gauge for limit, stats in rate_limit_stats().items()
+                            for name, gauge in _gauges(f'auth_rate_limit_{limit}', f'Auth rate limiter {limit}', stats).items()})
+
+@app.get('/metrics', include_in_schema=False)
+def metrics(reader: metrics_dependancy):
+    # Prometheus text exposition format; admin or metrics_token only (deps.py)
+    return PlainTextResponse(render_metrics(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
 app.include_router(auth.router)
 app.include_router(testRoute.router)
 app.include_router(homekitchen.router)
@@ -28,6 +99,8 @@ app.include_router(me.router)
 app.include_router(driver.router)
 app.include_router(order.router)
 app.include_router(admin.router)
+app.include_router(events.router)
+app.include_router(images.router)
 
 # all restaurants 
 # dishes from restaurants 
@@ -0,0 +1,130 @@
+"""
+Operational commands that need the database. Nothing here runs when the API
+is imported; invoke it explicitly from the api/ directory:
+
+    python manage.py schema             # print the cached schema snapshot
+    python manage.py schema --refresh   # re-read INFORMATION_SCHEMA first
+    python manage.py migrate            # apply pending migrations (--status to list them)
+    python manage.py check-queries      # EXPLAIN every statement in routers/ and utils/
+    python manage.py analytics check    # compare the sales rollups with ORDERS (backfill to rebuild them)
+"""
+import argparse
+import json
+import os
+import sys
+
+import db
+
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_snapshot.json')
+
+
+# ------------------- schema -------------------
+def cmd_schema(args):
+    database = args.database or os.getenv('db_name')
+    schema = None
+    if not args.refresh and os.path.exists(SNAPSHOT_PATH):
+        with open(SNAPSHOT_PATH) as f:
+            snapshot = json.load(f)
+        if snapshot.get('database') == database:
+            schema = snapshot['columns']
+
+    if schema is None:
+        schema = db.get_schema_snapshot(database, refresh=True)
+        with open(SNAPSHOT_PATH, 'w') as f:
+            json.dump({'database': database, 'columns': schema}, f, indent=2)
+
+    db.show_schema_with_foreign_keys(database, schema=schema)
+
+
+# ------------------- migrations -------------------
+def cmd_migrate(args):
+    import migrations
+
+    if args.status:
+        for version, name, applied in migrations.status():
+            print(f"[{'x' if applied else ' '}] {version}_{name}")
+        return 0
+    applied = migrations.migrate(target=args.to)
+    print(f"applied {len(applied)} migration(s)" if applied else "schema is up to date")
+    return 0
+
+
+# ------------------- query check -------------------
+def cmd_check_queries(args):
+    from utils.query_check import check
+
+    statements = check(min_rows=args.min_rows)
+    flagged = 0
+    for s in statements:
+        where = f"{s.path}:{s.line}"
+        if s.skipped:
+            if args.verbose:
+                print(f"SKIP  {where}  {s.skipped}")
+        elif s.problems:
+            flagged += 1
+            for problem in s.problems:
+                print(f"SCAN  {where}  {problem}")
+            print(f"      {' '.join(s.sql.split())}")
+        elif args.verbose:
+            print(f"ok    {where}")
+    print(f"{len(statements)} statements, {flagged} flagged")
+    return 1 if flagged else 0
+
+
+# ------------------- analytics -------------------
+def cmd_analytics(args):
+    from utils import analytics
+
+    if args.action == 'backfill':
+        rebuilt = 0
+        for kitchen_id in analytics.backfill(args.kitchen):
+            rebuilt += 1
+            if args.verbose:
+                print(f"kitchen {kitchen_id} rebuilt")
+        print(f"rebuilt sales rollups for {rebuilt} kitchen(s)")
+        return 0
+
+    mismatches = 0
+    for kitchen_id, what, key, rollup, raw in analytics.check(args.kitchen):
+        mismatches += 1
+        print(f"kitchen {kitchen_id} {what} {key}: rollup={rollup} raw={raw}")
+    print(f"{mismatches} mismatch(es)")
+    return 1 if mismatches else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='manage.py', description='HomeKitchen backend operations')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    schema = commands.add_parser('schema', help='print tables, columns and foreign keys')
+    schema.add_argument('--database', help='schema to inspect (defaults to db_name)')
+    schema.add_argument('--refresh', action='store_true', help='ignore the cached snapshot')
+    schema.set_defaults(func=cmd_schema)
+
+    migrate = commands.add_parser('migrate', help='apply pending schema migrations')
+    migrate.add_argument('--to', help='stop after this version, e.g. 0002')
+    migrate.add_argument('--status', action='store_true', help='list migrations and whether they are applied')
+    migrate.set_defaults(func=cmd_migrate)
+
+    check_queries = commands.add_parser('check-queries', help='flag statements whose plan is a full scan')
+    check_queries.add_argument('--min-rows', type=int, default=1000,
+                               help='ignore scans the optimizer expects to read fewer rows than this')
+    check_queries.add_argument('--verbose', action='store_true', help='also list clean and skipped statements')
+    check_queries.set_defaults(func=cmd_check_queries)
+
+    analytics = commands.add_parser('analytics', help='rebuild or verify the sales rollups')
+    analytics.add_argument('action', choices=['backfill', 'check'])
+    analytics.add_argument('--kitchen', type=int, help='only this KitchenID (default: every kitchen)')
+    analytics.add_argument('--verbose', action='store_true')
+    analytics.set_defaults(func=cmd_analytics)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        db.pool.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Creates every table the API uses. Existing tables are left untouched."""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS USERS (
+        UID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        FirstName VARCHAR(100) NOT NULL,
+        LastName VARCHAR(100) NOT NULL,
+        Email VARCHAR(255) NOT NULL,
+        PhoneNo VARCHAR(20),
+        HashedPassword VARCHAR(255) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ADMINS (
+        AdminUID INT NOT NULL PRIMARY KEY,
+        FOREIGN KEY (AdminUID) REFERENCES USERS(UID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS KITCHENOWNERS (
+        OwnerUID INT NOT NULL PRIMARY KEY,
+        FOREIGN KEY (OwnerUID) REFERENCES USERS(UID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS DRIVERS (
+        DriverUID INT NOT NULL PRIMARY KEY,
+        ApprovalStatus VARCHAR(20),
+        VerifiedBy INT,
+        FOREIGN KEY (DriverUID) REFERENCES USERS(UID),
+        FOREIGN KEY (VerifiedBy) REFERENCES ADMINS(AdminUID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS CUSTOMERS (
+        CustomerUID INT NOT NULL PRIMARY KEY,
+        FOREIGN KEY (CustomerUID) REFERENCES USERS(UID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS CUSTOMERADDRESSES (
+        CustomerUID INT NOT NULL,
+        Address VARCHAR(255) NOT NULL,
+        PRIMARY KEY (CustomerUID, Address),
+        FOREIGN KEY (CustomerUID) REFERENCES CUSTOMERS(CustomerUID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS HOMEKITCHENS (
+        KitchenID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        OwnerUID INT NOT NULL,
+        Name VARCHAR(255) NOT NULL,
+        Address VARCHAR(255),
+        AverageRating DECIMAL(2, 1),
+        VerifiedBy INT,
+        ApprovalStatus VARCHAR(20),
+        Logo VARCHAR(255),
+        FOREIGN KEY (OwnerUID) REFERENCES KITCHENOWNERS(OwnerUID),
+        FOREIGN KEY (VerifiedBy) REFERENCES ADMINS(AdminUID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS MENUITEMS (
+        ItemID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        KitchenID INT NOT NULL,
+        Name VARCHAR(255) NOT NULL,
+        Description TEXT,
+        Price DECIMAL(10, 2) NOT NULL,
+        Image VARCHAR(255),
+        FOREIGN KEY (KitchenID) REFERENCES HOMEKITCHENS(KitchenID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS MEALPLANS (
+        MealPlanID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        KitchenID INT NOT NULL,
+        Name VARCHAR(255) NOT NULL,
+        TotalPrice DECIMAL(10, 2) NOT NULL,
+        Image VARCHAR(255),
+        FOREIGN KEY (KitchenID) REFERENCES HOMEKITCHENS(KitchenID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS MEALPLANITEMS (
+        KitchenID INT NOT NULL,
+        MealPlanID INT NOT NULL,
+        ItemID INT NOT NULL,
+        PRIMARY KEY (MealPlanID, ItemID),
+        FOREIGN KEY (MealPlanID) REFERENCES MEALPLANS(MealPlanID),
+        FOREIGN KEY (ItemID) REFERENCES MENUITEMS(ItemID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ORDERS (
+        OrderID INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        TotalPrice DECIMAL(10, 2) NOT NULL,
+        ETA TIME,
+        CustomerUID INT NOT NULL,
+        KitchenID INT NOT NULL,
+        DriverUID INT,
+        Status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+        CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (CustomerUID) REFERENCES CUSTOMERS(CustomerUID),
+        FOREIGN KEY (KitchenID) REFERENCES HOMEKITCHENS(KitchenID),
+        FOREIGN KEY (DriverUID) REFERENCES DRIVERS(DriverUID)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ORDERCONTAINS (
+        OrderID INT NOT NULL,
+        KitchenID INT NOT NULL,
+        ItemID INT NOT NULL,
+        Quantity INT NOT NULL DEFAULT 1,
+        PRIMARY KEY (OrderID, ItemID),
+        FOREIGN KEY (OrderID) REFERENCES ORDERS(OrderID),
+        FOREIGN KEY (ItemID) REFERENCES MENUITEMS(ItemID)
+    )
+    """,
+]
+
+
+def upgrade(cursor):
+    for statement in TABLES:
+        cursor.execute(statement)
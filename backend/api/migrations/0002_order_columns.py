@@ -0,0 +1,14 @@
+"""
+Columns added after the original schema: line item quantities and order timestamps.
+
+Orders that already exist get CreatedAt = the moment this migration runs, since
+their real placement time was never recorded. The sales rollups (0005, rebuilt
+by `manage.py analytics backfill`) are keyed on DATE(CreatedAt), so all of that
+history lands on the migration day.
+"""
+from migrations import add_column
+
+
+def upgrade(cursor):
+    add_column(cursor, 'ORDERCONTAINS', 'Quantity', "INT NOT NULL DEFAULT 1")
+    add_column(cursor, 'ORDERS', 'CreatedAt', "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP")
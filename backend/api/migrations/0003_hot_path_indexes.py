@@ -0,0 +1,16 @@
+"""
+Indexes behind the hottest filters. InnoDB appends the primary key to every
+secondary index, so e.g. ix_orders_status also serves keyset pages ordered by OrderID.
+"""
+from migrations import add_index
+
+
+def upgrade(cursor):
+    add_index(cursor, 'ORDERS', 'ix_orders_status', ['Status'])
+    add_index(cursor, 'ORDERS', 'ix_orders_kitchen_status', ['KitchenID', 'Status'])
+    add_index(cursor, 'ORDERS', 'ix_orders_customer', ['CustomerUID'])
+    # Email identifies a user at login and signup; fails loudly if duplicates already exist
+    add_index(cursor, 'USERS', 'ux_users_email', ['Email'], unique=True)
+    add_index(cursor, 'MENUITEMS', 'ix_menuitems_kitchen', ['KitchenID'])
+    add_index(cursor, 'MEALPLANITEMS', 'ix_mealplanitems_mealplan', ['MealPlanID'])
+    add_index(cursor, 'HOMEKITCHENS', 'ix_homekitchens_owner', ['OwnerUID'])
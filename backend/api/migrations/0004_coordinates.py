@@ -0,0 +1,8 @@
+"""Coordinates for kitchens (order pickup) and customer addresses (drop-off), used by driver dispatch."""
+from migrations import add_column
+
+
+def upgrade(cursor):
+    for table in ('HOMEKITCHENS', 'CUSTOMERADDRESSES'):
+        add_column(cursor, table, 'Latitude', "DECIMAL(9, 6) NULL")
+        add_column(cursor, table, 'Longitude', "DECIMAL(9, 6) NULL")
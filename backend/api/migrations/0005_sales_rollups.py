@@ -0,0 +1,33 @@
+"""
+Per-kitchen sales rollups, maintained by place_order / complete_order and
+rebuilt with `python manage.py analytics backfill`. Days are the day the order
+was placed, so the rollups can always be recomputed from ORDERS alone.
+"""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS KITCHENDAILYSALES (
+        KitchenID INT NOT NULL,
+        Day DATE NOT NULL,
+        OrdersPlaced INT NOT NULL DEFAULT 0,
+        PlacedRevenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        OrdersCompleted INT NOT NULL DEFAULT 0,
+        CompletedRevenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        PRIMARY KEY (KitchenID, Day)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS KITCHENITEMSALES (
+        KitchenID INT NOT NULL,
+        Day DATE NOT NULL,
+        ItemID INT NOT NULL,
+        Quantity INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (KitchenID, Day, ItemID)
+    )
+    """,
+]
+
+
+def upgrade(cursor):
+    for statement in TABLES:
+        cursor.execute(statement)
@@ -0,0 +1,28 @@
+"""
+Refresh tokens issued by POST /auth/token and rotated by POST /auth/refresh.
+Only a SHA-256 of each token is stored. Every token issued from one login
+shares a FamilyID, so a rotated-out token that turns up again can revoke
+the whole chain.
+"""
+
+TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS REFRESHTOKENS (
+        TokenHash CHAR(64) NOT NULL,
+        UID INT NOT NULL,
+        FamilyID CHAR(32) NOT NULL,
+        ExpiresAt DATETIME NOT NULL,
+        RevokedAt DATETIME NULL,
+        CreatedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (TokenHash),
+        KEY ix_refreshtokens_uid (UID),
+        KEY ix_refreshtokens_family (FamilyID),
+        FOREIGN KEY (UID) REFERENCES USERS(UID)
+    )
+    """,
+]
+
+
+def upgrade(cursor):
+    for statement in TABLES:
+        cursor.execute(statement)
@@ -0,0 +1,107 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module named NNNN_description.py in this directory that
+defines `upgrade(cursor)`. Applied versions are recorded in
+SCHEMA_MIGRATIONS; run pending ones with `python manage.py migrate`.
+
+MySQL commits DDL implicitly, so migrations cannot be rolled back as a unit.
+Write them to be re-runnable: the helpers below only add what is missing.
+"""
+import importlib.util
+import os
+import re
+
+from db import pool
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+def discover():
+    """[(version, name, module), ...] in version order."""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        spec = importlib.util.spec_from_file_location(f"migrations.m{match[1]}", os.path.join(MIGRATIONS_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations.append((match[1], match[2], module))
+    return migrations
+
+
+def _ensure_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS (
+            Version CHAR(4) NOT NULL PRIMARY KEY,
+            Name VARCHAR(255) NOT NULL,
+            AppliedAt DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    _ensure_table(cursor)
+    cursor.execute("SELECT Version FROM SCHEMA_MIGRATIONS")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def status():
+    with pool.connection() as conn, conn.cursor() as cursor:
+        applied = applied_versions(cursor)
+    return [(version, name, version in applied) for version, name, _ in discover()]
+
+
+def migrate(target=None, log=print):
+    """Applies pending migrations up to and including `target` (default: all)."""
+    applied_now = []
+    with pool.connection() as conn, conn.cursor() as cursor:
+        applied = applied_versions(cursor)
+        for version, name, module in discover():
+            if version in applied:
+                continue
+            if target is not None and version > target:
+                break
+            log(f"applying {version}_{name}")
+            module.upgrade(cursor)
+            cursor.execute("INSERT INTO SCHEMA_MIGRATIONS (Version, Name) VALUES (%s, %s)", (version, name))
+            applied_now.append(version)
+    return applied_now
+
+
+# ------------------- helpers for migration modules -------------------
+def column_exists(cursor, table, column):
+    cursor.execute(
+        """
+        SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, column))
+    return cursor.fetchone() is not None
+
+
+def index_covers(cursor, table, columns):
+    """True if some index on `table` starts with exactly these columns, in order."""
+    cursor.execute(
+        """
+        SELECT INDEX_NAME, COLUMN_NAME FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """, (table,))
+    indexes = {}
+    for index_name, column_name in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column_name)
+    wanted = [c.lower() for c in columns]
+    return any([c.lower() for c in cols[:len(wanted)]] == wanted for cols in indexes.values())
+
+
+def add_column(cursor, table, column, definition):
+    if not column_exists(cursor, table, column):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def add_index(cursor, table, name, columns, unique=False):
+    if not index_covers(cursor, table, columns):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
@@ -1,23 +1,50 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from db import execute_query
-from deps import user_dependancy
-from utils.userRole import get_user_role
+from fastapi import APIRouter, HTTPException, Response, status, Depends
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from db import execute_query, transaction, pool_stats
+from deps import admin_dependancy, token_cache_stats
+from utils.userRole import ROLE_SELECT, ROLE_JOINS, invalidate_user_role, prime_user_roles, role_cache_stats
+from utils.projection import columns, as_dict, as_dicts
+from utils.pagination import keyset_page, estimate_rows, set_page_headers, limit_query, after_query, total_query, DEFAULT_LIMIT
+from utils.hashing import hashing_stats
+from utils.rate_limit import rate_limit_stats
+from utils.events import broker, publish_order_event, ORDER_RELEASED
+from utils.response_cache import read_cache_stats, invalidate_kitchen
+from utils.analytics import forget_customer_orders
+from utils.verify_owner import invalidate_owned_kitchens, ownership_cache_stats
+from routers.order import OrderOut, pending_orders
+from routers.homekitchen import search_index
 
 router = APIRouter(
     prefix="/admin",
     tags=["admin"]
 )
 
-def verify_admin(user):
-    role = user['role']
-    if role != "admin":
-        raise HTTPException(status_code=403, detail="Admins only")
-    return True
+# ------------------- Models -------------------
+class PendingDriver(BaseModel):
+    DriverUID: int
+
+class PendingKitchen(BaseModel):
+    KitchenID: int
+    Name: str
+
+class UserSummary(BaseModel):
+    UID: int
+    FirstName: str
+    LastName: str
+    Role: Optional[str] = None
+
+class BulkApprovalRequest(BaseModel):
+    IDs: List[int] = Field(min_length=1, max_length=1000)
+
+class BulkApprovalResult(BaseModel):
+    ApprovalStatus: str
+    Updated: int
+    NotFound: List[int]
 
 # ✅ Approve a driver
 @router.put("/verify-driver/{driver_id}")
-def verify_driver(driver_id: int, user: user_dependancy):
-    verify_admin(user)
+def verify_driver(driver_id: int, user: admin_dependancy):
     execute_query(
         "UPDATE DRIVERS SET ApprovalStatus = 'approved', VerifiedBy = %s WHERE DriverUID = %s",
         (user['uid'], driver_id)
@@ -25,55 +52,211 @@ def verify_driver(driver_id: int, user: user_dependancy):
     return {"message": f"Driver {driver_id} approved"}
 
 # ✅ Delete a user and associated records
+def _delete_user_rows(cursor, uid: int):
+    """
+    Removes the user and everything that hangs off them, children before parents:
+    their kitchens (with menus, meal plans, orders and sales rollups), the orders
+    they placed as a customer, and their addresses, role rows and refresh tokens.
+    Orders they delivered lose their driver; orders they had claimed go back to Pending.
+
+    Returns (kitchen IDs, menu item IDs, pending order IDs) that were deleted and
+    [(order dict, latitude, longitude)] for the orders released back to Pending,
+    for the in-memory indexes and the event feed.
+    """
+    cursor.execute("SELECT KitchenID FROM HOMEKITCHENS WHERE OwnerUID = %s FOR UPDATE", (uid,))
+    kitchen_ids = [row[0] for row in cursor.fetchall()]
+    item_ids, pending_ids = [], []
+
+    if kitchen_ids:
+        placeholders = ", ".join(["%s"] * len(kitchen_ids))
+        cursor.execute(f"SELECT ItemID FROM MENUITEMS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        item_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(f"SELECT OrderID FROM ORDERS WHERE KitchenID IN ({placeholders}) AND Status = 'Pending'", kitchen_ids)
+        pending_ids += [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(f"DELETE FROM ORDERCONTAINS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM ORDERS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM MEALPLANITEMS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM MEALPLANS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM MENUITEMS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM KITCHENDAILYSALES WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM KITCHENITEMSALES WHERE KitchenID IN ({placeholders})", kitchen_ids)
+        cursor.execute(f"DELETE FROM HOMEKITCHENS WHERE KitchenID IN ({placeholders})", kitchen_ids)
+
+    # as a customer: their orders leave other kitchens' sales figures too
+    cursor.execute("SELECT OrderID FROM ORDERS WHERE CustomerUID = %s AND Status = 'Pending'", (uid,))
+    pending_ids += [row[0] for row in cursor.fetchall()]
+    forget_customer_orders(cursor, uid)
+    cursor.execute(
+        "DELETE oc FROM ORDERCONTAINS oc JOIN ORDERS o ON o.OrderID = oc.OrderID WHERE o.CustomerUID = %s", (uid,))
+    cursor.execute("DELETE FROM ORDERS WHERE CustomerUID = %s", (uid,))
+    cursor.execute("DELETE FROM CUSTOMERADDRESSES WHERE CustomerUID = %s", (uid,))
+
+    # as a driver: keep delivered orders, hand claimed ones back to the pool
+    cursor.execute("SELECT OrderID FROM ORDERS WHERE DriverUID = %s AND Status = 'Claimed' FOR UPDATE", (uid,))
+    released_ids = [row[0] for row in cursor.fetchall()]
+    released = []
+    if released_ids:
+        placeholders = ", ".join(["%s"] * len(released_ids))
+        cursor.execute(f"UPDATE ORDERS SET Status = 'Pending', DriverUID = NULL WHERE OrderID IN ({placeholders})", released_ids)
+        # read back after the update so Status and UpdatedAt are what the index should hold
+        cursor.execute(
+            f"""
+            SELECT {columns(OrderOut, 'o')}, k.Latitude, k.Longitude
+            FROM ORDERS o JOIN HOMEKITCHENS k ON k.KitchenID = o.KitchenID
+            WHERE o.OrderID IN ({placeholders})
+            """,
+            released_ids)
+        released = [(as_dict(OrderOut, row[:-2]), row[-2], row[-1]) for row in cursor.fetchall()]
+    cursor.execute("UPDATE ORDERS SET DriverUID = NULL WHERE DriverUID = %s", (uid,))
+
+    # as an admin: approvals they gave stay, without the reference
+    cursor.execute("UPDATE DRIVERS SET VerifiedBy = NULL WHERE VerifiedBy = %s", (uid,))
+    cursor.execute("UPDATE HOMEKITCHENS SET VerifiedBy = NULL WHERE VerifiedBy = %s", (uid,))
+
+    cursor.execute("DELETE FROM CUSTOMERS WHERE CustomerUID = %s", (uid,))
+    cursor.execute("DELETE FROM DRIVERS WHERE DriverUID = %s", (uid,))
+    cursor.execute("DELETE FROM KITCHENOWNERS WHERE OwnerUID = %s", (uid,))
+    cursor.execute("DELETE FROM ADMINS WHERE AdminUID = %s", (uid,))
+    # revokes every session; access tokens already handed out run until they expire
+    cursor.execute("DELETE FROM REFRESHTOKENS WHERE UID = %s", (uid,))
+    cursor.execute("DELETE FROM USERS WHERE UID = %s", (uid,))
+
+    return kitchen_ids, item_ids, pending_ids, released
+
 @router.delete("/delete-user/{uid}")
-def delete_user(uid: int, user: user_dependancy):
-    verify_admin(user)
-    # Optional: delete from role tables first
-    execute_query("DELETE FROM CUSTOMERS WHERE CustomerUID = %s", (uid,))
-    execute_query("DELETE FROM DRIVERS WHERE DriverUID = %s", (uid,))
-    execute_query("DELETE FROM KITCHENOWNERS WHERE OwnerUID = %s", (uid,))
-    execute_query("DELETE FROM USERS WHERE UID = %s", (uid,))
+def delete_user(uid: int, user: admin_dependancy):
+    # One transaction: either the user and all their dependent rows go, or nothing does
+    with transaction() as cursor:
+        cursor.execute("SELECT UID FROM USERS WHERE UID = %s FOR UPDATE", (uid,))
+        if cursor.fetchone() is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        kitchen_ids, item_ids, pending_ids, released = _delete_user_rows(cursor, uid)
+
+    invalidate_user_role(uid)
+    invalidate_owned_kitchens(uid)
+    for kitchen_id in kitchen_ids:
+        invalidate_kitchen(kitchen_id)
+        search_index.remove_kitchen(kitchen_id)
+    for item_id in item_ids:
+        search_index.remove_item(item_id)
+    for order_id in pending_ids:
+        pending_orders.remove(order_id)
+    # released orders are open again: back on the dispatch grid and offered to drivers
+    for order, lat, lon in released:
+        if lat is not None and lon is not None:
+            pending_orders.add(order, lat, lon)
+        publish_order_event(ORDER_RELEASED, order['OrderID'], order['KitchenID'], order['CustomerUID'], None, 'Pending')
     return {"message": f"User {uid} deleted"}
 
 # ✅ Approve a restaurant
 @router.put("/approve-kitchen/{kitchen_id}")
-def approve_kitchen(kitchen_id: int, user: user_dependancy):
-    verify_admin(user)
+def approve_kitchen(kitchen_id: int, user: admin_dependancy):
     execute_query(
         "UPDATE HOMEKITCHENS SET ApprovalStatus = 'approved', VerifiedBy = %s WHERE KitchenID = %s",
         (user["uid"], kitchen_id)
     )
     return {"message": f"Kitchen {kitchen_id} approved"}
 
-@router.get("/pending-drivers")
-def get_pending_drivers(user: user_dependancy):
-    verify_admin(user)
-    query = "SELECT DriverUID FROM DRIVERS WHERE ApprovalStatus != 'approved' OR ApprovalStatus IS NULL"
-    result = execute_query(query, fetch=True)
-    return [dict(DriverUID=row[0]) for row in result]
-
-@router.get("/pending-kitchens")
-def get_pending_kitchens(user: user_dependancy):
-    verify_admin(user)
-    query = "SELECT KitchenID, Name FROM HOMEKITCHENS WHERE ApprovalStatus != 'approved' OR ApprovalStatus IS NULL"
-    result = execute_query(query, fetch=True)
-    return [dict(KitchenID=row[0], Name=row[1]) for row in result]
-
-@router.get("/all-users")
-def get_all_users(user: user_dependancy):
-    verify_admin(user)
-    query = "SELECT UID, FirstName, LastName FROM USERS"
-    users = execute_query(query, fetch=True)
-
-    # Attach role for each user
-    output = []
-    for uid, first, last in users:
-        role = get_user_role(uid)
-        output.append({
-            "UID": uid,
-            "FirstName": first,
-            "LastName": last,
-            "Role": role
-        })
+# ✅ Approve or reject many drivers / restaurants at once, one statement per request
+def _bulk_set_approval(table: str, key_column: str, ids: List[int], approval_status: str, admin_uid: int):
+    ids = list(dict.fromkeys(ids))
+    placeholders = ", ".join(["%s"] * len(ids))
+    with transaction() as cursor:
+        updated = cursor.execute(
+            f"UPDATE {table} SET ApprovalStatus = %s, VerifiedBy = %s WHERE {key_column} IN ({placeholders})",
+            (approval_status, admin_uid, *ids)
+        )
+        cursor.execute(f"SELECT {key_column} FROM {table} WHERE {key_column} IN ({placeholders})", ids)
+        found = {row[0] for row in cursor.fetchall()}
+    return {"ApprovalStatus": approval_status, "Updated": updated, "NotFound": [i for i in ids if i not in found]}
+
+@router.post("/drivers/approve", response_model=BulkApprovalResult)
+def approve_drivers(req: BulkApprovalRequest, user: admin_dependancy):
+    return _bulk_set_approval('DRIVERS', 'DriverUID', req.IDs, 'approved', user['uid'])
+
+@router.post("/drivers/reject", response_model=BulkApprovalResult)
+def reject_drivers(req: BulkApprovalRequest, user: admin_dependancy):
+    return _bulk_set_approval('DRIVERS', 'DriverUID', req.IDs, 'rejected', user['uid'])
+
+@router.post("/kitchens/approve", response_model=BulkApprovalResult)
+def approve_kitchens(req: BulkApprovalRequest, user: admin_dependancy):
+    return _bulk_set_approval('HOMEKITCHENS', 'KitchenID', req.IDs, 'approved', user['uid'])
+
+@router.post("/kitchens/reject", response_model=BulkApprovalResult)
+def reject_kitchens(req: BulkApprovalRequest, user: admin_dependancy):
+    return _bulk_set_approval('HOMEKITCHENS', 'KitchenID', req.IDs, 'rejected', user['uid'])
+
+@router.get("/pending-drivers", response_model=List[PendingDriver])
+def get_pending_drivers(user: admin_dependancy, response: Response,
+                        limit: limit_query = DEFAULT_LIMIT, after: after_query = None,
+                        include_total: total_query = False):
+    query = f"SELECT {columns(PendingDriver)} FROM DRIVERS"
+    conditions = ["ApprovalStatus IS NULL OR ApprovalStatus NOT IN ('approved', 'rejected')"]
+    result, next_after = keyset_page(query, 'DriverUID', conditions, [], limit, after)
+    set_page_headers(response, next_after, estimate_rows(query, conditions, []) if include_total else None)
+    return as_dicts(PendingDriver, result)
+
+@router.get("/pending-kitchens", response_model=List[PendingKitchen])
+def get_pending_kitchens(user: admin_dependancy, response: Response,
+                         limit: limit_query = DEFAULT_LIMIT, after: after_query = None,
+                         include_total: total_query = False):
+    query = f"SELECT {columns(PendingKitchen)} FROM HOMEKITCHENS"
+    conditions = ["ApprovalStatus IS NULL OR ApprovalStatus NOT IN ('approved', 'rejected')"]
+    result, next_after = keyset_page(query, 'KitchenID', conditions, [], limit, after)
+    set_page_headers(response, next_after, estimate_rows(query, conditions, []) if include_total else None)
+    return as_dicts(PendingKitchen, result)
+
+@router.get("/all-users", response_model=List[UserSummary])
+def get_all_users(user: admin_dependancy, response: Response,
+                  limit: limit_query = DEFAULT_LIMIT, after: after_query = None,
+                  include_total: total_query = False):
+    # Roles are joined in, so each page is a single query no matter how many users exist
+    query = f"SELECT u.UID, u.FirstName, u.LastName, {ROLE_SELECT} FROM USERS u {ROLE_JOINS}"
+    users, next_after = keyset_page(query, 'u.UID', [], [], limit, after)
+    set_page_headers(response, next_after, estimate_rows("SELECT UID FROM USERS", [], []) if include_total else None)
+
+    output = as_dicts(UserSummary, users)
+    prime_user_roles({row["UID"]: row["Role"] for row in output})
 
     return output
+
+@router.get("/pool-stats")
+def get_pool_stats(user: admin_dependancy):
+    return pool_stats()
+
+@router.get("/hashing-stats")
+def get_hashing_stats(user: admin_dependancy):
+    return hashing_stats()
+
+@router.get("/role-cache-stats")
+def get_role_cache_stats(user: admin_dependancy):
+    return role_cache_stats()
+
+@router.get("/token-cache-stats")
+def get_token_cache_stats(user: admin_dependancy):
+    return token_cache_stats()
+
+@router.get("/ownership-cache-stats")
+def get_ownership_cache_stats(user: admin_dependancy):
+    return ownership_cache_stats()
+
+@router.get("/event-stats")
+def get_event_stats(user: admin_dependancy):
+    return broker.stats()
+
+@router.get("/read-cache-stats")
+def get_read_cache_stats(user: admin_dependancy):
+    return read_cache_stats()
+
+@router.get("/dispatch-stats")
+def get_dispatch_stats(user: admin_dependancy):
+    return pending_orders.stats()
+
+@router.get("/search-stats")
+def get_search_stats(user: admin_dependancy):
+    return search_index.stats()
+
+@router.get("/rate-limit-stats")
+def get_rate_limit_stats(user: admin_dependancy):
+    return rate_limit_stats()
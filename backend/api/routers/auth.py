@@ -1,14 +1,18 @@
 from datetime import timedelta, datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Annotated
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from jose import jwt 
 from dotenv import load_dotenv
+import hashlib
 import os
-from deps import bcrypt_context
-from db import execute_query
-from utils.userRole import get_user_role
+import secrets
+from db import execute_query, transaction
+from utils.userRole import get_user_role, invalidate_user_role
+from utils.hashing import hash_password, verify_password
+from utils.rate_limit import enforce as rate_limit, enforce_bcrypt
 
 
 load_dotenv()
@@ -23,6 +27,10 @@ router = APIRouter(
 
 SECRET_KEY = os.getenv("AUTH_SECRET_KEY")
 ALGORITHM = os.getenv("AUTH_ALGORITHM")
+# Access tokens are checked without a database round trip, so they stay short-lived;
+# clients renew them with the refresh token instead of the password
+ACCESS_TOKEN_MINUTES = float(os.getenv('auth_access_token_minutes', 20))
+REFRESH_TOKEN_DAYS = float(os.getenv('auth_refresh_token_days', 30))
 
 
 # When we create a user , our create user request should follow this format
@@ -35,10 +43,18 @@ class UserCreateRequest(BaseModel):
     Password: str
     Role: str  # "customer", "driver", or "owner"
     Address:str
+    # optional coordinates of the address
+    Latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    Longitude: Optional[float] = Field(default=None, ge=-180, le=180)
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: int
+    refresh_token: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # # get the users role: 
 # def get_user_role(userID: int):
@@ -49,11 +65,11 @@ class Token(BaseModel):
 #     if execute_query("SELECT * FROM CUSTOMERS WHERE CustomerUID = %s", (userID,), fetch=True):
         # return "customer"
 
-def authenticate_user(email: str, password: str):
+async def authenticate_user(email: str, password: str):
     #this is our query to run
     query = "SELECT * FROM USERS WHERE email = %s"
-    #once we execute hopefully we get a user
-    user = execute_query(query, (email,), fetch=True)
+    #once we execute hopefully we get a user (off the event loop, execute_query blocks)
+    user = await run_in_threadpool(execute_query, query, (email,), fetch=True)
 
     # no user then return false
     if not user or len(user) == 0:
@@ -63,7 +79,9 @@ def authenticate_user(email: str, password: str):
     # user = user[3]
     hashed_password = user[0][5]  
 
-    if not bcrypt_context.verify(password, hashed_password):
+    # only a login that really reaches bcrypt spends the shared hashing budget
+    enforce_bcrypt('login')
+    if not await verify_password(password, hashed_password):
         return False
 
     user = {
@@ -71,7 +89,7 @@ def authenticate_user(email: str, password: str):
         'full_name': user[0][1] + user[0][2],
         'email': user[0][3],
         'phone_no': user[0][4],
-        'role' :  get_user_role(user[0][0])
+        'role' :  await run_in_threadpool(get_user_role, user[0][0])
     }
     # Return user info if authentication is successful
     return user
@@ -84,16 +102,62 @@ def create_access_token(email:str, role:str, uid:int , expires_delta:timedelta):
     #make a jwt token encoding for our email and exp using our secret key on the algorithm
     return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
-async def create_user(create_user_request: UserCreateRequest):
-    check_query = "SELECT * FROM USERS WHERE Email = %s"
-    existing_user = execute_query(check_query, (create_user_request.Email,), fetch=True)
-
-    if existing_user:
-        raise HTTPException(status_code=400, detail='User already exists')
-
-    hashed_pw = bcrypt_context.hash(create_user_request.Password)
-
+# ------------------- Refresh tokens -------------------
+# Refresh tokens are 256 random bits, so a plain SHA-256 is enough to keep a leaked
+# table useless without paying for bcrypt on every renewal
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _insert_refresh_token(cursor, uid: int, family_id: str) -> str:
+    token = secrets.token_urlsafe(32)
+    cursor.execute(
+        "INSERT INTO REFRESHTOKENS (TokenHash, UID, FamilyID, ExpiresAt) VALUES (%s, %s, %s, %s)",
+        (_hash_refresh_token(token), uid, family_id,
+         datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=REFRESH_TOKEN_DAYS)))
+    return token
+
+# Runs in the threadpool
+def issue_refresh_token(uid: int) -> str:
+    """Starts a new token family for a fresh login."""
+    with transaction() as cursor:
+        # logins are rare enough to tidy up this user's dead tokens as we go
+        cursor.execute("DELETE FROM REFRESHTOKENS WHERE UID = %s AND ExpiresAt < UTC_TIMESTAMP()", (uid,))
+        return _insert_refresh_token(cursor, uid, secrets.token_hex(16))
+
+# Runs in the threadpool
+def rotate_refresh_token(token: str):
+    """
+    Swaps a live refresh token for a new one in the same family and returns
+    (new token, uid, email). A token that was already rotated out means it was
+    copied, so its whole family is revoked and the caller has to log in again.
+    """
+    reused = False
+    with transaction() as cursor:
+        cursor.execute(
+            """
+            SELECT r.UID, r.FamilyID, r.ExpiresAt, r.RevokedAt, u.Email
+            FROM REFRESHTOKENS r JOIN USERS u ON u.UID = r.UID
+            WHERE r.TokenHash = %s FOR UPDATE
+            """,
+            (_hash_refresh_token(token),))
+        row = cursor.fetchone()
+        if row is not None:
+            uid, family_id, expires_at, revoked_at, email = row
+            if revoked_at is not None:
+                # HTTPException would roll this back, so refuse once the block has committed
+                cursor.execute("UPDATE REFRESHTOKENS SET RevokedAt = UTC_TIMESTAMP() WHERE FamilyID = %s AND RevokedAt IS NULL",
+                               (family_id,))
+                reused = True
+            elif expires_at > datetime.now(timezone.utc).replace(tzinfo=None):
+                cursor.execute("UPDATE REFRESHTOKENS SET RevokedAt = UTC_TIMESTAMP() WHERE TokenHash = %s",
+                               (_hash_refresh_token(token),))
+                return _insert_refresh_token(cursor, uid, family_id), uid, email
+    if reused:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token was already used; please log in again")
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")
+
+# Runs in the threadpool: every statement here is a blocking execute_query call
+def insert_user(create_user_request: UserCreateRequest, hashed_pw: str):
     insert_query = """
         INSERT INTO USERS (FirstName, LastName, Email, PhoneNo, HashedPassword)
         VALUES (%s, %s, %s, %s, %s)
@@ -115,27 +179,61 @@ async def create_user(create_user_request: UserCreateRequest):
     if role == 'customer':
         execute_query("INSERT INTO CUSTOMERS (CustomerUID) VALUES (%s)", (user_id,))
         execute_query(
-            "INSERT INTO CUSTOMERADDRESSES (CustomerUID, Address) VALUES (%s, %s)",
-            (user_id, create_user_request.Address)
+            "INSERT INTO CUSTOMERADDRESSES (CustomerUID, Address, Latitude, Longitude) VALUES (%s, %s, %s, %s)",
+            (user_id, create_user_request.Address, create_user_request.Latitude, create_user_request.Longitude)
         )
     elif role == 'driver':
         execute_query("INSERT INTO DRIVERS (DriverUID) VALUES (%s)", (user_id,))
     elif role == 'owner':
         execute_query("INSERT INTO KITCHENOWNERS (OwnerUID) VALUES (%s)", (user_id,))
-    else:
+
+    # the role may have been looked up (and cached as missing) while we were inserting
+    invalidate_user_role(user_id)
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_user(create_user_request: UserCreateRequest, request: Request):
+    # Validate the role up front so a bad request never costs a bcrypt round
+    if create_user_request.Role.lower() not in ('customer', 'driver', 'owner'):
         raise HTTPException(status_code=400, detail='Invalid role specified')
+    rate_limit('signup', request, create_user_request.Email)
+
+    check_query = "SELECT * FROM USERS WHERE Email = %s"
+    existing_user = await run_in_threadpool(execute_query, check_query, (create_user_request.Email,), fetch=True)
+
+    if existing_user:
+        raise HTTPException(status_code=400, detail='User already exists')
+
+    enforce_bcrypt('signup')
+    hashed_pw = await hash_password(create_user_request.Password)
+
+    await run_in_threadpool(insert_user, create_user_request, hashed_pw)
     
     return {'Message': "user creation success"}
 
 
 # tells us our response will be of Type token we have defined
 @router.post('/token', response_model=Token)
-async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
-    user = authenticate_user(form_data.username, form_data.password)
-    print(user)
+async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()], request: Request):
+    # before the user lookup, so hammering a missing account costs as much as a real one
+    rate_limit('login', request, form_data.username)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="could not validate user - 2")
-    token = create_access_token( user['email'] , user['role'], user['uid'] ,timedelta(minutes=20))
+    token = create_access_token( user['email'] , user['role'], user['uid'] ,timedelta(minutes=ACCESS_TOKEN_MINUTES))
+    refresh_token = await run_in_threadpool(issue_refresh_token, user['uid'])
 
     # the token type bearer is what helps us to check if the jwt token is correct
-    return {'access_token': token, 'token_type': 'bearer'}
+    return {'access_token': token, 'token_type': 'bearer',
+            'expires_in': int(ACCESS_TOKEN_MINUTES * 60), 'refresh_token': refresh_token}
+
+
+# Renews an access token without the password: one indexed lookup, no bcrypt
+@router.post('/refresh', response_model=Token)
+async def refresh_access_token(refresh_request: RefreshRequest):
+    refresh_token, uid, email = await run_in_threadpool(rotate_refresh_token, refresh_request.refresh_token)
+    # the role is cached, and re-reading it picks up role changes since login
+    role = await run_in_threadpool(get_user_role, uid)
+    token = create_access_token(email, role, uid, timedelta(minutes=ACCESS_TOKEN_MINUTES))
+    return {'access_token': token, 'token_type': 'bearer',
+            'expires_in': int(ACCESS_TOKEN_MINUTES * 60), 'refresh_token': refresh_token}
@@ -1,76 +1,174 @@
-from fastapi import APIRouter, HTTPException, status
-from deps import user_dependancy
-from db import execute_query
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from deps import driver_dependancy
+from db import execute_query, transaction
+from pydantic import BaseModel
+from typing import List, Optional
+from utils.projection import columns, as_dicts
+from routers.order import OrderOut, NearbyOrder, pending_orders
+from utils.pagination import keyset_page, estimate_rows, set_page_headers, limit_query, after_query, total_query, DEFAULT_LIMIT
+from utils.pagination import sync_page, set_sync_header, updated_since_query
+from utils.events import publish_order_event, ORDER_CLAIMED, ORDER_COMPLETED
+from utils.dispatch import MAX_RADIUS_KM
+from utils.analytics import record_order_completed
 
 router = APIRouter(prefix="/driver", tags=["driver"])
 
+class BatchClaimRequest(BaseModel):
+    KitchenID: int
+    OrderIDs: List[int]
+
+class BatchClaimResult(BaseModel):
+    Claimed: List[int]
+    Unavailable: List[int]
+
 # ------------------- Get Pending Orders -------------------
-@router.get("/orders", status_code=status.HTTP_200_OK)
-def get_orders(status: str, user: user_dependancy):
-    if user["role"] != "driver":
-        raise HTTPException(status_code=403, detail="Only drivers can view this route")
+@router.get("/orders", status_code=status.HTTP_200_OK, response_model=List[OrderOut])
+def get_orders(user: driver_dependancy, response: Response,
+               status: Optional[str] = None,
+               kitchen_id: Optional[int] = None,
+               placed_after: Optional[datetime] = None, placed_before: Optional[datetime] = None,
+               updated_since: updated_since_query = None,
+               limit: limit_query = DEFAULT_LIMIT, after: after_query = None,
+               include_total: total_query = False):
+    """Orders with the given status, one page at a time: oldest first for
+    Pending, newest first for Claimed and Completed.
 
-    if status not in ["Pending", "Claimed", "Completed"]:
+    Pass `updated_since` (first time: any timestamp; afterwards: the X-Sync-Cursor
+    header) to get only orders changed since then. `status` is optional in that
+    mode, so orders that left the list you are tracking come back too.
+    """
+    if updated_since is None and status is None:
+        raise HTTPException(status_code=400, detail="status is required unless updated_since is given")
+    if status is not None and status not in ["Pending", "Claimed", "Completed"]:
         raise HTTPException(status_code=400, detail="Invalid status")
+    if updated_since is not None and after is not None:
+        raise HTTPException(status_code=400, detail="Use either after or updated_since, not both")
+
+    query = f"SELECT {columns(OrderOut)} FROM ORDERS"
+    conditions, params = [], []
+    if status is not None:
+        conditions.append("Status = %s")
+        params.append(status)
+    if kitchen_id is not None:
+        conditions.append("KitchenID = %s")
+        params.append(kitchen_id)
+    if placed_after is not None:
+        conditions.append("CreatedAt >= %s")
+        params.append(placed_after)
+    if placed_before is not None:
+        conditions.append("CreatedAt < %s")
+        params.append(placed_before)
+
+    if updated_since is not None:
+        orders, next_cursor = sync_page(query, 'UpdatedAt', 'OrderID', conditions, params, updated_since, limit,
+                                        time_index=list(OrderOut.model_fields).index('UpdatedAt'))
+        set_sync_header(response, next_cursor)
+        next_after = None
+    else:
+        # Claimed and Completed are history: newest first, so the first page is the recent work
+        orders, next_after = keyset_page(query, 'OrderID', conditions, params, limit, after,
+                                         descending=status in ("Claimed", "Completed"))
+    set_page_headers(response, next_after, estimate_rows(query, conditions, params) if include_total else None)
 
-    query = "SELECT OrderID, TotalPrice, CustomerUID, KitchenID, DriverUID, ETA, Status FROM ORDERS WHERE Status = %s"
-    orders = execute_query(query, (status,), fetch=True)
+    return as_dicts(OrderOut, orders)
 
-    return [
-        {
-            "OrderID": row[0],
-            "TotalPrice": row[1],
-            "CustomerUID": row[2],
-            "KitchenID": row[3],
-            "DriverUID": row[4],
-            "ETA": row[5],
-            "Status": row[6],
-        }
-        for row in orders
-    ]
+
+# ------------------- Nearest Pending Orders -------------------
+@router.get("/orders/nearby", status_code=status.HTTP_200_OK, response_model=List[NearbyOrder])
+def get_nearby_orders(user: driver_dependancy,
+                      lat: float = Query(ge=-90, le=90), lon: float = Query(ge=-180, le=180),
+                      radius_km: float = Query(5, gt=0, le=MAX_RADIUS_KM),
+                      limit: int = Query(20, ge=1, le=100)):
+    """Closest pending orders by pickup (kitchen) distance, nearest first.
+
+    Served from an in-memory grid index; kitchens without coordinates are not included.
+    """
+    hits = pending_orders.nearest(lat, lon, limit, radius_km)
+    return [{**order, "DistanceKm": round(distance, 3)} for distance, _, order in hits]
 
 
 # ------------------- Claim an Order -------------------
 @router.post("/orders/{order_id}/claim", status_code=status.HTTP_200_OK)
-def claim_order(order_id: int, user: user_dependancy):
-    if user['role'] != 'driver':
-        raise HTTPException(status_code=403, detail="Only drivers can claim orders")
+def claim_order(order_id: int, user: driver_dependancy):
+    # Compare-and-set: only a Pending order can be claimed, so when several drivers
+    # race for the same order exactly one UPDATE changes a row
+    update_query = "UPDATE ORDERS SET Status = 'Claimed', DriverUID = %s WHERE OrderID = %s AND Status = 'Pending'"
+    with transaction() as cursor:
+        if cursor.execute(update_query, (user['uid'], order_id)) == 1:
+            cursor.execute("SELECT KitchenID, CustomerUID FROM ORDERS WHERE OrderID = %s", (order_id,))
+            kitchen_id, customer_uid = cursor.fetchone()
+        else:
+            kitchen_id = None
+
+    if kitchen_id is not None:
+        pending_orders.remove(order_id)
+        publish_order_event(ORDER_CLAIMED, order_id, kitchen_id, customer_uid, user['uid'], 'Claimed')
+        return {"message": "Order claimed successfully"}
 
-    # Check order status
+    # Lost the race or bad ID; work out which for the error message
     check_query = "SELECT Status FROM ORDERS WHERE OrderID = %s"
     result = execute_query(check_query, (order_id,), fetch=True)
-
     if not result:
         raise HTTPException(status_code=404, detail="Order not found")
-    if result[0][0] != 'Pending':
-        raise HTTPException(status_code=400, detail="Order has already been claimed or completed")
+    raise HTTPException(status_code=400, detail="Order has already been claimed or completed")
+
+# ------------------- Claim Several Orders -------------------
+@router.post("/orders/claim", status_code=status.HTTP_200_OK, response_model=BatchClaimResult)
+def claim_orders(claim: BatchClaimRequest, user: driver_dependancy):
+    order_ids = list(dict.fromkeys(claim.OrderIDs))
+    if not order_ids:
+        raise HTTPException(status_code=400, detail="No orders given")
+
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    with transaction() as cursor:
+        # Lock the ones that are still Pending at this kitchen; a driver racing us for
+        # the same orders waits here and then no longer sees them as Pending
+        cursor.execute(
+            f"""
+            SELECT OrderID, CustomerUID FROM ORDERS
+            WHERE KitchenID = %s AND Status = 'Pending' AND OrderID IN ({placeholders})
+            FOR UPDATE
+            """,
+            (claim.KitchenID, *order_ids)
+        )
+        claimed = dict(cursor.fetchall())
+        if claimed:
+            # exactly the rows locked above, so only they are reported and announced
+            locked = ", ".join(["%s"] * len(claimed))
+            cursor.execute(
+                f"UPDATE ORDERS SET Status = 'Claimed', DriverUID = %s WHERE OrderID IN ({locked})",
+                (user['uid'], *claimed)
+            )
+
+    for order_id, customer_uid in claimed.items():
+        pending_orders.remove(order_id)
+        publish_order_event(ORDER_CLAIMED, order_id, claim.KitchenID, customer_uid, user['uid'], 'Claimed')
 
-    # Update to claimed
-    update_query = "UPDATE ORDERS SET Status = 'Claimed', DriverUID = (SELECT UID FROM USERS WHERE Email = %s) WHERE OrderID = %s"
-    execute_query(update_query, (user['email'], order_id))
-    return {"message": "Order claimed successfully"}
+    return {
+        "Claimed": [order_id for order_id in order_ids if order_id in claimed],
+        "Unavailable": [order_id for order_id in order_ids if order_id not in claimed],
+    }
 
 # ------------------- Complete an Order -------------------
 @router.post("/orders/{order_id}/complete", status_code=status.HTTP_200_OK)
-def complete_order(order_id: int, user: user_dependancy):
-    if user['role'] != 'driver':
-        raise HTTPException(status_code=403, detail="Only drivers can complete orders")
-
-    # Check order and ownership
-    check_query = """
-        SELECT Status, DriverUID FROM ORDERS 
-        WHERE OrderID = %s AND DriverUID = (SELECT UID FROM USERS WHERE Email = %s)
-    """
-    result = execute_query(check_query, (order_id, user['email']), fetch=True)
+def complete_order(order_id: int, user: driver_dependancy):
+    # Only the driver holding a Claimed order can complete it
+    update_query = "UPDATE ORDERS SET Status = 'Completed' WHERE OrderID = %s AND DriverUID = %s AND Status = 'Claimed'"
+    with transaction() as cursor:
+        if cursor.execute(update_query, (order_id, user['uid'])) == 1:
+            cursor.execute("SELECT KitchenID, CustomerUID FROM ORDERS WHERE OrderID = %s", (order_id,))
+            kitchen_id, customer_uid = cursor.fetchone()
+            record_order_completed(cursor, order_id)
+        else:
+            kitchen_id = None
+
+    if kitchen_id is not None:
+        publish_order_event(ORDER_COMPLETED, order_id, kitchen_id, customer_uid, user['uid'], 'Completed')
+        return {"message": "Order marked as completed"}
 
+    check_query = "SELECT Status FROM ORDERS WHERE OrderID = %s AND DriverUID = %s"
+    result = execute_query(check_query, (order_id, user['uid']), fetch=True)
     if not result:
         raise HTTPException(status_code=403, detail="Order is not assigned to you or doesn't exist")
-
-    status_now, _ = result[0]
-    if status_now != 'Claimed':
-        raise HTTPException(status_code=400, detail="Order must be claimed before completing")
-
-    # Update to completed
-    update_query = "UPDATE ORDERS SET Status = 'Completed' WHERE OrderID = %s"
-    execute_query(update_query, (order_id,))
-    return {"message": "Order marked as completed"}
+    raise HTTPException(status_code=400, detail="Order must be claimed before completing")
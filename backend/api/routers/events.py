@@ -0,0 +1,73 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from deps import user_dependancy
+from utils.events import broker, format_sse, ORDER_PLACED, ORDER_CLAIMED, ORDER_RELEASED
+from utils.verify_owner import get_owned_kitchens, verify_owner
+
+router = APIRouter(prefix='/events', tags=['events'])
+
+# comment lines keep proxies from timing out idle streams
+HEARTBEAT_SECONDS = 15
+
+
+def _order_filter(user: dict, kitchens: Optional[frozenset]):
+    role, uid = user['role'], user['uid']
+
+    def in_scope(event):
+        return kitchens is None or event['KitchenID'] in kitchens
+
+    if role in ('admin', 'owner'):
+        return in_scope
+    if role == 'driver':
+        # every new or released order is an offer, every claim retracts one; completions only matter to the driver holding the order
+        return lambda event: in_scope(event) and (
+            event['type'] in (ORDER_PLACED, ORDER_CLAIMED, ORDER_RELEASED) or event['DriverUID'] == uid
+        )
+    if role == 'customer':
+        return lambda event: in_scope(event) and event['CustomerUID'] == uid
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='No order feed for this role')
+
+
+# ------------------- Order lifecycle stream (Server-Sent Events) -------------------
+@router.get('/orders', status_code=status.HTTP_200_OK)
+async def stream_order_events(user: user_dependancy, kitchen_id: Optional[int] = None):
+    """Pushes order.placed / order.claimed / order.completed / order.released events instead of making clients poll.
+
+    Owners only see their own kitchens; everyone can narrow the feed with `kitchen_id`.
+    An owner's set of kitchens is fixed when the stream opens: a kitchen created
+    later shows up after the client reconnects.
+    """
+    kitchens = None if kitchen_id is None else frozenset([kitchen_id])
+    if user['role'] == 'owner':
+        if kitchens is not None:
+            # re-checks the database before refusing, like every other owner route
+            await run_in_threadpool(verify_owner, user['uid'], kitchen_id)
+        else:
+            kitchens = await run_in_threadpool(get_owned_kitchens, user['uid'])
+
+    sub = broker.subscribe(_order_filter(user, kitchens))
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    # fell too far behind; the client should reconnect and refetch
+                    yield "event: overflow\ndata: {}\n\n"
+                    break
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
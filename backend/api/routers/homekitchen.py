@@ -1,10 +1,19 @@
-from fastapi import APIRouter, HTTPException, status
+from datetime import date, timedelta
+from fastapi import APIRouter, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from deps import user_dependancy, owner_dependancy
-from db import execute_query
-from pydantic import BaseModel
-from typing import Optional, List
-from utils.userRole import get_user_role
-from utils.verify_owner import verify_owner
+from db import execute_query, transaction
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from utils.projection import columns, as_dicts
+from routers.order import OrderOut
+from utils.pagination import keyset_page, estimate_rows, set_page_headers, limit_query, after_query, total_query, DEFAULT_LIMIT
+from utils.pagination import sync_page, set_sync_header, updated_since_query
+from utils.response_cache import cached_read, invalidate_kitchen
+from utils.verify_owner import verify_owner, invalidate_owned_kitchens, get_owned_kitchens
+from utils.search import SearchService
+from utils.analytics import daily_sales, top_items, today as analytics_today
+from utils.menu_io import read_rows, upsert_batch, export_lines, IMPORT_BATCH, MAX_REPORTED_ERRORS
 
 router = APIRouter(
     prefix='/homekitchens',
@@ -35,53 +44,188 @@ class HomeKitchenCreate(BaseModel):
     VerifiedBy: Optional[int] = None
     ApprovalStatus: str = None
     Logo: Optional[str] = None
+    Latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    Longitude: Optional[float] = Field(default=None, ge=-180, le=180)
 
+# Response models list their fields in the order the columns are selected
+class HomeKitchenOut(BaseModel):
+    KitchenID: int
+    OwnerUID: int
+    Name: str
+    Address: Optional[str] = None
+    AverageRating: Optional[float] = None
+    VerifiedBy: Optional[int] = None
+    ApprovalStatus: Optional[str] = None
+    Logo: Optional[str] = None
+    Latitude: Optional[float] = None
+    Longitude: Optional[float] = None
 
+class MenuItemOut(BaseModel):
+    ItemID: int
+    KitchenID: int
+    Name: str
+    Description: Optional[str] = None
+    Price: float
+    Image: Optional[str] = None
 
-@router.get('/', status_code=status.HTTP_200_OK)
-def return_homeKitchens(user: user_dependancy):
-    query='SELECT * FROM HOMEKITCHENS'
-    homekitchens = execute_query(query=query,fetch=True)
-    return homekitchens
+class MealPlanOut(BaseModel):
+    MealPlanID: int
+    KitchenID: int
+    Name: str
+    TotalPrice: float
+    Image: Optional[str] = None
 
+class MealPlanCreated(BaseModel):
+    message: str
+    MealPlanID: int
 
-@router.post('/', status_code=status.HTTP_201_CREATED)
-def make_homekitchen( create_kitchen_request: HomeKitchenCreate ,user: user_dependancy, owner: owner_dependancy):
-    # Get OwnerUID (assuming it's the UserID from USERS table)
-    owner_uid_query = "SELECT UID FROM USERS WHERE Email = %s"
-    owner_uid_result = execute_query(owner_uid_query, (user['email'],), fetch=True)
+class SearchHit(BaseModel):
+    Type: Literal['kitchen', 'item']
+    KitchenID: int
+    ItemID: Optional[int] = None
+    Name: str
+    Description: Optional[str] = None
+    Price: Optional[float] = None
+    KitchenName: Optional[str] = None
+    AverageRating: Optional[float] = None
+    Score: float
+
+class MenuImportError(BaseModel):
+    Row: int
+    Error: str
+
+class MenuImportResult(BaseModel):
+    Inserted: int
+    Updated: int
+    Failed: int
+    Errors: List[MenuImportError]
+    ErrorsTruncated: bool
+
+# Field order matches the rollup SELECTs in utils/analytics.py
+class DailySales(BaseModel):
+    Day: date
+    OrdersPlaced: int
+    PlacedRevenue: float
+    OrdersCompleted: int
+    CompletedRevenue: float
+
+class ItemSales(BaseModel):
+    ItemID: int
+    Name: Optional[str] = None
+    Sold: int
+
+class SalesAnalytics(BaseModel):
+    KitchenID: int
+    Start: date
+    End: date
+    OrdersPlaced: int
+    PlacedRevenue: float
+    OrdersCompleted: int
+    CompletedRevenue: float
+    Days: List[DailySales]
+    TopItems: List[ItemSales]
+
+# ------------------- Search index -------------------
+SEARCH_LOAD_BATCH = 5000
+
+def _load_search_index(index):
+    # walk both tables in primary key order so no single statement reads everything at once
+    after = 0
+    while True:
+        rows = execute_query(
+            "SELECT KitchenID, Name, AverageRating FROM HOMEKITCHENS WHERE KitchenID > %s ORDER BY KitchenID LIMIT %s",
+            (after, SEARCH_LOAD_BATCH), fetch=True)
+        for kitchen_id, name, rating in rows:
+            index.add_kitchen(kitchen_id, name, float(rating) if rating is not None else None)
+        if len(rows) < SEARCH_LOAD_BATCH:
+            break
+        after = rows[-1][0]
+
+    after = 0
+    while True:
+        rows = execute_query(
+            "SELECT ItemID, KitchenID, Name, Description, Price FROM MENUITEMS WHERE ItemID > %s ORDER BY ItemID LIMIT %s",
+            (after, SEARCH_LOAD_BATCH), fetch=True)
+        for item_id, kitchen_id, name, description, price in rows:
+            index.add_item(item_id, kitchen_id, name, description, float(price) if price is not None else None)
+        if len(rows) < SEARCH_LOAD_BATCH:
+            break
+        after = rows[-1][0]
+
+# kept current by make_homekitchen and the menu item routes below
+search_index = SearchService(_load_search_index)
+
+
+@router.get('/', status_code=status.HTTP_200_OK, response_model=List[HomeKitchenOut])
+def return_homeKitchens(user: user_dependancy, response: Response,
+                        approval_status: Optional[str] = None,
+                        limit: limit_query = DEFAULT_LIMIT, after: after_query = None,
+                        include_total: total_query = False):
+    """List kitchens ordered by KitchenID, one page at a time.
+
+    `approval_status` is either an exact ApprovalStatus or `pending` for anything not yet approved or rejected.
+    """
+    query = f'SELECT {columns(HomeKitchenOut)} FROM HOMEKITCHENS'
+    conditions, params = [], []
+    if approval_status == 'pending':
+        conditions.append("ApprovalStatus IS NULL OR ApprovalStatus NOT IN ('approved', 'rejected')")
+    elif approval_status is not None:
+        conditions.append("ApprovalStatus = %s")
+        params.append(approval_status)
+
+    homekitchens, next_after = keyset_page(query, 'KitchenID', conditions, params, limit, after)
+    set_page_headers(response, next_after, estimate_rows(query, conditions, params) if include_total else None)
+    return as_dicts(HomeKitchenOut, homekitchens)
+
+
+@router.get('/search', status_code=status.HTTP_200_OK, response_model=List[SearchHit])
+def search(user: user_dependancy, q: str = Query(min_length=1, max_length=200),
+           type: Optional[Literal['kitchen', 'item']] = None,
+           limit: int = Query(20, ge=1, le=100)):
+    """Search kitchen names and menu item names/descriptions.
+
+    Every word has to match, as a whole word, a prefix or with one typo. Best matches
+    come first, ties go to the better-rated kitchen.
+    """
+    return search_index.search(q, limit, type)
 
-    if not owner_uid_result:
-        raise HTTPException(status_code=400, detail="Owner not found")
 
-    owner_uid = owner_uid_result[0][0]
-    if get_user_role(owner_uid) != 'owner':
-        raise HTTPException(status_code=401, detail="Not an owner")
+@router.post('/', status_code=status.HTTP_201_CREATED)
+def make_homekitchen( create_kitchen_request: HomeKitchenCreate ,user: owner_dependancy):
+    # OwnerUID comes straight from the token; owner_dependancy already checked the role
+    owner_uid = user['uid']
 
         # Insert into HOMEKITCHENS table
     insert_query = """
         INSERT INTO HOMEKITCHENS (
-            OwnerUID, Name, Address, AverageRating, VerifiedBy, ApprovalStatus, Logo
+            OwnerUID, Name, Address, AverageRating, VerifiedBy, ApprovalStatus, Logo, Latitude, Longitude
         )
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
     """
 
-    execute_query(insert_query, (
-        owner_uid,
-        create_kitchen_request.Name,
-        create_kitchen_request.Address,
-        create_kitchen_request.AverageRating,
-        create_kitchen_request.VerifiedBy,
-        create_kitchen_request.ApprovalStatus,
-        create_kitchen_request.Logo
-    ))
+    with transaction() as cursor:
+        cursor.execute(insert_query, (
+            owner_uid,
+            create_kitchen_request.Name,
+            create_kitchen_request.Address,
+            create_kitchen_request.AverageRating,
+            create_kitchen_request.VerifiedBy,
+            create_kitchen_request.ApprovalStatus,
+            create_kitchen_request.Logo,
+            create_kitchen_request.Latitude,
+            create_kitchen_request.Longitude
+        ))
+        kitchen_id = cursor.lastrowid
+    invalidate_owned_kitchens(owner_uid)
+    search_index.add_kitchen(kitchen_id, create_kitchen_request.Name, create_kitchen_request.AverageRating)
 
     return {"message": "HomeKitchen created successfully"}
 
-@router.get('/{kitchen_id}/mealplans', status_code=status.HTTP_200_OK)
-def get_mealplans_for_kitchen(kitchen_id: int, user: user_dependancy):
-    query = "SELECT * FROM MEALPLANS WHERE KitchenID = %s"
-    mealplans = execute_query(query, (kitchen_id,), fetch=True)
+@router.get('/{kitchen_id}/mealplans', status_code=status.HTTP_200_OK, response_model=List[MealPlanOut])
+def get_mealplans_for_kitchen(kitchen_id: int, user: user_dependancy, request: Request, response: Response):
+    query = f"SELECT {columns(MealPlanOut)} FROM MEALPLANS WHERE KitchenID = %s"
+    mealplans = cached_read(request, response, kitchen_id, ('mealplans',),
+                            lambda: as_dicts(MealPlanOut, execute_query(query, (kitchen_id,), fetch=True)))
 
     if not mealplans:
         raise HTTPException(status_code=404, detail="No meal plans found for this kitchen")
@@ -89,115 +233,251 @@ def get_mealplans_for_kitchen(kitchen_id: int, user: user_dependancy):
     return mealplans
 
 
-@router.get('/{kitchen_id}/menuitems', status_code=status.HTTP_200_OK, summary="Get menu items")
-def get_menu_items_for_kitchen(kitchen_id: int, user: user_dependancy):
+@router.get('/{kitchen_id}/menuitems', status_code=status.HTTP_200_OK, summary="Get menu items", response_model=List[MenuItemOut])
+def get_menu_items_for_kitchen(kitchen_id: int, user: user_dependancy, request: Request, response: Response):
     """Get menu items of a specific kitchen
 
+    Served from the read cache; send If-None-Match with the last ETag to get a 304.
     """
-    query = "SELECT * FROM MENUITEMS WHERE KitchenID = %s"
-    mealplans = execute_query(query, (kitchen_id,), fetch=True)
+    query = f"SELECT {columns(MenuItemOut)} FROM MENUITEMS WHERE KitchenID = %s"
+    menu_items = cached_read(request, response, kitchen_id, ('menuitems',),
+                             lambda: as_dicts(MenuItemOut, execute_query(query, (kitchen_id,), fetch=True)))
 
-    if not mealplans:
-        raise HTTPException(status_code=404, detail="No meal plans found for this kitchen")
+    if not menu_items:
+        raise HTTPException(status_code=404, detail="No menu items found for this kitchen")
 
-    return mealplans
+    return menu_items
 
 # ------------------- Get MealPlan Items -------------------
-@router.get("/{kitchen_id}/{mealplan_id}/items", status_code=status.HTTP_200_OK)
-def get_mealplan_items(kitchen_id: int,mealplan_id: int, user: user_dependancy):
-    query = """
-        SELECT MENUITEMS.* FROM MEALPLANITEMS
+@router.get("/{kitchen_id}/{mealplan_id}/items", status_code=status.HTTP_200_OK, response_model=List[MenuItemOut])
+def get_mealplan_items(kitchen_id: int,mealplan_id: int, user: user_dependancy, request: Request, response: Response):
+    query = f"""
+        SELECT {columns(MenuItemOut, 'MENUITEMS')} FROM MEALPLANITEMS
         JOIN MENUITEMS ON MEALPLANITEMS.ItemID = MENUITEMS.ItemID
-        WHERE MEALPLANITEMS.MealPlanID = %s
+        WHERE MEALPLANITEMS.MealPlanID = %s AND MEALPLANITEMS.KitchenID = %s
     """
-    items = execute_query(query, (mealplan_id,), fetch=True)
+    items = cached_read(request, response, kitchen_id, ('mealplanitems', mealplan_id),
+                        lambda: as_dicts(MenuItemOut, execute_query(query, (mealplan_id, kitchen_id), fetch=True)))
     if not items:
         raise HTTPException(status_code=404, detail="No items found for this meal plan")
     return items
 
 # ------------------- Create Meal Plan -------------------
-@router.post("/{kitchen_id}/mealplans", status_code=status.HTTP_201_CREATED)
+@router.post("/{kitchen_id}/mealplans", status_code=status.HTTP_201_CREATED, response_model=MealPlanCreated)
 def create_mealplan(kitchen_id: int, mealplan: MealPlanCreate, user: user_dependancy):
-    verify_owner(user['email'], kitchen_id)
-
-    # Validate all menu items exist and belong to this kitchen
-    for item in mealplan.Items:
-        validation_query = "SELECT * FROM MENUITEMS WHERE ItemID = %s AND KitchenID = %s"
-        result = execute_query(validation_query, (item.ItemID, kitchen_id), fetch=True)
-        if not result:
-            raise HTTPException(status_code=400, detail=f"Menu item {item.ItemID} does not exist in this kitchen")
-
-
-    insert_query = """
-        INSERT INTO MEALPLANS (KitchenID, Name, TotalPrice, Image)
-        VALUES (%s, %s, %s, %s)
-    """
-    execute_query(insert_query, (kitchen_id, mealplan.Name, mealplan.TotalPrice, mealplan.Image))
-
-    # Get newly inserted MealPlanID
-    get_mealplan_id = "SELECT MealPlanID FROM MEALPLANS WHERE KitchenID = %s AND Name = %s ORDER BY MealPlanID DESC LIMIT 1"
-    mealplan_id = execute_query(get_mealplan_id, (kitchen_id, mealplan.Name), fetch=True)[0][0]
-
-    # Insert each item into MEALPLANITEMS
-    for item in mealplan.Items:
-        execute_query("INSERT INTO MEALPLANITEMS (KitchenID, MealPlanID, ItemID) VALUES (%s, %s, %s)", (kitchen_id, mealplan_id, item.ItemID))
-
-    return {"message": "Meal plan created successfully"}
+    verify_owner(user['uid'], kitchen_id)
+
+    item_ids = list(dict.fromkeys(item.ItemID for item in mealplan.Items))
+
+    with transaction() as cursor:
+        # Validate all menu items exist and belong to this kitchen, in one query
+        if item_ids:
+            placeholders = ", ".join(["%s"] * len(item_ids))
+            validation_query = f"SELECT ItemID FROM MENUITEMS WHERE KitchenID = %s AND ItemID IN ({placeholders})"
+            cursor.execute(validation_query, (kitchen_id, *item_ids))
+            found = {row[0] for row in cursor.fetchall()}
+            missing = [item_id for item_id in item_ids if item_id not in found]
+            if missing:
+                raise HTTPException(status_code=400, detail=f"Menu items {', '.join(map(str, missing))} do not exist in this kitchen")
+
+        insert_query = """
+            INSERT INTO MEALPLANS (KitchenID, Name, TotalPrice, Image)
+            VALUES (%s, %s, %s, %s)
+        """
+        cursor.execute(insert_query, (kitchen_id, mealplan.Name, mealplan.TotalPrice, mealplan.Image))
+        mealplan_id = cursor.lastrowid
+
+        # Insert all items into MEALPLANITEMS with one multi-row INSERT
+        if item_ids:
+            cursor.executemany(
+                "INSERT INTO MEALPLANITEMS (KitchenID, MealPlanID, ItemID) VALUES (%s, %s, %s)",
+                [(kitchen_id, mealplan_id, item_id) for item_id in item_ids]
+            )
+
+    invalidate_kitchen(kitchen_id)
+    return {"message": "Meal plan created successfully", "MealPlanID": mealplan_id}
 
 # ------------------- Delete Meal Plan -------------------
 @router.delete("/{kitchen_id}/mealplans/{mealplan_id}", status_code=status.HTTP_200_OK)
 def delete_mealplan(kitchen_id: int, mealplan_id: int, user: user_dependancy):
-    verify_owner(user['email'], kitchen_id)
+    verify_owner(user['uid'], kitchen_id)
 
-    # Delete associated meal plan items first
-    delete_items_query = "DELETE FROM MEALPLANITEMS WHERE MealPlanID = %s AND KitchenID = %s"
-    execute_query(delete_items_query, (mealplan_id, kitchen_id))
+    with transaction() as cursor:
+        # Delete associated meal plan items first
+        delete_items_query = "DELETE FROM MEALPLANITEMS WHERE MealPlanID = %s AND KitchenID = %s"
+        cursor.execute(delete_items_query, (mealplan_id, kitchen_id))
 
+        delete_plan_query = "DELETE FROM MEALPLANS WHERE MealPlanID = %s AND KitchenID = %s"
+        cursor.execute(delete_plan_query, (mealplan_id, kitchen_id))
 
-    delete_plan_query = "DELETE FROM MEALPLANS WHERE MealPlanID = %s AND KitchenID = %s"
-    execute_query(delete_plan_query, (mealplan_id, kitchen_id))
-
+    invalidate_kitchen(kitchen_id)
     return {"message": "Meal plan and its items deleted"}
 
 # ------------------- Create Menu Item -------------------
 @router.post("/{kitchen_id}/menuitems", status_code=status.HTTP_201_CREATED, summary="make menu items",  description="Allows a kitchen owner to create a new menu item for their kitchen.")
 def create_menu_item(kitchen_id: int, item: MenuItemCreate, user: user_dependancy):
-    verify_owner(user['email'], kitchen_id)
+    verify_owner(user['uid'], kitchen_id)
     query = """
         INSERT INTO MENUITEMS (KitchenID, Name, Description, Price, Image)
         VALUES (%s, %s, %s, %s, %s)
     """
-    execute_query(query, (kitchen_id, item.Name, item.Description, item.Price, item.Image))
+    with transaction() as cursor:
+        cursor.execute(query, (kitchen_id, item.Name, item.Description, item.Price, item.Image))
+        item_id = cursor.lastrowid
+    invalidate_kitchen(kitchen_id)
+    search_index.add_item(item_id, kitchen_id, item.Name, item.Description, item.Price)
     return {"message": "Menu item created successfully"}
 
 # ------------------- Delete Menu Item -------------------
 @router.delete("/{kitchen_id}/menuitems/{item_id}", status_code=status.HTTP_200_OK)
 def delete_menu_item(kitchen_id: int, item_id: int, user: user_dependancy):
-    verify_owner(user['email'], kitchen_id)
+    verify_owner(user['uid'], kitchen_id)
     query = "DELETE FROM MENUITEMS WHERE ItemID = %s AND KitchenID = %s"
-    execute_query(query, (item_id, kitchen_id))
+    if execute_query(query, (item_id, kitchen_id)):
+        search_index.remove_item(item_id)
+    invalidate_kitchen(kitchen_id)
     return {"message": "Menu item deleted"}
 
-# -------------- Get pending orders -------------
-@router.get("/pending", status_code=status.HTTP_200_OK)
-def get_pending_orders_for_owner(user: user_dependancy):
-    if user['role'] != 'owner':
-        raise HTTPException(status_code=403, detail="Only kitchen owners can view this route")
+# ------------------- Bulk Menu Import / Export -------------------
+@router.post("/{kitchen_id}/menuitems/import", status_code=status.HTTP_200_OK, response_model=MenuImportResult)
+def import_menu_items(kitchen_id: int, file: UploadFile, user: user_dependancy,
+                      format: Optional[Literal['csv', 'jsonl']] = None):
+    """Create or update many menu items from a CSV (with a header row) or JSON Lines file.
 
-    # Get UID
-    owner_uid = user['uid']
-
-    # Get KitchenID for this owner
-    kitchen_query = "SELECT KitchenID FROM HOMEKITCHENS WHERE OwnerUID = %s"
-    kitchen_result = execute_query(kitchen_query, (owner_uid,), fetch=True)
+    Columns: ItemID (optional), Name, Description, Price, Image. A row with an ItemID
+    updates that item, otherwise the item with the same Name is updated or a new one
+    is added. Rows are saved in batches; rows that fail are listed with their line number.
+    """
+    verify_owner(user['uid'], kitchen_id)
+    fmt = format or ('jsonl' if (file.filename or '').lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+
+    counts = {"Inserted": 0, "Updated": 0, "Failed": 0}
+    errors = []
+
+    def report(line, message):
+        counts["Failed"] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"Row": line, "Error": message})
+
+    def flush(batch):
+        try:
+            written, batch_errors = upsert_batch(kitchen_id, batch)
+        except HTTPException as e:
+            # the whole batch was rolled back; earlier batches stay saved
+            for line, _ in batch:
+                report(line, f"not saved: {e.detail}")
+            return
+        for line, message in batch_errors:
+            report(line, message)
+        for item_id, row, inserted in written:
+            counts["Inserted" if inserted else "Updated"] += 1
+            search_index.add_item(item_id, kitchen_id, row.Name, row.Description, row.Price)
+        invalidate_kitchen(kitchen_id)
+
+    # UploadFile has already spooled the body to disk; this reads it back a row at a time
+    batch = []
+    for line, row, error in read_rows(file.file, fmt):
+        if error is not None:
+            report(line, error)
+            continue
+        batch.append((line, row))
+        if len(batch) >= IMPORT_BATCH:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return {**counts, "Errors": errors, "ErrorsTruncated": counts["Failed"] > len(errors)}
+
+
+@router.get("/{kitchen_id}/menuitems/export", status_code=status.HTTP_200_OK)
+def export_menu_items(kitchen_id: int, user: user_dependancy, format: Literal['csv', 'jsonl'] = 'csv'):
+    """Stream the whole menu in the same format the import endpoint reads."""
+    verify_owner(user['uid'], kitchen_id)
+    media_type = 'application/x-ndjson' if format == 'jsonl' else 'text/csv; charset=utf-8'
+    return StreamingResponse(
+        export_lines(kitchen_id, format), media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="menu-{kitchen_id}.{format}"'}
+    )
+
+# ------------------- Sales Analytics (Owner) -------------------
+MAX_ANALYTICS_DAYS = 366
+
+@router.get("/{kitchen_id}/analytics", status_code=status.HTTP_200_OK, response_model=SalesAnalytics)
+def get_sales_analytics(kitchen_id: int, user: user_dependancy,
+                        start: Optional[date] = None, end: Optional[date] = None,
+                        top: int = Query(10, ge=1, le=100)):
+    """Orders and revenue per day plus the best-selling items, by the day orders were placed.
+
+    Defaults to the last 30 days up to today on the database clock. Read from the sales rollups, never from ORDERS.
+    """
+    verify_owner(user['uid'], kitchen_id)
+    end = end or analytics_today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ANALYTICS_DAYS} days per request")
+
+    days = as_dicts(DailySales, daily_sales(kitchen_id, start, end))
+    return {
+        "KitchenID": kitchen_id,
+        "Start": start,
+        "End": end,
+        "OrdersPlaced": sum(d["OrdersPlaced"] for d in days),
+        "PlacedRevenue": sum(d["PlacedRevenue"] for d in days),
+        "OrdersCompleted": sum(d["OrdersCompleted"] for d in days),
+        "CompletedRevenue": sum(d["CompletedRevenue"] for d in days),
+        "Days": days,
+        "TopItems": as_dicts(ItemSales, top_items(kitchen_id, start, end, top)),
+    }
 
-    if not kitchen_result:
+# -------------- Get pending orders -------------
+@router.get("/pending", status_code=status.HTTP_200_OK, response_model=List[OrderOut])
+def get_pending_orders_for_owner(user: owner_dependancy):
+    # every kitchen this owner has, in one query
+    kitchen_ids = sorted(get_owned_kitchens(user['uid']))
+    if not kitchen_ids:
         raise HTTPException(status_code=404, detail="No kitchen found for this owner")
 
-    kitchen_id = kitchen_result[0][0]
+    placeholders = ", ".join(["%s"] * len(kitchen_ids))
+    orders_query = f"SELECT {columns(OrderOut)} FROM ORDERS WHERE KitchenID IN ({placeholders}) AND Status = 'Pending'"
+    pending_orders = execute_query(orders_query, tuple(kitchen_ids), fetch=True)
 
-    # Fetch pending orders
-    orders_query = "SELECT * FROM ORDERS WHERE KitchenID = %s AND Status = 'Pending'"
-    pending_orders = execute_query(orders_query, (kitchen_id,), fetch=True)
+    return as_dicts(OrderOut, pending_orders)
 
-    return pending_orders or {"message": "No pending orders for your kitchen"}
+# -------------- Order queue (delta sync) -------------
+@router.get("/orders/queue", status_code=status.HTTP_200_OK, response_model=List[OrderOut])
+def get_order_queue_for_owner(user: owner_dependancy, response: Response,
+                              updated_since: updated_since_query = None,
+                              limit: limit_query = DEFAULT_LIMIT):
+    """Orders across all of the owner's kitchens, oldest change first.
+
+    The first call (no `updated_since`) returns the open queue: Pending and Claimed
+    orders. Pass back the X-Sync-Cursor header to get only orders placed or changed
+    since, in any status, so completed orders can be dropped from the queue. Keep
+    calling with the new cursor while a full page comes back.
+    """
+    kitchen_ids = sorted(get_owned_kitchens(user['uid']))
+    if not kitchen_ids:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(kitchen_ids))
+    conditions, params = [f"KitchenID IN ({placeholders})"], list(kitchen_ids)
+    if updated_since is None:
+        conditions.append("Status IN ('Pending', 'Claimed')")
+
+    query = f"SELECT {columns(OrderOut)} FROM ORDERS"
+    orders, next_cursor = sync_page(query, 'UpdatedAt', 'OrderID', conditions, params, updated_since, limit,
+                                    time_index=list(OrderOut.model_fields).index('UpdatedAt'))
+    set_sync_header(response, next_cursor)
+    return as_dicts(OrderOut, orders)
+
+# -------------- One kitchen -------------
+# Declared last so the fixed paths above (/search, /pending, ...) are matched first
+@router.get("/{kitchen_id}", status_code=status.HTTP_200_OK, response_model=HomeKitchenOut)
+def get_homekitchen(kitchen_id: int, user: user_dependancy):
+    rows = execute_query(f"SELECT {columns(HomeKitchenOut)} FROM HOMEKITCHENS WHERE KitchenID = %s", (kitchen_id,), fetch=True)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Kitchen not found")
+    return as_dicts(HomeKitchenOut, rows)[0]
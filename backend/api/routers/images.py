@@ -0,0 +1,27 @@
+from fastapi import APIRouter, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import Dict
+from deps import user_dependancy
+from utils.images import store_image
+
+router = APIRouter(
+    prefix='/images',
+    tags=['images']
+)
+
+class ImageStored(BaseModel):
+    Hash: str
+    URL: str
+    Variants: Dict[str, str]
+    VariantsReady: bool
+
+# ------------------- Upload an image -------------------
+@router.post('/', status_code=status.HTTP_201_CREATED, response_model=ImageStored)
+async def upload_image(file: UploadFile, user: user_dependancy):
+    """Store an image for a menu item, meal plan or kitchen logo.
+
+    Use the returned URL (or one of the width-keyed WebP variants once ready) as the Image/Logo value.
+    """
+    # file writes and Pillow's verify block, so keep them off the event loop
+    return await run_in_threadpool(store_image, file)
@@ -2,21 +2,35 @@ from fastapi import APIRouter, HTTPException, status
 from deps import user_dependancy
 from db import execute_query
 from utils.userRole import get_user_role
+from utils.projection import columns, as_dicts
+from routers.homekitchen import HomeKitchenOut
+from pydantic import BaseModel
+from typing import List, Optional
 
 router = APIRouter(
     prefix='/me',
     tags=['me']
 )
 
-@router.get("/", status_code=status.HTTP_200_OK)
+class MeOut(BaseModel):
+    UID: int
+    FirstName: str
+    LastName: str
+    PhoneNo: Optional[str] = None
+    Role: Optional[str] = None
+    # only present for the matching role
+    Addresses: Optional[List[str]] = None
+    HomeKitchens: Optional[List[HomeKitchenOut]] = None
+
+@router.get("/", status_code=status.HTTP_200_OK, response_model=MeOut, response_model_exclude_unset=True)
 def get_me(user: user_dependancy):
     # Get base user info
     user_info_query = """
         SELECT UID, FirstName, LastName, PhoneNo
         FROM USERS
-        WHERE Email = %s
+        WHERE UID = %s
     """
-    user_result = execute_query(user_info_query, (user['email'],), fetch=True)
+    user_result = execute_query(user_info_query, (user['uid'],), fetch=True)
 
     if not user_result:
         raise HTTPException(status_code=404, detail="User not found")
@@ -39,8 +53,8 @@ def get_me(user: user_dependancy):
         response["Addresses"] = [row[0] for row in addresses]
 
     elif role == "owner":
-        kitchen_query = "SELECT * FROM HOMEKITCHENS WHERE OwnerUID = %s"
+        kitchen_query = f"SELECT {columns(HomeKitchenOut)} FROM HOMEKITCHENS WHERE OwnerUID = %s"
         kitchens = execute_query(kitchen_query, (uid,), fetch=True)
-        response["HomeKitchens"] = kitchens
+        response["HomeKitchens"] = as_dicts(HomeKitchenOut, kitchens)
 
     return response
@@ -1,15 +1,20 @@
 from fastapi import APIRouter, HTTPException, status 
-from db import execute_query
-from pydantic import BaseModel
-from typing import List
-from deps import user_dependancy
+from db import execute_query, transaction
+from datetime import datetime, timedelta
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from deps import customer_dependancy
+from utils.events import publish_order_event, ORDER_PLACED
+from utils.projection import columns, as_dict
+from utils.dispatch import PendingOrderIndex
+from utils.analytics import record_order_placed
 
 router = APIRouter(prefix='/order', tags=(['order']))
 
 class OrderItem(BaseModel):
     ItemID: int
 
-    Quantity: int
+    Quantity: int = Field(default=1, ge=1)
 
 
 class OrderRequest(BaseModel):
@@ -18,30 +23,87 @@ class OrderRequest(BaseModel):
     ETA: str  # expected format: HH:MM:SS
     TotalPrice: int
 
-# ------------------- Place Order (Customer) -------------------
-@router.post("/", status_code=status.HTTP_201_CREATED)
-def place_order(order: OrderRequest, user: user_dependancy):
-    if user['role'] != 'customer':
-        raise HTTPException(status_code=403, detail="Only customers can place orders")
+# Columns are declared in SELECT order; see utils/projection.py
+class OrderOut(BaseModel):
+    OrderID: int
+    TotalPrice: float
+    CustomerUID: int
+    KitchenID: int
+    DriverUID: Optional[int] = None
+    ETA: Optional[str] = None
+    Status: str
+    UpdatedAt: Optional[datetime] = None
 
-    # Get UID of current user
-    customer_query = "SELECT UID FROM USERS WHERE Email = %s"
-    customer_uid = execute_query(customer_query, (user['email'],), fetch=True)[0][0]
+    @field_validator('ETA', mode='before')
+    @classmethod
+    def _eta_as_clock(cls, value):
+        # MySQL TIME columns come back from pymysql as timedelta
+        if isinstance(value, timedelta):
+            seconds = int(value.total_seconds())
+            return f"{seconds // 3600:02}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+        return value
 
-    total_price = order.TotalPrice
+class NearbyOrder(OrderOut):
+    DistanceKm: float
 
-   # Insert into ORDERS
-    insert_order = "INSERT INTO ORDERS (TotalPrice, ETA, CustomerUID, KitchenID, Status) VALUES (%s, %s, %s, %s, 'Pending')"
-    kitchen_id = order.KitchenID
-    execute_query(insert_order, (total_price, order.ETA, customer_uid, kitchen_id))
+class OrderPlaced(BaseModel):
+    message: str
+    OrderID: int
+
+# ------------------- Pending orders by pickup location -------------------
+def _load_pending_orders():
+    query = f"""
+        SELECT {columns(OrderOut, 'o')}, k.Latitude, k.Longitude
+        FROM ORDERS o JOIN HOMEKITCHENS k ON k.KitchenID = o.KitchenID
+        WHERE o.Status = 'Pending' AND k.Latitude IS NOT NULL AND k.Longitude IS NOT NULL
+    """
+    rows = execute_query(query, fetch=True)
+    return [(as_dict(OrderOut, row[:-2]), row[-2], row[-1]) for row in rows]
+
+# place_order adds to it, the claim routes in driver.py remove from it
+pending_orders = PendingOrderIndex(_load_pending_orders)
+
+# ------------------- Place Order (Customer) -------------------
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=OrderPlaced)
+def place_order(order: OrderRequest, user: customer_dependancy):
+    # UID of current user comes from the token
+    customer_uid = user['uid']
 
-    # Get OrderID
-    order_id_query = "SELECT OrderID FROM ORDERS WHERE CustomerUID = %s ORDER BY OrderID DESC LIMIT 1"
-    order_id = execute_query(order_id_query, (customer_uid,), fetch=True)[0][0]
+    total_price = order.TotalPrice
+    kitchen_id = order.KitchenID
 
-    # Insert items into ORDERCONTAINS
+    # The same item can show up twice in a cart; ORDERCONTAINS holds one row per item
+    quantities = {}
     for item in order.Items:
-        execute_query("INSERT INTO ORDERCONTAINS (OrderID, KitchenID, ItemID) VALUES (%s, %s, %s)", (order_id, order.KitchenID, item.ItemID))
+        quantities[item.ItemID] = quantities.get(item.ItemID, 0) + item.Quantity
+
+    # One connection, one transaction: either the order and all its items land, or nothing does
+    with transaction() as cursor:
+        # Insert into ORDERS
+        insert_order = "INSERT INTO ORDERS (TotalPrice, ETA, CustomerUID, KitchenID, Status) VALUES (%s, %s, %s, %s, 'Pending')"
+        cursor.execute(insert_order, (total_price, order.ETA, customer_uid, kitchen_id))
+        order_id = cursor.lastrowid
+
+        # Insert items into ORDERCONTAINS (pymysql folds this into one multi-row INSERT)
+        if quantities:
+            cursor.executemany(
+                "INSERT INTO ORDERCONTAINS (OrderID, KitchenID, ItemID, Quantity) VALUES (%s, %s, %s, %s)",
+                [(order_id, kitchen_id, item_id, quantity) for item_id, quantity in quantities.items()]
+            )
+
+        # the kitchen's sales rollup moves with the order, never separately
+        record_order_placed(cursor, order_id)
+
+        cursor.execute("SELECT Latitude, Longitude FROM HOMEKITCHENS WHERE KitchenID = %s", (kitchen_id,))
+        pickup = cursor.fetchone()
+
+    if pickup and pickup[0] is not None and pickup[1] is not None:
+        pending_orders.add({
+            "OrderID": order_id, "TotalPrice": total_price, "CustomerUID": customer_uid, "KitchenID": kitchen_id,
+            "DriverUID": None, "ETA": order.ETA, "Status": "Pending",
+        }, pickup[0], pickup[1])
+
+    publish_order_event(ORDER_PLACED, order_id, kitchen_id, customer_uid, None, 'Pending')
 
     return {"message": "Order placed successfully", "OrderID": order_id}
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the app imports its modules relative to backend/api (`from db import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,213 @@
+"""
+Many drivers racing for the same orders through claim_order / claim_orders.
+
+The database is replaced by an in-memory ORDERS table whose transactions take
+row locks the way InnoDB does: UPDATE and SELECT ... FOR UPDATE lock the rows
+they touch until commit, and a locking read sees the latest committed row.
+"""
+import re
+import threading
+from contextlib import contextmanager
+
+import pytest
+from fastapi import HTTPException
+
+import routers.driver as driver
+from routers.driver import BatchClaimRequest
+
+DRIVERS = 16
+
+
+class FakeOrders:
+    def __init__(self, orders):
+        # OrderID -> {"KitchenID", "CustomerUID", "Status", "DriverUID"}
+        self.rows = {order_id: dict(row) for order_id, row in orders.items()}
+        self._owners = {}
+        self._changed = threading.Condition()
+
+    def lock(self, txn, order_ids):
+        # sorted, so two transactions never wait on each other in a cycle
+        with self._changed:
+            for order_id in sorted(order_ids):
+                while self._owners.get(order_id, txn) is not txn:
+                    self._changed.wait()
+                self._owners[order_id] = txn
+
+    def release(self, txn):
+        with self._changed:
+            for order_id in [o for o, owner in self._owners.items() if owner is txn]:
+                del self._owners[order_id]
+            self._changed.notify_all()
+
+    @contextmanager
+    def transaction(self):
+        cursor = FakeCursor(self)
+        try:
+            yield cursor
+        finally:
+            self.release(cursor)
+
+    def execute_query(self, query, params=None, fetch=False):
+        cursor = FakeCursor(self)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            self.release(cursor)
+
+
+class FakeCursor:
+    """Understands just the statements the claim routes send."""
+
+    def __init__(self, db):
+        self.db = db
+        self._result = []
+
+    def execute(self, query, params=()):
+        sql = " ".join(query.split())
+        params = list(params)
+        rows = self.db.rows
+
+        if sql.startswith("UPDATE ORDERS SET Status = 'Claimed', DriverUID = %s WHERE OrderID = %s AND Status = 'Pending'"):
+            driver_uid, order_id = params
+            if order_id not in rows:
+                return 0
+            self.db.lock(self, [order_id])
+            if rows[order_id]["Status"] != 'Pending':
+                return 0
+            rows[order_id].update(Status='Claimed', DriverUID=driver_uid)
+            return 1
+
+        if sql.startswith("UPDATE ORDERS SET Status = 'Claimed', DriverUID = %s WHERE OrderID IN"):
+            driver_uid, *order_ids = params
+            self.db.lock(self, [o for o in order_ids if o in rows])
+            for order_id in order_ids:
+                rows[order_id].update(Status='Claimed', DriverUID=driver_uid)
+            return len(order_ids)
+
+        if sql.startswith("SELECT OrderID, CustomerUID FROM ORDERS WHERE KitchenID = %s AND Status = 'Pending'"):
+            assert sql.endswith("FOR UPDATE")
+            kitchen_id, *order_ids = params
+            candidates = [o for o in order_ids if o in rows and rows[o]["KitchenID"] == kitchen_id]
+            self.db.lock(self, candidates)
+            self._result = [(o, rows[o]["CustomerUID"]) for o in candidates if rows[o]["Status"] == 'Pending']
+            return len(self._result)
+
+        if sql == "SELECT KitchenID, CustomerUID FROM ORDERS WHERE OrderID = %s":
+            row = rows.get(params[0])
+            self._result = [(row["KitchenID"], row["CustomerUID"])] if row else []
+            return len(self._result)
+
+        if sql == "SELECT Status FROM ORDERS WHERE OrderID = %s":
+            row = rows.get(params[0])
+            self._result = [(row["Status"],)] if row else []
+            return len(self._result)
+
+        raise AssertionError(f"unexpected statement: {sql}")
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return list(self._result)
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.removed = []
+
+    def remove(self, order_id):
+        self.removed.append(order_id)
+
+
+@pytest.fixture
+def world(monkeypatch):
+    db = FakeOrders({
+        1: {"KitchenID": 10, "CustomerUID": 100, "Status": 'Pending', "DriverUID": None},
+        2: {"KitchenID": 10, "CustomerUID": 101, "Status": 'Pending', "DriverUID": None},
+        3: {"KitchenID": 10, "CustomerUID": 102, "Status": 'Pending', "DriverUID": None},
+        # another kitchen's order, already claimed by driver 1
+        4: {"KitchenID": 20, "CustomerUID": 103, "Status": 'Claimed', "DriverUID": 1},
+    })
+    events = []
+    index = RecordingIndex()
+    monkeypatch.setattr(driver, "transaction", db.transaction)
+    monkeypatch.setattr(driver, "execute_query", db.execute_query)
+    monkeypatch.setattr(driver, "pending_orders", index)
+    monkeypatch.setattr(driver, "publish_order_event", lambda *event: events.append(event))
+    return db, events, index
+
+
+def race(target, drivers=DRIVERS):
+    """Runs target(driver_uid) on `drivers` threads released at the same moment."""
+    start = threading.Barrier(drivers)
+    results = {}
+
+    def run(uid):
+        start.wait()
+        try:
+            results[uid] = target(uid)
+        except HTTPException as e:
+            results[uid] = e
+
+    threads = [threading.Thread(target=run, args=(uid,)) for uid in range(1, drivers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads), "claims deadlocked"
+    return results
+
+
+def test_single_claim_race_has_one_winner(world):
+    db, events, index = world
+    results = race(lambda uid: driver.claim_order(1, {"uid": uid}))
+
+    winners = [uid for uid, result in results.items() if not isinstance(result, HTTPException)]
+    assert len(winners) == 1
+    assert all(result.status_code == 400 for uid, result in results.items() if uid not in winners)
+    assert db.rows[1]["DriverUID"] == winners[0]
+    assert events == [(driver.ORDER_CLAIMED, 1, 10, 100, winners[0], 'Claimed')]
+    assert index.removed == [1]
+
+
+def test_batch_claim_race_gives_each_order_one_driver(world):
+    db, events, index = world
+    request = BatchClaimRequest(KitchenID=10, OrderIDs=[3, 1, 2, 1])
+    results = race(lambda uid: driver.claim_orders(request, {"uid": uid}))
+
+    claimed = [order_id for result in results.values() for order_id in result["Claimed"]]
+    assert sorted(claimed) == [1, 2, 3]
+    for uid, result in results.items():
+        assert sorted(result["Claimed"] + result["Unavailable"]) == [1, 2, 3]
+        for order_id in result["Claimed"]:
+            assert db.rows[order_id]["DriverUID"] == uid
+
+    assert sorted(event[1] for event in events) == [1, 2, 3]
+    assert sorted(index.removed) == [1, 2, 3]
+
+
+def test_batch_claim_mixed_with_single_claims(world):
+    db, events, index = world
+    request = BatchClaimRequest(KitchenID=10, OrderIDs=[1, 2, 3])
+
+    def claim(uid):
+        if uid % 2:
+            return driver.claim_orders(request, {"uid": uid})["Claimed"]
+        return [2] if driver.claim_order(2, {"uid": uid}) else []
+
+    results = race(claim)
+    claimed = [order_id for result in results.values() if not isinstance(result, HTTPException) for order_id in result]
+    assert sorted(claimed) == [1, 2, 3]
+    assert sorted(event[1] for event in events) == [1, 2, 3]
+
+
+def test_batch_claim_ignores_orders_already_held_elsewhere(world):
+    db, events, index = world
+    # driver 1 already holds order 4 at kitchen 20; naming it again must not re-announce it
+    result = driver.claim_orders(BatchClaimRequest(KitchenID=10, OrderIDs=[1, 4]), {"uid": 1})
+
+    assert result == {"Claimed": [1], "Unavailable": [4]}
+    assert events == [(driver.ORDER_CLAIMED, 1, 10, 100, 1, 'Claimed')]
+    assert index.removed == [1]
+    assert db.rows[4]["KitchenID"] == 20 and db.rows[4]["Status"] == 'Claimed'
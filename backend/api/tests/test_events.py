@@ -0,0 +1,34 @@
+from routers.events import _order_filter
+from utils.events import ORDER_PLACED, ORDER_CLAIMED, ORDER_COMPLETED
+
+
+def event(event_type, kitchen_id, customer_uid=100, driver_uid=None):
+    return {"type": event_type, "KitchenID": kitchen_id, "CustomerUID": customer_uid, "DriverUID": driver_uid}
+
+
+def test_customer_feed_is_their_own_orders():
+    accepts = _order_filter({"role": "customer", "uid": 100}, None)
+    assert accepts(event(ORDER_PLACED, 10))
+    assert accepts(event(ORDER_PLACED, 20))
+    assert not accepts(event(ORDER_PLACED, 10, customer_uid=101))
+
+
+def test_customer_feed_narrowed_by_kitchen():
+    accepts = _order_filter({"role": "customer", "uid": 100}, frozenset([10]))
+    assert accepts(event(ORDER_CLAIMED, 10, driver_uid=7))
+    assert not accepts(event(ORDER_CLAIMED, 20, driver_uid=7))
+
+
+def test_driver_sees_offers_in_scope_and_only_their_own_completions():
+    accepts = _order_filter({"role": "driver", "uid": 7}, frozenset([10]))
+    assert accepts(event(ORDER_PLACED, 10))
+    assert not accepts(event(ORDER_PLACED, 20))
+    assert accepts(event(ORDER_COMPLETED, 10, driver_uid=7))
+    assert not accepts(event(ORDER_COMPLETED, 10, driver_uid=8))
+
+
+def test_owner_scope_is_the_set_given_when_the_stream_opened():
+    # a kitchen created after the stream opened is not in the set; the client reconnects to get it
+    accepts = _order_filter({"role": "owner", "uid": 1}, frozenset([10]))
+    assert accepts(event(ORDER_PLACED, 10))
+    assert not accepts(event(ORDER_PLACED, 11))
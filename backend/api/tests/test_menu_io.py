@@ -0,0 +1,39 @@
+import io
+
+from utils.menu_io import read_rows
+
+
+def rows(data, fmt='csv'):
+    return [(line, row.Name if row is not None else None, error)
+            for line, row, error in read_rows(io.BytesIO(data), fmt)]
+
+
+def test_csv_rows_are_read_with_their_line_numbers():
+    data = '﻿Name,Price,Description\nSoup,4.50,"hot\nand thick"\nBread,2,\n'.encode('utf-8')
+    assert rows(data) == [(3, 'Soup', None), (4, 'Bread', None)]
+
+
+def test_non_utf8_csv_stops_at_the_bad_line_and_keeps_earlier_rows():
+    # cp1252 / Latin-1 exports are the usual culprit: "Crème" is b'Cr\xe8me'
+    data = 'Name,Price\nSoup,4.50\nCrème brûlée,6\nBread,2\n'.encode('cp1252')
+    result = rows(data)
+
+    assert result[0] == (2, 'Soup', None)
+    line, name, error = result[1]
+    assert (line, name) == (3, None)
+    assert error.startswith("stopped:") and "UTF-8" in error
+    # nothing after the bad line is guessed at
+    assert len(result) == 2
+
+
+def test_non_utf8_header_stops_before_any_row():
+    data = 'Nom é,Price\nSoup,4\n'.encode('latin-1')
+    [(line, name, error)] = rows(data)
+    assert (line, name) == (1, None) and error.startswith("stopped:")
+
+
+def test_non_utf8_jsonl_line_is_reported_and_the_rest_is_read():
+    data = b'{"Name": "Soup", "Price": 4}\n{"Name": "Cr\xe8me", "Price": 6}\n{"Name": "Bread", "Price": 2}\n'
+    result = rows(data, 'jsonl')
+    assert [(line, name) for line, name, _ in result] == [(1, 'Soup'), (2, None), (3, 'Bread')]
+    assert result[1][2].startswith("invalid JSON")
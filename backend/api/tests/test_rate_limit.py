@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import utils.rate_limit as rate_limit
+from utils.rate_limit import TokenBucketLimiter
+
+
+def test_bucket_allows_a_burst_then_refills():
+    limiter = TokenBucketLimiter('test', per_minute=3)
+    assert [limiter.take('k', now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.take('k', now=0) == pytest.approx(20)
+    # one token back every 20 seconds
+    assert limiter.take('k', now=20) == 0
+
+
+@pytest.fixture
+def limiters(monkeypatch):
+    fresh = {
+        'signup_ip': TokenBucketLimiter('signup_ip', 10),
+        'signup_email': TokenBucketLimiter('signup_email', 2),
+        'bcrypt': TokenBucketLimiter('bcrypt', 5),
+    }
+    monkeypatch.setattr(rate_limit, 'limiters', fresh)
+    return fresh
+
+
+def test_refused_request_refunds_the_other_buckets(limiters):
+    request = SimpleNamespace(headers={}, client=SimpleNamespace(host='10.0.0.1'))
+    rate_limit.enforce('signup', request, 'a@b.com')
+    rate_limit.enforce('signup', request, ' A@B.com ')
+    with pytest.raises(HTTPException) as refused:
+        rate_limit.enforce('signup', request, 'a@b.com')
+
+    assert refused.value.status_code == 429
+    assert int(refused.value.headers['Retry-After']) >= 1
+    assert limiters['signup_ip'].stats()['allowed'] == 2
+
+
+def test_ip_and_email_checks_leave_the_bcrypt_budget_alone(limiters):
+    request = SimpleNamespace(headers={}, client=SimpleNamespace(host='10.0.0.2'))
+    rate_limit.enforce('signup', request, 'taken@b.com')
+    assert limiters['bcrypt'].stats()['allowed'] == 0
+
+    rate_limit.enforce_bcrypt('signup')
+    assert limiters['bcrypt'].stats()['allowed'] == 1
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from utils.response_cache import cached_read, invalidate_kitchen
+
+
+def request(etag=None):
+    return SimpleNamespace(headers={'if-none-match': etag} if etag else {})
+
+
+def read(kitchen_id, menu, etag=None):
+    response = SimpleNamespace(headers={})
+    result = cached_read(request(etag), response, kitchen_id, ('menuitems',), lambda: list(menu))
+    return result, response.headers.get('ETag')
+
+
+def test_unchanged_menu_is_served_from_cache_and_revalidates():
+    menu = [{"ItemID": 1, "Name": "Soup"}]
+    first, etag = read(9001, menu)
+    menu.append({"ItemID": 2, "Name": "Bread"})
+    # not invalidated: the cached copy (and its ETag) is served
+    second, same_etag = read(9001, menu)
+    assert second == first and same_etag == etag
+
+    not_modified = cached_read(request(etag), SimpleNamespace(headers={}), 9001, ('menuitems',), lambda: list(menu))
+    assert not_modified.status_code == 304
+
+
+def test_write_on_this_worker_changes_the_etag():
+    menu = [{"ItemID": 1, "Name": "Soup"}]
+    _, etag = read(9002, menu)
+
+    menu.append({"ItemID": 2, "Name": "Bread"})
+    invalidate_kitchen(9002)
+    result, new_etag = read(9002, menu, etag=etag)
+
+    assert new_etag != etag
+    assert result == menu
+
+
+def test_invalidation_is_per_kitchen():
+    _, etag = read(9003, [{"ItemID": 1}])
+    invalidate_kitchen(9004)
+    _, same = read(9003, [{"ItemID": 1}, {"ItemID": 2}])
+    assert same == etag
@@ -0,0 +1,162 @@
+"""
+Sales rollups for kitchen owners.
+
+KITCHENDAILYSALES holds order counts and revenue per kitchen per day and
+KITCHENITEMSALES the quantity of each item sold. Both are bumped inside the
+same transaction that places or completes an order, so owners read a few
+rows per day instead of scanning ORDERS / ORDERCONTAINS. Counts are by the
+day the order was placed; item quantities only count completed orders.
+"""
+from db import execute_query, transaction
+
+# ------------------- incremental updates (call inside the order's transaction) -------------------
+def record_order_placed(cursor, order_id: int):
+    cursor.execute(
+        """
+        INSERT INTO KITCHENDAILYSALES (KitchenID, Day, OrdersPlaced, PlacedRevenue)
+        SELECT KitchenID, DATE(CreatedAt), 1, TotalPrice FROM ORDERS WHERE OrderID = %s
+        ON DUPLICATE KEY UPDATE OrdersPlaced = OrdersPlaced + 1, PlacedRevenue = PlacedRevenue + VALUES(PlacedRevenue)
+        """, (order_id,))
+
+
+def record_order_completed(cursor, order_id: int):
+    cursor.execute(
+        """
+        INSERT INTO KITCHENDAILYSALES (KitchenID, Day, OrdersCompleted, CompletedRevenue)
+        SELECT KitchenID, DATE(CreatedAt), 1, TotalPrice FROM ORDERS WHERE OrderID = %s
+        ON DUPLICATE KEY UPDATE OrdersCompleted = OrdersCompleted + 1, CompletedRevenue = CompletedRevenue + VALUES(CompletedRevenue)
+        """, (order_id,))
+    cursor.execute(
+        """
+        INSERT INTO KITCHENITEMSALES (KitchenID, Day, ItemID, Quantity)
+        SELECT o.KitchenID, DATE(o.CreatedAt), oc.ItemID, oc.Quantity
+        FROM ORDERCONTAINS oc JOIN ORDERS o ON o.OrderID = oc.OrderID
+        WHERE oc.OrderID = %s
+        ON DUPLICATE KEY UPDATE Quantity = Quantity + VALUES(Quantity)
+        """, (order_id,))
+
+
+def forget_customer_orders(cursor, customer_uid: int):
+    """Takes a customer's orders back out of the rollups; call in the same transaction that deletes them."""
+    cursor.execute(
+        """
+        UPDATE KITCHENDAILYSALES s JOIN (
+            SELECT KitchenID, DATE(CreatedAt) AS Day, COUNT(*) AS Placed, SUM(TotalPrice) AS PlacedRevenue,
+                   SUM(Status = 'Completed') AS Completed, SUM(IF(Status = 'Completed', TotalPrice, 0)) AS CompletedRevenue
+            FROM ORDERS WHERE CustomerUID = %s
+            GROUP BY KitchenID, DATE(CreatedAt)
+        ) d ON d.KitchenID = s.KitchenID AND d.Day = s.Day
+        SET s.OrdersPlaced = s.OrdersPlaced - d.Placed, s.PlacedRevenue = s.PlacedRevenue - d.PlacedRevenue,
+            s.OrdersCompleted = s.OrdersCompleted - d.Completed, s.CompletedRevenue = s.CompletedRevenue - d.CompletedRevenue
+        """, (customer_uid,))
+    cursor.execute(
+        """
+        UPDATE KITCHENITEMSALES s JOIN (
+            SELECT o.KitchenID, DATE(o.CreatedAt) AS Day, oc.ItemID, SUM(oc.Quantity) AS Sold
+            FROM ORDERS o JOIN ORDERCONTAINS oc ON oc.OrderID = o.OrderID
+            WHERE o.CustomerUID = %s AND o.Status = 'Completed'
+            GROUP BY o.KitchenID, DATE(o.CreatedAt), oc.ItemID
+        ) d ON d.KitchenID = s.KitchenID AND d.Day = s.Day AND d.ItemID = s.ItemID
+        SET s.Quantity = s.Quantity - d.Sold
+        """, (customer_uid,))
+
+
+# ------------------- reads -------------------
+def today():
+    """The database's current date. Rollup days are DATE(CreatedAt) on the database
+    clock, which need not be in the same timezone as this process."""
+    return execute_query("SELECT CURDATE()", fetch=True)[0][0]
+
+
+def daily_sales(kitchen_id: int, start, end):
+    query = """
+        SELECT Day, OrdersPlaced, PlacedRevenue, OrdersCompleted, CompletedRevenue
+        FROM KITCHENDAILYSALES WHERE KitchenID = %s AND Day BETWEEN %s AND %s
+        ORDER BY Day
+    """
+    return execute_query(query, (kitchen_id, start, end), fetch=True)
+
+
+def top_items(kitchen_id: int, start, end, limit: int):
+    query = """
+        SELECT s.ItemID, m.Name, SUM(s.Quantity) AS Sold
+        FROM KITCHENITEMSALES s LEFT JOIN MENUITEMS m ON m.ItemID = s.ItemID
+        WHERE s.KitchenID = %s AND s.Day BETWEEN %s AND %s
+        GROUP BY s.ItemID, m.Name
+        ORDER BY Sold DESC, s.ItemID
+        LIMIT %s
+    """
+    return execute_query(query, (kitchen_id, start, end, limit), fetch=True)
+
+
+# ------------------- rebuild / verify from the raw tables -------------------
+# These scan one kitchen's orders at a time; they are for manage.py, never for a request.
+_RAW_DAILY = """
+    SELECT DATE(CreatedAt), COUNT(*), SUM(TotalPrice),
+           SUM(Status = 'Completed'), SUM(IF(Status = 'Completed', TotalPrice, 0))
+    FROM ORDERS WHERE KitchenID = %s
+    GROUP BY DATE(CreatedAt)
+"""
+_RAW_ITEMS = """
+    SELECT DATE(o.CreatedAt), oc.ItemID, SUM(oc.Quantity)
+    FROM ORDERS o JOIN ORDERCONTAINS oc ON oc.OrderID = o.OrderID
+    WHERE o.KitchenID = %s AND o.Status = 'Completed'
+    GROUP BY DATE(o.CreatedAt), oc.ItemID
+"""
+
+
+def _kitchen_ids(kitchen_id=None, batch=1000):
+    if kitchen_id is not None:
+        yield kitchen_id
+        return
+    after = 0
+    while True:
+        rows = execute_query("SELECT KitchenID FROM HOMEKITCHENS WHERE KitchenID > %s ORDER BY KitchenID LIMIT %s",
+                             (after, batch), fetch=True)
+        yield from (row[0] for row in rows)
+        if len(rows) < batch:
+            return
+        after = rows[-1][0]
+
+
+def backfill(kitchen_id=None):
+    """Recomputes the rollups from ORDERS / ORDERCONTAINS, one kitchen per transaction; yields each KitchenID when done."""
+    for kid in _kitchen_ids(kitchen_id):
+        with transaction() as cursor:
+            # Lock this kitchen's orders first - the same order the order routes take
+            # their locks in - so orders placed or completed meanwhile wait and then count on top
+            cursor.execute("SELECT COUNT(*) FROM ORDERS WHERE KitchenID = %s LOCK IN SHARE MODE", (kid,))
+            cursor.execute("DELETE FROM KITCHENDAILYSALES WHERE KitchenID = %s", (kid,))
+            cursor.execute("DELETE FROM KITCHENITEMSALES WHERE KitchenID = %s", (kid,))
+            cursor.execute(
+                f"""
+                INSERT INTO KITCHENDAILYSALES (Day, OrdersPlaced, PlacedRevenue, OrdersCompleted, CompletedRevenue, KitchenID)
+                SELECT raw.*, %s FROM ({_RAW_DAILY}) raw
+                """, (kid, kid))
+            cursor.execute(
+                f"""
+                INSERT INTO KITCHENITEMSALES (Day, ItemID, Quantity, KitchenID)
+                SELECT raw.*, %s FROM ({_RAW_ITEMS}) raw
+                """, (kid, kid))
+        yield kid
+
+
+def check(kitchen_id=None):
+    """Yields (KitchenID, what, key, rollup, raw) for every row where the rollups disagree with the raw tables."""
+    for kid in _kitchen_ids(kitchen_id):
+        raw = {row[0]: tuple(row[1:]) for row in execute_query(_RAW_DAILY, (kid,), fetch=True)}
+        rolled = {row[0]: tuple(row[1:]) for row in execute_query(
+            "SELECT Day, OrdersPlaced, PlacedRevenue, OrdersCompleted, CompletedRevenue FROM KITCHENDAILYSALES WHERE KitchenID = %s",
+            (kid,), fetch=True)}
+        for day in sorted(raw.keys() | rolled.keys()):
+            expected = tuple(int(v) if i % 2 == 0 else v for i, v in enumerate(raw.get(day, (0, 0, 0, 0))))
+            actual = rolled.get(day, (0, 0, 0, 0))
+            if expected != actual:
+                yield kid, 'daily', day, actual, expected
+
+        raw = {(row[0], row[1]): int(row[2]) for row in execute_query(_RAW_ITEMS, (kid,), fetch=True)}
+        rolled = {(row[0], row[1]): row[2] for row in execute_query(
+            "SELECT Day, ItemID, Quantity FROM KITCHENITEMSALES WHERE KitchenID = %s", (kid,), fetch=True)}
+        for key in sorted(raw.keys() | rolled.keys()):
+            if raw.get(key, 0) != rolled.get(key, 0):
+                yield kid, 'item', key, rolled.get(key, 0), raw.get(key, 0)
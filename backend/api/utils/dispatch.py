@@ -0,0 +1,184 @@
+import heapq
+import math
+import os
+import threading
+import time
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+# Grid cell edge; a radius query visits roughly (2 * radius / cell + 1)^2 cells
+CELL_KM = float(os.getenv('dispatch_cell_km', 1.0))
+# Other workers claim orders too, so each process rebuilds its index from the database this often
+REFRESH_SECONDS = float(os.getenv('dispatch_refresh_seconds', 60))
+MAX_RADIUS_KM = float(os.getenv('dispatch_max_radius_km', 50))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Points bucketed into square cells of `cell_km` (measured along a meridian).
+    Not thread-safe on its own; PendingOrderIndex does the locking.
+    """
+
+    def __init__(self, cell_km=CELL_KM):
+        self.cell_km = cell_km
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._cells = {}   # (row, col) -> {key: (lat, lon, value)}
+        self._where = {}   # key -> (row, col)
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def add(self, key, lat, lon, value):
+        self.remove(key)
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[key] = (lat, lon, value)
+        self._where[key] = cell
+
+    def remove(self, key):
+        cell = self._where.pop(key, None)
+        if cell is None:
+            return False
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
+        return True
+
+    def __len__(self):
+        return len(self._where)
+
+    def _ring(self, row, col, r):
+        if r == 0:
+            yield row, col
+            return
+        for dc in range(-r, r + 1):
+            yield row - r, col + dc
+            yield row + r, col + dc
+        for dr in range(-r + 1, r):
+            yield row + dr, col - r
+            yield row + dr, col + r
+
+    def nearest(self, lat, lon, k, radius_km):
+        """[(distance_km, key, value), ...] for the k closest points within radius_km."""
+        row, col = self._cell(lat, lon)
+        # a degree of longitude shrinks away from the equator, so rings are
+        # widened by the narrowest latitude they can reach
+        max_lat = min(89.0, abs(lat) + radius_km / KM_PER_DEGREE)
+        ring_km = self.cell_km * math.cos(math.radians(max_lat))
+        max_ring = int(math.ceil(radius_km / ring_km))
+
+        found = []  # max-heap of the k best as (-distance, key, value)
+        for r in range(max_ring + 1):
+            for cell in self._ring(row, col, r):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for key, (plat, plon, value) in bucket.items():
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if distance > radius_km:
+                        continue
+                    if len(found) < k:
+                        heapq.heappush(found, (-distance, key, value))
+                    elif distance < -found[0][0]:
+                        heapq.heapreplace(found, (-distance, key, value))
+            # everything beyond ring r is at least r cells away
+            if len(found) == k and -found[0][0] <= r * ring_km:
+                break
+        return sorted(((-d, key, value) for d, key, value in found), key=lambda hit: hit[0])
+
+
+class PendingOrderIndex:
+    """
+    Pending orders by pickup location. Kept current by place_order and the
+    claim routes in this process, and rebuilt with `load()` every
+    REFRESH_SECONDS to pick up changes made by other workers.
+
+    `load` returns [(order_dict, latitude, longitude), ...].
+    """
+
+    def __init__(self, load, refresh_seconds=REFRESH_SECONDS, cell_km=CELL_KM):
+        self._load = load
+        self.refresh_seconds = refresh_seconds
+        self.cell_km = cell_km
+        self._grid = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        # changes that arrive while a rebuild is reading the database
+        self._replay = None
+        self.queries = 0
+        self.reloads = 0
+
+    def _apply(self, grid, change):
+        if change[0] == 'add':
+            _, order, lat, lon = change
+            grid.add(order['OrderID'], lat, lon, order)
+        else:
+            grid.remove(change[1])
+
+    def _change(self, change):
+        with self._lock:
+            if self._grid is not None:
+                self._apply(self._grid, change)
+            if self._replay is not None:
+                self._replay.append(change)
+
+    def add(self, order: dict, lat, lon):
+        self._change(('add', order, float(lat), float(lon)))
+
+    def remove(self, order_id: int):
+        self._change(('remove', order_id))
+
+    def _ensure_fresh(self):
+        if self._grid is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        # one thread rebuilds; the rest keep answering from the current grid if there is one
+        if not self._reload_lock.acquire(blocking=self._grid is None):
+            return
+        try:
+            if self._grid is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            with self._lock:
+                self._replay = []
+            try:
+                grid = GridIndex(self.cell_km)
+                for order, lat, lon in self._load():
+                    grid.add(order['OrderID'], float(lat), float(lon), order)
+            except Exception:
+                with self._lock:
+                    self._replay = None
+                raise
+            with self._lock:
+                for change in self._replay:
+                    self._apply(grid, change)
+                self._replay = None
+                self._grid = grid
+                self._loaded_at = time.monotonic()
+                self.reloads += 1
+        finally:
+            self._reload_lock.release()
+
+    def nearest(self, lat, lon, k, radius_km):
+        self._ensure_fresh()
+        with self._lock:
+            self.queries += 1
+            return self._grid.nearest(lat, lon, k, radius_km)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "orders": len(self._grid) if self._grid is not None else 0,
+                "cell_km": self.cell_km,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._grid is not None else None,
+                "reloads": self.reloads,
+                "queries": self.queries,
+            }
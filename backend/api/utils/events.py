@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+
+# Events a single subscriber may have waiting before it counts as too slow
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv('events_queue_size', 256))
+
+ORDER_PLACED = 'order.placed'
+ORDER_CLAIMED = 'order.claimed'
+ORDER_COMPLETED = 'order.completed'
+# a claimed order handed back to the pool (its driver's account was deleted)
+ORDER_RELEASED = 'order.released'
+
+
+class Subscription:
+    """
+    One connected client. Events are only ever put on its queue from the event
+    loop that owns it; a client that lets the queue fill up is disconnected
+    rather than allowed to hold memory or slow down publishers.
+    """
+
+    def __init__(self, loop, accepts, maxsize):
+        self.loop = loop
+        self.accepts = accepts
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+
+    def offer(self, event):
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # make room for the sentinel so the reader wakes up and ends the stream
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventBroker:
+    """In-process pub/sub. `publish` is safe to call from the threadpool sync routes run in."""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def subscribe(self, accepts) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop(), accepts, self.queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+            if sub.closed:
+                self.dropped_subscribers += 1
+
+    def publish(self, event_type: str, **data):
+        event = {'id': next(self._ids), 'type': event_type, **data}
+        with self._lock:
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if sub.closed or not sub.accepts(event):
+                continue
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # loop already shut down
+                sub.closed = True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'dropped_subscribers': self.dropped_subscribers,
+                'queue_size': self.queue_size,
+            }
+
+
+broker = EventBroker()
+
+
+def publish_order_event(event_type: str, order_id: int, kitchen_id=None, customer_uid=None, driver_uid=None, status=None):
+    broker.publish(
+        event_type,
+        OrderID=order_id,
+        KitchenID=kitchen_id,
+        CustomerUID=customer_uid,
+        DriverUID=driver_uid,
+        Status=status,
+    )
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from deps import bcrypt_context
+from utils.metrics import hash_seconds
+
+# bcrypt releases the GIL while it works, so a small dedicated thread pool is
+# enough to keep hashing off the event loop without starving the default
+# threadpool that sync route handlers run in.
+HASH_WORKERS = int(os.getenv('auth_hash_workers', min(4, os.cpu_count() or 1)))
+# 0 means unbounded; otherwise requests beyond this backlog are shed with a 503
+HASH_MAX_QUEUE = int(os.getenv('auth_hash_max_queue', 64))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='bcrypt')
+_lock = threading.Lock()
+_stats = {'queued': 0, 'running': 0, 'completed': 0, 'rejected': 0}
+
+
+def _run(fn, args):
+    with _lock:
+        _stats['queued'] -= 1
+        _stats['running'] += 1
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        hash_seconds.observe(time.perf_counter() - started, fn.__name__)
+        with _lock:
+            _stats['running'] -= 1
+            _stats['completed'] += 1
+
+
+def _on_done(future):
+    # a job cancelled before it started never reaches _run
+    if future.cancelled():
+        with _lock:
+            _stats['queued'] -= 1
+
+
+async def _submit(fn, *args):
+    with _lock:
+        if HASH_MAX_QUEUE and _stats['queued'] >= HASH_MAX_QUEUE:
+            _stats['rejected'] += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Server busy, try again shortly')
+        _stats['queued'] += 1
+    future = _executor.submit(_run, fn, args)
+    future.add_done_callback(_on_done)
+    return await asyncio.wrap_future(future)
+
+
+# ------------------- Public helpers -------------------
+async def hash_password(password: str) -> str:
+    return await _submit(bcrypt_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _submit(bcrypt_context.verify, password, hashed_password)
+
+
+def hashing_stats():
+    with _lock:
+        return {'workers': HASH_WORKERS, 'max_queue': HASH_MAX_QUEUE, **_stats}
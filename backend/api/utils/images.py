@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, UploadFile
+from fastapi.staticfiles import StaticFiles
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.getenv('upload_dir', 'uploads')
+MAX_UPLOAD_BYTES = int(os.getenv('upload_max_bytes', 10 * 1024 * 1024))
+# widths of the WebP variants generated for every upload
+VARIANT_WIDTHS = tuple(int(w) for w in os.getenv('upload_variant_widths', '160,480,1080').split(','))
+
+_CHUNK = 64 * 1024
+# room for the multipart boundaries and part headers around the file itself
+_MULTIPART_OVERHEAD = 64 * 1024
+_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+# <sha256>.<ext> or <sha256>_<width>.webp
+_CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{64}(_\d+)?\.[a-z]+$')
+
+# Pillow drops the GIL while resizing and encoding, so threads scale fine here
+_workers = ThreadPoolExecutor(max_workers=int(os.getenv('upload_workers', 2)), thread_name_prefix='images')
+_in_progress = set()
+_lock = threading.Lock()
+
+
+def variant_name(digest: str, width: int) -> str:
+    return f"{digest}_{width}.webp"
+
+
+def _make_variants(digest: str, source: str):
+    try:
+        with Image.open(source) as original:
+            original.load()
+            for width in VARIANT_WIDTHS:
+                target = os.path.join(UPLOAD_DIR, variant_name(digest, width))
+                if os.path.exists(target):
+                    continue
+                image = original.copy()
+                if image.width > width:
+                    image.thumbnail((width, width * image.height // image.width))
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                # write then rename so the static handler never serves a half-written file
+                fd, tmp = tempfile.mkstemp(dir=UPLOAD_DIR, suffix='.part')
+                with os.fdopen(fd, 'wb') as out:
+                    image.save(out, 'WEBP', quality=80, method=4)
+                os.replace(tmp, target)
+    except Exception:
+        logger.exception("Could not build image variants for %s", digest)
+    finally:
+        with _lock:
+            _in_progress.discard(digest)
+
+
+def variants_ready(digest: str) -> bool:
+    return all(os.path.exists(os.path.join(UPLOAD_DIR, variant_name(digest, w))) for w in VARIANT_WIDTHS)
+
+
+def store_image(upload: UploadFile) -> dict:
+    """
+    Streams an upload to disk under the SHA-256 of its bytes. Identical images are
+    stored once; resized WebP variants are generated in the background.
+
+    Blocking (file I/O and Pillow), so routes run it in the threadpool.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    hasher = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=UPLOAD_DIR, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while chunk := upload.file.read(_CHUNK):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Images are limited to {MAX_UPLOAD_BYTES} bytes")
+                hasher.update(chunk)
+                out.write(chunk)
+
+        try:
+            with Image.open(tmp) as image:
+                image_format = image.format
+                image.verify()
+        except (UnidentifiedImageError, OSError):
+            raise HTTPException(status_code=400, detail="Upload is not a readable image")
+        if image_format not in _FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported image format {image_format}")
+
+        digest = hasher.hexdigest()
+        name = f"{digest}.{_FORMATS[image_format]}"
+        path = os.path.join(UPLOAD_DIR, name)
+        if os.path.exists(path):
+            os.remove(tmp)
+        else:
+            os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    with _lock:
+        schedule = digest not in _in_progress and not variants_ready(digest)
+        if schedule:
+            _in_progress.add(digest)
+    if schedule:
+        _workers.submit(_make_variants, digest, path)
+
+    return {
+        'Hash': digest,
+        'URL': f"/uploads/{name}",
+        'Variants': {str(w): f"/uploads/{variant_name(digest, w)}" for w in VARIANT_WIDTHS},
+        'VariantsReady': not schedule and variants_ready(digest),
+    }
+
+
+class _TooLarge(HTTPException):
+    # an HTTPException so the route's body parsing passes it through as a 413
+    # instead of turning it into "error parsing the body"
+    def __init__(self):
+        super().__init__(status_code=413, detail=f"Images are limited to {MAX_UPLOAD_BYTES} bytes")
+
+
+class UploadSizeLimit:
+    """
+    Pure ASGI middleware that refuses oversized request bodies under `prefix`
+    while they are still arriving. The multipart parser spools the whole body
+    before a route runs, so store_image's own check alone would come too late.
+    Declared lengths are refused up front; chunked bodies are counted as read.
+    """
+
+    def __init__(self, app, prefix='/images', max_bytes=MAX_UPLOAD_BYTES + _MULTIPART_OVERHEAD):
+        self.app = app
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+
+    async def _refuse(self, send):
+        await send({'type': 'http.response.start', 'status': 413,
+                    'headers': [(b'content-type', b'application/json'), (b'connection', b'close')]})
+        await send({'type': 'http.response.body',
+                    'body': f'{{"detail":"Images are limited to {MAX_UPLOAD_BYTES} bytes"}}'.encode()})
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope['headers']).get(b'content-length')
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._refuse(send)
+            return
+
+        received = 0
+        started = False
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    raise _TooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal started
+            if message['type'] == 'http.response.start':
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, tracking_send)
+        except _TooLarge:
+            if started:
+                raise
+            await self._refuse(send)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles (which already handles ETag, Last-Modified and Range requests)
+    plus Cache-Control: content-addressed files never change, so they are
+    cached for a year; legacy hand-named files are revalidated after an hour.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if _CONTENT_ADDRESSED.match(os.path.basename(full_path)):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response
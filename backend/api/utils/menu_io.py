@@ -0,0 +1,218 @@
+"""
+Bulk menu import / export.
+
+Imports are read row by row from the (already spooled) upload, validated, and
+written in fixed-size batches, each in its own transaction: a bad batch is
+rolled back and reported without undoing the batches before it. Rows carrying
+an ItemID update that item; rows without one update the kitchen's item with
+the same Name, or insert a new item.
+"""
+import csv
+import io
+import json
+import os
+from typing import Optional
+from pydantic import BaseModel, Field, ValidationError
+from fastapi import HTTPException
+from db import execute_query, transaction
+
+IMPORT_BATCH = int(os.getenv('menu_import_batch', 500))
+IMPORT_MAX_ROWS = int(os.getenv('menu_import_max_rows', 20000))
+# a file full of bad rows should not produce a multi-megabyte response
+MAX_REPORTED_ERRORS = 1000
+EXPORT_BATCH = 1000
+
+FIELDS = ('ItemID', 'Name', 'Description', 'Price', 'Image')
+
+
+class MenuItemRow(BaseModel):
+    ItemID: Optional[int] = None
+    Name: str = Field(min_length=1, max_length=255)
+    Description: Optional[str] = None
+    Price: float = Field(ge=0)
+    Image: Optional[str] = Field(default=None, max_length=255)
+
+
+def _describe(error: ValidationError) -> str:
+    first = error.errors()[0]
+    where = '.'.join(str(part) for part in first['loc'])
+    return f"{where}: {first['msg']}" if where else first['msg']
+
+
+# ------------------- reading -------------------
+def _decoded_lines(binary):
+    # decoded a line at a time (not in TextIOWrapper's 8 KB chunks) so a bad byte
+    # is reported on its own line and every row before it still gets imported
+    for line_no, line in enumerate(binary, start=1):
+        if line_no == 1:
+            line = line.removeprefix(b'\xef\xbb\xbf')
+        yield line.decode('utf-8')
+
+
+def _unreadable(error) -> str:
+    if isinstance(error, UnicodeDecodeError):
+        return "file is not UTF-8 text; save it as CSV UTF-8 and import the remaining rows again"
+    return f"malformed CSV: {error}"
+
+
+def _csv_records(binary):
+    reader = csv.DictReader(_decoded_lines(binary))
+    try:
+        fieldnames = reader.fieldnames
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield 1, None, f"stopped: {_unreadable(e)}"
+        return
+    if not fieldnames or 'Name' not in fieldnames:
+        raise HTTPException(status_code=400, detail="CSV needs a header row with at least Name and Price")
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except (UnicodeDecodeError, csv.Error) as e:
+            # the rest of the file can't be trusted; rows before this one are kept.
+            # An undecodable line never reached the csv reader, so it isn't counted yet
+            line = reader.line_num + 1 if isinstance(e, UnicodeDecodeError) else reader.line_num
+            yield line, None, f"stopped: {_unreadable(e)}"
+            return
+        # line_num is where the record ends; quoted descriptions can span lines
+        yield reader.line_num, {k: (v if v != '' else None) for k, v in record.items() if k in FIELDS}, None
+
+
+def _jsonl_records(binary):
+    for line_no, line in enumerate(binary, start=1):
+        if line_no == 1:
+            line = line.removeprefix(b'\xef\xbb\xbf')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def read_rows(binary, fmt: str):
+    """Yields (line, MenuItemRow or None, error or None) without reading the whole file."""
+    records = _jsonl_records(binary) if fmt == 'jsonl' else _csv_records(binary)
+    for count, (line, record, error) in enumerate(records, start=1):
+        if count > IMPORT_MAX_ROWS:
+            yield line, None, f"stopped: imports are limited to {IMPORT_MAX_ROWS} rows"
+            return
+        if error is not None:
+            yield line, None, error
+            continue
+        try:
+            yield line, MenuItemRow.model_validate(record), None
+        except ValidationError as e:
+            yield line, None, _describe(e)
+
+
+# ------------------- writing -------------------
+def upsert_batch(kitchen_id: int, batch: list):
+    """
+    Writes one batch of (line, MenuItemRow) in a single transaction.
+    Returns (written, errors): written is [(ItemID, row, inserted)], errors is [(line, message)].
+    """
+    # the same item twice in a batch: the later row wins
+    latest = {}
+    for line, row in batch:
+        latest[('id', row.ItemID) if row.ItemID is not None else ('name', row.Name.casefold())] = (line, row)
+    batch = sorted(latest.values(), key=lambda entry: entry[0])
+
+    errors, written = [], []
+    with transaction() as cursor:
+        item_ids = [row.ItemID for _, row in batch if row.ItemID is not None]
+        owned = set()
+        if item_ids:
+            placeholders = ", ".join(["%s"] * len(item_ids))
+            cursor.execute(
+                f"SELECT ItemID FROM MENUITEMS WHERE KitchenID = %s AND ItemID IN ({placeholders}) FOR UPDATE",
+                (kitchen_id, *item_ids))
+            owned = {r[0] for r in cursor.fetchall()}
+
+        names = [row.Name for _, row in batch if row.ItemID is None]
+        by_name = {}
+        if names:
+            placeholders = ", ".join(["%s"] * len(names))
+            cursor.execute(
+                f"SELECT ItemID, Name FROM MENUITEMS WHERE KitchenID = %s AND Name IN ({placeholders}) ORDER BY ItemID FOR UPDATE",
+                (kitchen_id, *names))
+            for item_id, name in cursor.fetchall():
+                by_name.setdefault(name.casefold(), item_id)
+
+        updates, inserts = [], []
+        for line, row in batch:
+            if row.ItemID is not None and row.ItemID not in owned:
+                errors.append((line, f"ItemID {row.ItemID} is not on this kitchen's menu"))
+                continue
+            item_id = row.ItemID if row.ItemID is not None else by_name.get(row.Name.casefold())
+            (updates if item_id is not None else inserts).append((item_id, row))
+
+        if updates:
+            # every ItemID here is locked and ours, so this only ever takes the UPDATE branch;
+            # pymysql folds it into one multi-row statement
+            cursor.executemany(
+                """
+                INSERT INTO MENUITEMS (ItemID, KitchenID, Name, Description, Price, Image)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE Name = VALUES(Name), Description = VALUES(Description),
+                                        Price = VALUES(Price), Image = VALUES(Image)
+                """,
+                [(item_id, kitchen_id, row.Name, row.Description, row.Price, row.Image) for item_id, row in updates])
+            written.extend((item_id, row, False) for item_id, row in updates)
+
+        if inserts:
+            cursor.executemany(
+                "INSERT INTO MENUITEMS (KitchenID, Name, Description, Price, Image) VALUES (%s, %s, %s, %s, %s)",
+                [(kitchen_id, row.Name, row.Description, row.Price, row.Image) for _, row in inserts])
+            # read the new IDs back by name rather than trusting multi-row lastrowid arithmetic
+            placeholders = ", ".join(["%s"] * len(inserts))
+            cursor.execute(
+                f"SELECT ItemID, Name FROM MENUITEMS WHERE KitchenID = %s AND Name IN ({placeholders})",
+                (kitchen_id, *(row.Name for _, row in inserts)))
+            newest = {}
+            for item_id, name in cursor.fetchall():
+                newest[name.casefold()] = max(item_id, newest.get(name.casefold(), 0))
+            written.extend((newest.get(row.Name.casefold()), row, True) for _, row in inserts)
+
+    return written, errors
+
+
+# ------------------- export -------------------
+def iter_menu(kitchen_id: int):
+    """Every menu item of a kitchen as (ItemID, Name, Description, Price, Image), in ItemID order."""
+    after = 0
+    while True:
+        rows = execute_query(
+            "SELECT ItemID, Name, Description, Price, Image FROM MENUITEMS WHERE KitchenID = %s AND ItemID > %s ORDER BY ItemID LIMIT %s",
+            (kitchen_id, after, EXPORT_BATCH), fetch=True)
+        yield from rows
+        if len(rows) < EXPORT_BATCH:
+            return
+        after = rows[-1][0]
+
+
+def export_lines(kitchen_id: int, fmt: str):
+    """The menu as CSV or JSONL text, one chunk per row, in the format import reads."""
+    if fmt == 'jsonl':
+        for row in iter_menu(kitchen_id):
+            record = dict(zip(FIELDS, row))
+            record['Price'] = float(record['Price']) if record['Price'] is not None else None
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for row in iter_menu(kitchen_id):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
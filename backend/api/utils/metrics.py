@@ -0,0 +1,209 @@
+import bisect
+import time
+import logging
+import os
+import re
+import threading
+from contextvars import ContextVar
+
+slow_query_logger = logging.getLogger('homekitchen.slow_query')
+SLOW_QUERY_SECONDS = float(os.getenv('slow_query_ms', 200)) / 1000
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with one series per label tuple."""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                labels = _labels(self.labels, label_values)
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(f'{self.name}_bucket{_labels(self.labels + ("le",), label_values + (repr(float(bound)),))} {cumulative}')
+                lines.append(f'{self.name}_bucket{_labels(self.labels + ("le",), label_values + ("+Inf",))} {count}')
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+# ------------------- Statement fingerprints -------------------
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\(\?\+\))(?:\s*,\s*\(\?\+\))+")
+_SPACE = re.compile(r"\s+")
+_fingerprints = {}
+
+
+def fingerprint(query: str) -> str:
+    """Collapses literals, placeholders and IN/VALUES lists so the same statement shape shares one series."""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    cached = _fingerprints.get(query)
+    if cached is None:
+        normalized = _SPACE.sub(' ', query).strip()
+        normalized = _STRING.sub('?', normalized)
+        normalized = _NUMBER.sub('?', normalized)
+        normalized = _PLACEHOLDER.sub('?', normalized)
+        normalized = _LIST.sub('(?+)', normalized)
+        normalized = _ROWS.sub(r'\1', normalized)
+        cached = normalized
+        # multi-row INSERTs arrive with their values inlined; don't keep those around
+        if len(query) < 2000 and len(_fingerprints) < 10000:
+            _fingerprints[query] = cached
+    return cached
+
+
+# ------------------- Metrics -------------------
+query_seconds = Histogram('db_query_duration_seconds', 'Time spent executing SQL statements', ('statement',))
+query_rows = Counter('db_query_rows_total', 'Rows returned or affected by SQL statements', ('statement',))
+query_errors = Counter('db_query_errors_total', 'SQL statements that raised', ('statement',))
+pool_wait_seconds = Histogram('db_pool_wait_seconds', 'Time spent waiting to check out a pooled connection')
+hash_seconds = Histogram('auth_hash_duration_seconds', 'Time spent in bcrypt hash/verify', ('operation',))
+request_seconds = Histogram('http_request_duration_seconds', 'Time to first response byte per route', ('method', 'route', 'status'))
+auth_rate_limited = Counter('auth_rate_limited_total', 'Login and signup attempts refused by the rate limiter', ('route', 'limit'))
+request_queries = Histogram('http_request_queries', 'SQL statements executed per request', ('method', 'route'), buckets=COUNT_BUCKETS)
+
+# Incremented by every statement run while a request is being handled. The
+# middleware stores a mutable list here so threadpool copies of the context
+# all update the same counter.
+_request_query_count = ContextVar('request_query_count', default=None)
+
+
+def start_request_count():
+    counter = [0]
+    _request_query_count.set(counter)
+    return counter
+
+
+def record_query(query: str, seconds: float, rows: int, failed: bool = False):
+    statement = fingerprint(query)
+    query_seconds.observe(seconds, statement)
+    if failed:
+        query_errors.inc(statement)
+    else:
+        query_rows.inc(statement, amount=max(rows, 0))
+    counter = _request_query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    if seconds >= SLOW_QUERY_SECONDS:
+        slow_query_logger.warning("slow query %.1f ms (%d rows): %s", seconds * 1000, rows, statement)
+
+
+_collectors = []
+
+
+def register_collector(fn):
+    """`fn()` returns {metric_name: (help, value)} gauges sampled at scrape time."""
+    _collectors.append(fn)
+    return fn
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in (query_seconds, query_rows, query_errors, pool_wait_seconds, hash_seconds, auth_rate_limited,
+                   request_seconds, request_queries):
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, (help, value) in collector().items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# ------------------- Request middleware -------------------
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording time to first response byte and the number
+    of SQL statements per route. Streaming responses (the SSE feed) are
+    therefore measured up to their headers, not for their whole lifetime.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        counter = start_request_count()
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status):
+            nonlocal recorded
+            recorded = True
+            route = scope.get('route')
+            # only route templates become labels, so unknown paths can't blow up cardinality
+            path = getattr(route, 'path', None)
+            if path is None:
+                path = '/uploads' if scope['path'].startswith('/uploads/') else 'unmatched'
+            request_seconds.observe(time.perf_counter() - started, scope['method'], path, str(status))
+            request_queries.observe(counter[0], scope['method'], path)
+
+        async def send_and_record(message):
+            if message['type'] == 'http.response.start' and not recorded:
+                record(message['status'])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        except Exception:
+            if not recorded:
+                record(500)
+            raise
@@ -0,0 +1,124 @@
+import os
+from datetime import datetime
+from typing import Annotated, Optional
+from fastapi import HTTPException, Query, Response
+from db import execute_query
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+NEXT_CURSOR_HEADER = 'X-Next-After'
+TOTAL_ESTIMATE_HEADER = 'X-Total-Estimate'
+SYNC_CURSOR_HEADER = 'X-Sync-Cursor'
+
+# A row's UpdatedAt is stamped when its statement runs, not when its transaction
+# commits, so a caught-up sync cursor is held this far behind the database clock
+SYNC_LAG_SECONDS = float(os.getenv('sync_lag_seconds', 2))
+
+# Shared query parameters for every paginated list endpoint, e.g.
+#   def handler(limit: limit_query = DEFAULT_LIMIT, after: after_query = None, include_total: total_query = False)
+limit_query = Annotated[int, Query(ge=1, le=MAX_LIMIT, description="Maximum rows to return")]
+after_query = Annotated[Optional[int], Query(description=f"Continue after this key (in the list's own order); pass the previous page's {NEXT_CURSOR_HEADER} header")]
+total_query = Annotated[bool, Query(description=f"Send an index-based row estimate in {TOTAL_ESTIMATE_HEADER}")]
+updated_since_query = Annotated[Optional[str], Query(description=f"Only rows changed after this cursor: the previous response's {SYNC_CURSOR_HEADER} header, or an ISO timestamp")]
+
+
+def keyset_page(select: str, key_column: str, conditions: list, params: list,
+                limit: int, after: Optional[int], key_index: int = 0, descending: bool = False):
+    """
+    Runs `select` with keyset pagination on `key_column` (which must be unique
+    and appear at `key_index` in each row). Pages are stable under concurrent
+    inserts and cost the same no matter how deep the client has paged.
+    `descending` pages newest (highest key) first, for history-style lists.
+
+    Returns (rows, next_after); next_after is None on the last page.
+    """
+    conditions = list(conditions)
+    params = list(params)
+    if after is not None:
+        conditions.append(f"{key_column} < %s" if descending else f"{key_column} > %s")
+        params.append(after)
+    where = f" WHERE {' AND '.join(f'({c})' for c in conditions)}" if conditions else ""
+    # one extra row tells us whether there is a next page without a COUNT
+    query = f"{select}{where} ORDER BY {key_column}{' DESC' if descending else ''} LIMIT %s"
+    rows = execute_query(query, (*params, limit + 1), fetch=True)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][key_index]
+    return rows, None
+
+
+def estimate_rows(select: str, conditions: list, params: list) -> int:
+    """Optimizer row estimate from EXPLAIN; never scans the table."""
+    where = f" WHERE {' AND '.join(f'({c})' for c in conditions)}" if conditions else ""
+    plan = execute_query(f"EXPLAIN {select}{where}", tuple(params), fetch=True)
+    # EXPLAIN columns: id, select_type, table, partitions, type, possible_keys, key, key_len, ref, rows, filtered, Extra
+    estimate = 0
+    for row in plan:
+        rows, filtered = row[9] or 0, row[10] if row[10] is not None else 100
+        estimate = max(estimate, int(rows * filtered / 100))
+    return estimate
+
+
+def set_page_headers(response: Response, next_after, total_estimate=None):
+    if next_after is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_after)
+    if total_estimate is not None:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(total_estimate)
+
+
+# ------------------- delta sync -------------------
+def parse_sync_cursor(value: str):
+    """'<ISO timestamp>' or '<ISO timestamp>,<key>' -> (datetime, key)."""
+    stamp, _, key = value.partition(',')
+    try:
+        stamp, key = datetime.fromisoformat(stamp), int(key or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid updated_since cursor")
+    if stamp.tzinfo is not None:
+        # DATETIME columns carry no zone; cursors are in the database's own clock
+        raise HTTPException(status_code=400, detail="updated_since must not include a UTC offset")
+    return stamp, key
+
+
+def format_sync_cursor(stamp: datetime, key: int) -> str:
+    return f"{stamp.isoformat()},{key}"
+
+
+def sync_page(select: str, time_column: str, key_column: str, conditions: list, params: list,
+              updated_since: Optional[str], limit: int, time_index: int, key_index: int = 0):
+    """
+    Rows changed after `updated_since`, oldest change first, ordered by
+    (`time_column`, `key_column`) so rows stamped in the same microsecond
+    are neither skipped nor repeated between pages.
+
+    Returns (rows, next_cursor). While there are more changes the cursor is
+    the last row returned; once caught up it is held SYNC_LAG_SECONDS behind
+    the database clock so changes still committing are picked up next time
+    (clients may see those rows twice and should upsert by key).
+    """
+    conditions = list(conditions)
+    params = list(params)
+    if updated_since is not None:
+        stamp, key = parse_sync_cursor(updated_since)
+        conditions.append(f"{time_column} > %s OR ({time_column} = %s AND {key_column} > %s)")
+        params.extend((stamp, stamp, key))
+    where = f" WHERE {' AND '.join(f'({c})' for c in conditions)}" if conditions else ""
+    query = f"{select}{where} ORDER BY {time_column}, {key_column} LIMIT %s"
+    rows = execute_query(query, (*params, limit + 1), fetch=True)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, format_sync_cursor(rows[-1][time_index], rows[-1][key_index])
+
+    # caught up: everything up to the settled point has been seen
+    settled = execute_query("SELECT NOW(6) - INTERVAL %s MICROSECOND", (int(SYNC_LAG_SECONDS * 1_000_000),), fetch=True)[0][0]
+    position = (settled, 0)
+    # but never move a cursor back past where the client already was
+    if updated_since is not None and position < (stamp, key):
+        position = (stamp, key)
+    return rows, format_sync_cursor(*position)
+
+
+def set_sync_header(response: Response, next_cursor: str):
+    response.headers[SYNC_CURSOR_HEADER] = next_cursor
+
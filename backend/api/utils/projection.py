@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+# Response models double as column lists: a model's fields are declared in the
+# same order as the columns we SELECT, so rows map onto them positionally.
+
+def columns(model: type[BaseModel], table: str = None) -> str:
+    prefix = f"{table}." if table else ""
+    return ", ".join(prefix + name for name in model.model_fields)
+
+
+def as_dict(model: type[BaseModel], row) -> dict:
+    return dict(zip(model.model_fields, row))
+
+
+def as_dicts(model: type[BaseModel], rows) -> list:
+    fields = tuple(model.model_fields)
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,257 @@
+"""
+Static query audit: pulls every SQL statement out of routers/ and utils/,
+runs EXPLAIN on it against the live schema and flags full scans.
+
+Statements are found by walking the AST for string literals and f-strings
+that start with SELECT / UPDATE / DELETE. Placeholders are bound to '1' (a
+string literal keeps index use on both INT and VARCHAR columns). f-string
+fields are filled in where their value is known statically - module-level
+string constants, columns(...) projections and IN-list placeholders - and
+the statement is skipped otherwise.
+
+Base queries handed to keyset_page() / sync_page() are checked as the
+statements those helpers compose at runtime: once with only the conditions
+every call has, and once more with each optional filter the route appends
+(plus the `after` / `updated_since` predicates), each with the ORDER BY and
+LIMIT the helper adds.
+
+Run it with `python manage.py check-queries`.
+"""
+import ast
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from db import pool
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCAN_DIRS = ('routers', 'utils')
+SQL_START = re.compile(r'^\s*(SELECT|UPDATE|DELETE)\s', re.S)
+SCAN_TYPES = {'ALL': 'full table scan', 'index': 'full index scan'}
+
+
+@dataclass
+class Statement:
+    path: str
+    line: int
+    sql: Optional[str]
+    skipped: Optional[str] = None
+    problems: list = field(default_factory=list)
+
+
+class _Unresolved(Exception):
+    pass
+
+
+def _source_files():
+    for folder in SCAN_DIRS:
+        root = os.path.join(API_DIR, folder)
+        for filename in sorted(os.listdir(root)):
+            if filename.endswith('.py'):
+                yield os.path.join(root, filename)
+
+
+def _module_constants(trees):
+    """Module-level NAME = "string" assignments across every scanned file."""
+    constants = {}
+    for tree in trees.values():
+        for node in tree.body:
+            if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                    and isinstance(node.targets[0], ast.Name)
+                    and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str)):
+                constants[node.targets[0].id] = node.value.value
+    return constants
+
+
+def _render(node, constants):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(value.value)
+            else:
+                parts.append(_render_field(value.value, constants))
+        return ''.join(parts)
+    raise _Unresolved('not a string literal')
+
+
+def _render_field(expr, constants):
+    if isinstance(expr, ast.Name):
+        if expr.id in constants:
+            return constants[expr.id]
+        if 'placeholders' in expr.id:
+            return '%s'
+    if isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id == 'columns':
+        # columns(Model, 'TABLE') qualifies each column; the plan is the same for *
+        if len(expr.args) > 1 and isinstance(expr.args[1], ast.Constant):
+            return f"{expr.args[1].value}.*"
+        return '*'
+    raise _Unresolved(f"dynamic field {{{ast.unparse(expr)}}}")
+
+
+def _condition_literals(func, name):
+    """(always, optional) condition nodes for the list variable `name` in `func`.
+
+    `always` come from the list the variable is initialised with, `optional`
+    from every `name.append(...)` - each route appends them under its own if.
+    """
+    always, optional = [], []
+    for node in ast.walk(func):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target, value = node.targets[0], node.value
+            if isinstance(target, ast.Name) and target.id == name and isinstance(value, ast.List):
+                always.extend(value.elts)
+            elif (isinstance(target, ast.Tuple) and isinstance(value, ast.Tuple)
+                  and len(target.elts) == len(value.elts)):
+                for t, v in zip(target.elts, value.elts):
+                    if isinstance(t, ast.Name) and t.id == name and isinstance(v, ast.List):
+                        always.extend(v.elts)
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+              and node.func.attr == 'append' and isinstance(node.func.value, ast.Name)
+              and node.func.value.id == name and node.args):
+            optional.append(node.args[0])
+    return always, optional
+
+
+def _where(conditions):
+    return f" WHERE {' AND '.join(f'({c})' for c in conditions)}" if conditions else ""
+
+
+def _keyset_suffixes(tree, constants):
+    """(function, variable) -> [WHERE/ORDER BY/LIMIT] for queries passed to keyset_page() or sync_page()."""
+    suffixes = {}
+    for func in ast.walk(tree):
+        if not isinstance(func, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for call in ast.walk(func):
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.args
+                    and isinstance(call.args[0], ast.Name)):
+                continue
+            if call.func.id == 'keyset_page':
+                order_by, conditions_arg = call.args[1:2], call.args[2:3]
+            elif call.func.id == 'sync_page':
+                order_by, conditions_arg = call.args[1:3], call.args[3:4]
+            else:
+                continue
+            if not (order_by and all(isinstance(arg, ast.Constant) for arg in order_by)):
+                continue
+            keys = [arg.value for arg in order_by]
+
+            if conditions_arg and isinstance(conditions_arg[0], ast.Name):
+                always, optional = _condition_literals(func, conditions_arg[0].id)
+            elif conditions_arg and isinstance(conditions_arg[0], ast.List):
+                always, optional = conditions_arg[0].elts, []
+            else:
+                always, optional = [], []
+            try:
+                always = [_render(c, constants) for c in always]
+                optional = [_render(c, constants) for c in optional]
+            except _Unresolved:
+                # a filter we can't render would hide its plan; check what we can
+                optional = []
+
+            # the same paging predicates keyset_page() / sync_page() add
+            if call.func.id == 'keyset_page':
+                optional.append(f"{keys[0]} > %s")
+                descending = next((kw.value for kw in call.keywords if kw.arg == 'descending'), None)
+                orders = [keys[0]]
+                if not (descending is None or (isinstance(descending, ast.Constant) and not descending.value)):
+                    orders.append(f"{keys[0]} DESC")
+            else:
+                optional.append(f"{keys[0]} > %s OR ({keys[0]} = %s AND {keys[1]} > %s)")
+                orders = [', '.join(keys)]
+
+            variants = [always] + [always + [extra] for extra in optional]
+            # one base query can feed both helpers (driver orders: pages or delta sync)
+            suffixes.setdefault((func, call.args[0].id), []).extend(
+                f"{_where(conditions)} ORDER BY {order} LIMIT %s" for conditions in variants for order in orders
+            )
+    return suffixes
+
+
+def extract_statements():
+    trees = {}
+    for path in _source_files():
+        with open(path) as f:
+            trees[path] = ast.parse(f.read(), filename=path)
+    constants = _module_constants(trees)
+
+    statements = []
+    for path, tree in trees.items():
+        relpath = os.path.relpath(path, API_DIR)
+        suffixes = _keyset_suffixes(tree, constants)
+        suffix_for = {}
+        for (func, name), variants in suffixes.items():
+            for node in ast.walk(func):
+                if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                        and isinstance(node.targets[0], ast.Name) and node.targets[0].id == name):
+                    suffix_for[id(node.value)] = variants
+        # estimate_rows() only ever EXPLAINs its query, so a literal there is never executed
+        explain_only = {id(call.args[0]) for call in ast.walk(tree)
+                        if isinstance(call, ast.Call) and isinstance(call.func, ast.Name)
+                        and call.func.id == 'estimate_rows' and call.args}
+
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.Constant, ast.JoinedStr)):
+                continue
+            if isinstance(node, ast.Constant) and not isinstance(node.value, str):
+                continue
+            head = node.value if isinstance(node, ast.Constant) else next(
+                (v.value for v in node.values if isinstance(v, ast.Constant)), '')
+            if not SQL_START.match(head) or id(node) in explain_only:
+                continue
+            try:
+                base = _render(node, constants)
+            except _Unresolved as e:
+                statements.append(Statement(relpath, node.lineno, None, skipped=str(e)))
+                continue
+            for suffix in suffix_for.get(id(node), ['']):
+                statements.append(Statement(relpath, node.lineno, base + suffix))
+    # f-string pieces are Constants too; drop the duplicates they produce
+    # (a paged query legitimately yields several statements on one line)
+    resolved = {(s.path, s.line) for s in statements if s.sql is not None}
+    seen, unique = set(), []
+    for s in sorted(statements, key=lambda s: (s.path, s.line, s.sql is None, s.sql or '')):
+        if s.sql is None and (s.path, s.line) in resolved:
+            continue
+        if (s.path, s.line, s.sql) not in seen:
+            seen.add((s.path, s.line, s.sql))
+            unique.append(s)
+    return unique
+
+
+def _bind(sql):
+    sql = re.sub(r'LIMIT\s+%s', 'LIMIT 1', sql)
+    return sql.replace('%s', "'1'")
+
+
+def check(min_rows=1000):
+    """
+    EXPLAINs every extracted statement. A scan is only reported when the
+    optimizer expects to read at least `min_rows` rows - tiny tables are
+    scanned regardless of indexes.
+    """
+    statements = extract_statements()
+    with pool.connection() as conn, conn.cursor() as cursor:
+        for statement in statements:
+            if statement.sql is None:
+                continue
+            try:
+                cursor.execute(f"EXPLAIN {_bind(statement.sql)}")
+            except Exception as e:
+                statement.problems.append(f"EXPLAIN failed: {e}")
+                continue
+            names = [d[0] for d in cursor.description]
+            for row in cursor.fetchall():
+                plan = dict(zip(names, row))
+                kind = SCAN_TYPES.get(plan.get('type'))
+                # an unfiltered ORDER BY key LIMIT n walks the index and stops after n rows;
+                # with a WHERE the same walk may have to read most of the table
+                limited = (plan.get('type') == 'index' and ' LIMIT ' in statement.sql
+                           and not re.search(r'\bWHERE\b', statement.sql, re.I))
+                if kind and not limited and (plan.get('rows') or 0) >= min_rows:
+                    statement.problems.append(f"{kind} on {plan.get('table')} (~{plan.get('rows')} rows)")
+    return statements
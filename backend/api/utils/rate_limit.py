@@ -0,0 +1,131 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from utils.metrics import auth_rate_limited
+
+# Behind a reverse proxy every client shares the proxy's address; only trust
+# X-Forwarded-For when the proxy is ours and overwrites it
+TRUST_FORWARDED_FOR = os.getenv('auth_trust_forwarded_for', 'false').lower() in ('1', 'true', 'yes')
+
+
+class TokenBucketLimiter:
+    """
+    One token bucket per key, refilled continuously at `per_minute / 60` tokens
+    a second up to `per_minute`, so a key may burst up to its whole minute's
+    allowance. Buckets are kept in an LRU bounded by `max_keys`; a key evicted
+    while idle would have refilled by then anyway.
+    """
+
+    def __init__(self, name, per_minute, max_keys=100000):
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, key, now=None):
+        """Returns 0 if a token was taken, otherwise the seconds until one is available."""
+        if self.capacity <= 0:
+            return 0.0  # disabled
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.capacity, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed += 1
+                return 0.0
+            self.limited += 1
+            return (1 - bucket[0]) / self.rate
+
+    def refund(self, key):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.capacity, bucket[0] + 1)
+            self.allowed -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"keys": len(self._buckets), "per_minute": self.capacity,
+                    "allowed": self.allowed, "limited": self.limited}
+
+
+def _per_minute(name, default):
+    return float(os.getenv(name, default))
+
+
+# Every login or signup that gets past these costs one bcrypt round. The global
+# bucket caps that per worker whatever the spread of IPs and emails; its default
+# is roughly what auth_hash_workers threads can hash at bcrypt's default cost.
+limiters = {
+    'login_ip': TokenBucketLimiter('login_ip', _per_minute('auth_login_ip_per_minute', 20)),
+    'login_email': TokenBucketLimiter('login_email', _per_minute('auth_login_email_per_minute', 10)),
+    'signup_ip': TokenBucketLimiter('signup_ip', _per_minute('auth_signup_ip_per_minute', 10)),
+    'signup_email': TokenBucketLimiter('signup_email', _per_minute('auth_signup_email_per_minute', 5)),
+    'bcrypt': TokenBucketLimiter('bcrypt', _per_minute('auth_bcrypt_per_minute', 600)),
+}
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get('x-forwarded-for')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.client.host if request.client else 'unknown'
+
+
+def _take_all(route: str, checks):
+    taken = []
+    for limiter, key in checks:
+        wait = limiter.take(key)
+        if wait:
+            for done, done_key in taken:
+                done.refund(done_key)
+            auth_rate_limited.inc(route, limiter.name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please try again later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+        taken.append((limiter, key))
+
+
+def enforce(route: str, request: Request, email: str):
+    """
+    Takes one token from the route's per-IP and per-email buckets, or raises
+    429 with Retry-After. Nothing is consumed from either bucket when one of
+    them refuses.
+    """
+    _take_all(route, [
+        (limiters[f'{route}_ip'], client_ip(request)),
+        (limiters[f'{route}_email'], (email or '').strip().lower()),
+    ])
+
+
+def enforce_bcrypt(route: str):
+    """
+    Takes one token from the process-wide bcrypt bucket, or raises 429. Call it
+    right before hashing or verifying, so requests that never reach bcrypt
+    (unknown account, email already taken) don't spend the shared budget.
+    """
+    _take_all(route, [(limiters['bcrypt'], None)])
+
+
+def rate_limit_stats():
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import threading
+from fastapi import Request, Response
+from utils.cache import TTLCache
+
+# Invalidation only reaches the worker that handled the write, so with several
+# uvicorn workers a read served by another one can be up to read_cache_ttl old.
+# Keep it short: a few seconds still absorbs the bursts of identical menu reads.
+_cache = TTLCache(
+    maxsize=int(os.getenv('read_cache_size', 5000)),
+    ttl=float(os.getenv('read_cache_ttl', 5))
+)
+# Every kitchen has a generation number that is part of each of its cache keys.
+# Bumping it drops all of that kitchen's cached reads at once in this process;
+# the orphaned entries simply age out of the LRU.
+_generations = {}
+_lock = threading.Lock()
+
+
+def _generation(kitchen_id: int) -> int:
+    with _lock:
+        return _generations.get(kitchen_id, 0)
+
+
+def invalidate_kitchen(kitchen_id: int):
+    with _lock:
+        _generations[kitchen_id] = _generations.get(kitchen_id, 0) + 1
+
+
+def _etag(value) -> str:
+    body = json.dumps(value, default=str, separators=(',', ':')).encode()
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def cached_read(request: Request, response: Response, kitchen_id: int, key: tuple, loader):
+    """
+    Serves `loader()` for this kitchen from the read cache, loading it on a miss.
+
+    Returns the rows, or a bare 304 Response when the client's If-None-Match
+    already has the current version. Writes must call invalidate_kitchen().
+    """
+    generation = _generation(kitchen_id)
+    cache_key = (kitchen_id, generation, *key)
+    entry = _cache.get(cache_key)
+    if entry is None:
+        # a write that lands while we load bumps the generation, so this
+        # entry is stored under a key nobody will look up again
+        value = loader()
+        entry = (value, _etag(value))
+        _cache.set(cache_key, entry)
+
+    value, etag = entry
+    if _matches(request, etag):
+        return Response(status_code=304, headers={'ETag': etag})
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return value
+
+
+def read_cache_stats():
+    return _cache.stats()
@@ -0,0 +1,282 @@
+import bisect
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+
+# Other workers add and delete menu items too, so each process rebuilds its index this often
+REFRESH_SECONDS = float(os.getenv('search_refresh_seconds', 300))
+
+KITCHEN = 'kitchen'
+ITEM = 'item'
+
+# how much a hit in each field counts
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.5
+# how much each kind of match counts, relative to an exact one
+EXACT, PREFIX, FUZZY = 1.0, 0.7, 0.5
+MIN_PREFIX = 2   # shorter query words only match whole words
+MIN_FUZZY = 4    # shorter query words are not typo-corrected
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    if not text:
+        return []
+    # fold accents so "crème" finds "creme"
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+
+def _deletes(term):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _one_edit_apart(a, b):
+    """Levenshtein distance <= 1, or a single adjacent transposition."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        if a[i + 1:] == b[i + 1:]:
+            return True
+        return i + 1 < la and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+    if la > lb:
+        return a[i + 1:] == b[i:]
+    return a[i:] == b[i + 1:]
+
+
+class SearchIndex:
+    """
+    Inverted index over kitchen names and menu item names/descriptions.
+
+    Documents are keyed (KITCHEN, KitchenID) or (ITEM, ItemID). Every query
+    word must match each returned document, either exactly, as a prefix, or
+    within one typo (via a deletion neighbourhood, so typo lookup never
+    scans the vocabulary). Kitchen ratings are kept separately so a rating
+    change does not touch the postings.
+    """
+
+    def __init__(self):
+        self._docs = {}       # doc key -> dict shown in results
+        self._doc_terms = {}  # doc key -> {term: weight}
+        self._postings = {}   # term -> {doc key: weight}
+        self._terms = []      # sorted vocabulary, for prefix lookups
+        self._deleted = {}    # term with one letter removed -> {terms}
+        self.ratings = {}     # KitchenID -> AverageRating
+        self.kitchen_names = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    # ------------------- writes -------------------
+    def _add_term(self, term):
+        self._postings[term] = {}
+        bisect.insort(self._terms, term)
+        if len(term) >= MIN_FUZZY - 1:
+            for variant in _deletes(term):
+                self._deleted.setdefault(variant, set()).add(term)
+
+    def _drop_term(self, term):
+        del self._postings[term]
+        del self._terms[bisect.bisect_left(self._terms, term)]
+        if len(term) >= MIN_FUZZY - 1:
+            for variant in _deletes(term):
+                variants = self._deleted[variant]
+                variants.discard(term)
+                if not variants:
+                    del self._deleted[variant]
+
+    def _put(self, key, doc, fields):
+        self.remove(key)
+        terms = {}
+        for text, weight in fields:
+            for term in tokenize(text):
+                terms[term] = max(terms.get(term, 0), weight)
+        for term, weight in terms.items():
+            if term not in self._postings:
+                self._add_term(term)
+            self._postings[term][key] = weight
+        self._docs[key] = doc
+        self._doc_terms[key] = terms
+
+    def remove(self, key):
+        terms = self._doc_terms.pop(key, None)
+        if terms is None:
+            return
+        del self._docs[key]
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                self._drop_term(term)
+
+    def add_kitchen(self, kitchen_id, name, rating=None):
+        self.ratings[kitchen_id] = rating
+        self.kitchen_names[kitchen_id] = name
+        self._put((KITCHEN, kitchen_id), {"Type": KITCHEN, "KitchenID": kitchen_id, "Name": name},
+                  [(name, NAME_WEIGHT)])
+
+    def add_item(self, item_id, kitchen_id, name, description=None, price=None):
+        doc = {"Type": ITEM, "KitchenID": kitchen_id, "ItemID": item_id, "Name": name,
+               "Description": description, "Price": price}
+        self._put((ITEM, item_id), doc, [(name, NAME_WEIGHT), (description, DESCRIPTION_WEIGHT)])
+
+    # ------------------- reads -------------------
+    def _expand(self, word):
+        """{term: match quality} for every indexed term this query word matches."""
+        matches = {}
+        if len(word) >= MIN_PREFIX:
+            i = bisect.bisect_left(self._terms, word)
+            while i < len(self._terms) and self._terms[i].startswith(word):
+                matches[self._terms[i]] = PREFIX
+                i += 1
+        if len(word) >= MIN_FUZZY:
+            candidates = set(self._deleted.get(word, ()))
+            for variant in _deletes(word):
+                if variant in self._postings:
+                    candidates.add(variant)
+                candidates.update(self._deleted.get(variant, ()))
+            for term in candidates:
+                if term not in matches and _one_edit_apart(word, term):
+                    matches[term] = FUZZY
+        if word in self._postings:
+            matches[word] = EXACT
+        return matches
+
+    def search(self, query, limit=20, kind=None):
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+
+        scores = None
+        # rarest word first so the candidate set shrinks as fast as possible
+        expanded = sorted((self._expand(w) for w in words),
+                          key=lambda m: sum(len(self._postings[t]) for t in m))
+        for matches in expanded:
+            word_scores = {}
+            for term, quality in matches.items():
+                for key, weight in self._postings[term].items():
+                    if scores is not None and key not in scores:
+                        continue
+                    score = quality * weight
+                    if score > word_scores.get(key, 0):
+                        word_scores[key] = score
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {key: scores[key] + s for key, s in word_scores.items()}
+            if not scores:
+                return []
+
+        if kind is not None:
+            scores = {key: s for key, s in scores.items() if key[0] == kind}
+
+        # best score first, then best-rated kitchen; plain tuples compare much faster
+        # than a key function, and a common word can match most of the index
+        ratings, docs = self.ratings, self._docs
+        ranked = [(-score, -(ratings.get(docs[key]["KitchenID"]) or 0), key) for key, score in scores.items()]
+
+        results = []
+        for _, _, key in heapq.nsmallest(limit, ranked):
+            doc = docs[key]
+            results.append({
+                **doc,
+                "KitchenName": self.kitchen_names.get(doc["KitchenID"]),
+                "AverageRating": self.ratings.get(doc["KitchenID"]),
+                "Score": round(scores[key], 3),
+            })
+        return results
+
+
+class SearchService:
+    """
+    The process-wide index plus its lifecycle: built lazily from `load` on
+    first use and rebuilt every REFRESH_SECONDS. Writes that land while a
+    rebuild is reading the database are replayed onto the new index.
+
+    `load(index)` fills a fresh SearchIndex.
+    """
+
+    def __init__(self, load, refresh_seconds=REFRESH_SECONDS):
+        self._load = load
+        self.refresh_seconds = refresh_seconds
+        self._index = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._replay = None
+        self.queries = 0
+        self.reloads = 0
+
+    def _change(self, method, *args):
+        with self._lock:
+            if self._index is not None:
+                getattr(self._index, method)(*args)
+            if self._replay is not None:
+                self._replay.append((method, args))
+
+    def add_kitchen(self, kitchen_id, name, rating=None):
+        self._change('add_kitchen', kitchen_id, name, rating)
+
+    def add_item(self, item_id, kitchen_id, name, description=None, price=None):
+        self._change('add_item', item_id, kitchen_id, name, description, price)
+
+    def remove_item(self, item_id):
+        self._change('remove', (ITEM, item_id))
+
+    def remove_kitchen(self, kitchen_id):
+        self._change('remove', (KITCHEN, kitchen_id))
+
+    def _ensure_fresh(self):
+        if self._index is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        if not self._reload_lock.acquire(blocking=self._index is None):
+            return
+        try:
+            if self._index is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            with self._lock:
+                self._replay = []
+            try:
+                index = SearchIndex()
+                self._load(index)
+            except Exception:
+                with self._lock:
+                    self._replay = None
+                raise
+            with self._lock:
+                for method, args in self._replay:
+                    getattr(index, method)(*args)
+                self._replay = None
+                self._index = index
+                self._loaded_at = time.monotonic()
+                self.reloads += 1
+        finally:
+            self._reload_lock.release()
+
+    def search(self, query, limit=20, kind=None):
+        self._ensure_fresh()
+        with self._lock:
+            self.queries += 1
+            return self._index.search(query, limit, kind)
+
+    def stats(self):
+        with self._lock:
+            index = self._index
+            return {
+                "documents": len(index) if index is not None else 0,
+                "terms": len(index._postings) if index is not None else 0,
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if index is not None else None,
+                "reloads": self.reloads,
+                "queries": self.queries,
+            }
@@ -1,12 +1,71 @@
+import os
 from db import execute_query
+from utils.cache import TTLCache
+
+_role_cache = TTLCache(
+    maxsize=int(os.getenv('role_cache_size', 50000)),
+    ttl=float(os.getenv('role_cache_ttl', 60))
+)
+_NO_ROLE = 'none'
+
+# Joins every role table onto USERS so one statement yields a role per user.
+# Precedence matches the old sequential checks: admin > owner > driver > customer.
+ROLE_SELECT = """
+    CASE
+        WHEN a.AdminUID IS NOT NULL THEN 'admin'
+        WHEN o.OwnerUID IS NOT NULL THEN 'owner'
+        WHEN d.DriverUID IS NOT NULL THEN 'driver'
+        WHEN c.CustomerUID IS NOT NULL THEN 'customer'
+    END
+"""
+ROLE_JOINS = """
+    LEFT JOIN ADMINS a ON a.AdminUID = u.UID
+    LEFT JOIN KITCHENOWNERS o ON o.OwnerUID = u.UID
+    LEFT JOIN DRIVERS d ON d.DriverUID = u.UID
+    LEFT JOIN CUSTOMERS c ON c.CustomerUID = u.UID
+"""
+
+# MySQL is happy with big IN lists, but keep packets reasonable
+_BATCH_SIZE = 1000
+
+
+def prime_user_roles(roles: dict):
+    """Store already-resolved roles, e.g. from a query that joined ROLE_JOINS itself."""
+    for uid, role in roles.items():
+        _role_cache.set(uid, role or _NO_ROLE)
+
+
+def invalidate_user_role(userID: int):
+    _role_cache.pop(userID)
+
+
+# get the roles for many users at once: {uid: role or None}
+def get_user_roles(userIDs):
+    roles = {}
+    missing = []
+    for uid in dict.fromkeys(userIDs):
+        cached = _role_cache.get(uid)
+        if cached is None:
+            missing.append(uid)
+        else:
+            roles[uid] = None if cached == _NO_ROLE else cached
+
+    for start in range(0, len(missing), _BATCH_SIZE):
+        batch = missing[start:start + _BATCH_SIZE]
+        placeholders = ", ".join(["%s"] * len(batch))
+        query = f"SELECT u.UID, {ROLE_SELECT} FROM USERS u {ROLE_JOINS} WHERE u.UID IN ({placeholders})"
+        found = {uid: role for uid, role in execute_query(query, tuple(batch), fetch=True)}
+        for uid in batch:
+            roles[uid] = found.get(uid)
+        prime_user_roles({uid: found.get(uid) for uid in batch})
+
+    return roles
+
 
 # get the users role: 
 def get_user_role(userID: int):
-    if execute_query("SELECT * FROM ADMINS WHERE AdminUID = %s", (userID,), fetch=True):
-        return "admin"
-    if execute_query("SELECT * FROM KITCHENOWNERS WHERE OwnerUID = %s", (userID,), fetch=True):
-        return "owner"
-    if execute_query("SELECT * FROM DRIVERS WHERE DriverUID = %s", (userID,), fetch=True):
-        return "driver"
-    if execute_query("SELECT * FROM CUSTOMERS WHERE CustomerUID = %s", (userID,), fetch=True):
-        return "customer"
\ No newline at end of file
+    return get_user_roles([userID])[userID]
+
+
+def role_cache_stats():
+    return _role_cache.stats()
@@ -1,14 +1,35 @@
+import os
 from db import execute_query
 from fastapi import HTTPException
+from utils.cache import TTLCache
+
+# owner UID -> frozenset of the KitchenIDs they own
+_ownership_index = TTLCache(
+    maxsize=int(os.getenv('ownership_cache_size', 10000)),
+    ttl=float(os.getenv('ownership_cache_ttl', 300))
+)
+
+def get_owned_kitchens(owner_uid: int) -> frozenset:
+    kitchens = _ownership_index.get(owner_uid)
+    if kitchens is None:
+        query = "SELECT KitchenID FROM HOMEKITCHENS WHERE OwnerUID = %s"
+        kitchens = frozenset(row[0] for row in execute_query(query, (owner_uid,), fetch=True))
+        _ownership_index.set(owner_uid, kitchens)
+    return kitchens
+
+# call whenever a kitchen is created or removed for this owner
+def invalidate_owned_kitchens(owner_uid: int):
+    _ownership_index.pop(owner_uid)
+
+def ownership_cache_stats():
+    return _ownership_index.stats()
 
 # ------------------- Verify Owner Helper -------------------
-def verify_owner(user_email: str, kitchen_id: int):
-    query = """
-        SELECT * FROM HOMEKITCHENS
-        WHERE KitchenID = %s AND OwnerUID = (
-            SELECT UID FROM USERS WHERE Email = %s
-        )
-    """
-    result = execute_query(query, (kitchen_id, user_email), fetch=True)
-    if not result:
+def verify_owner(owner_uid: int, kitchen_id: int):
+    if kitchen_id in get_owned_kitchens(owner_uid):
+        return
+    # The cached set may predate a kitchen created through another worker, which
+    # only invalidates its own cache; denials are rare, so re-check before refusing
+    invalidate_owned_kitchens(owner_uid)
+    if kitchen_id not in get_owned_kitchens(owner_uid):
         raise HTTPException(status_code=403, detail="You do not own this kitchen")
@@ -0,0 +1,289 @@
+"""
+Scripted load test for the API against a MySQL seeded by bench/seed.py.
+
+By default the app is driven in-process through httpx's ASGI transport, so no
+server is needed; pass --base-url to hit a running uvicorn instead. Each worker
+repeatedly picks a scenario according to --mix until --duration runs out.
+Per-endpoint throughput and p50/p95/p99 latency are printed and written to
+bench/results/, and --compare diffs a run against an earlier results file.
+
+    python bench/loadtest.py --concurrency 50 --duration 30
+    python bench/loadtest.py --mix browse=8,order=2 --compare bench/results/baseline.json
+    python bench/loadtest.py --scenario claim-race --racers 50
+
+Scenarios: login, browse (kitchens, menu, meal plans), order (place an order),
+claim (driver lists pending orders and claims one). claim-race is a one-shot
+check that many drivers claiming one order produce exactly one winner.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+API_DIR = os.path.join(BENCH_DIR, '..', 'api')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+sys.path.insert(0, API_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import httpx
+
+from seed import BENCH_PASSWORD, load_menu, load_users
+
+
+# ------------------- Recording -------------------
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, client, label, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            response, status = None, 'error'
+        self.latencies[label].append(time.perf_counter() - started)
+        self.statuses[label][status] += 1
+        return response
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def summarize(recorder, elapsed):
+    summary = {}
+    for label, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        statuses = recorder.statuses[label]
+        summary[label] = {
+            'count': len(values),
+            'rps': len(values) / elapsed,
+            'mean_ms': 1000 * sum(values) / len(values),
+            'p50_ms': 1000 * percentile(values, 0.50),
+            'p95_ms': 1000 * percentile(values, 0.95),
+            'p99_ms': 1000 * percentile(values, 0.99),
+            # 4xx like a lost claim race are expected; only server errors count
+            'errors': sum(n for s, n in statuses.items() if s == 'error' or s >= 500),
+            'statuses': {str(s): n for s, n in statuses.items()},
+        }
+    return summary
+
+
+def print_summary(summary):
+    print(f"{'endpoint':<44}{'count':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for label, s in summary.items():
+        print(f"{label:<44}{s['count']:>8}{s['rps']:>9.1f}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['errors']:>8}")
+
+
+def compare(summary, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+    print(f"\ncompared with {baseline_path} (p95 regressions over {threshold:.0f}% are flagged)")
+    regressions = 0
+    for label, s in summary.items():
+        before = baseline.get(label)
+        if not before or not before['p95_ms']:
+            continue
+        change = 100 * (s['p95_ms'] - before['p95_ms']) / before['p95_ms']
+        flag = '  REGRESSION' if change > threshold else ''
+        regressions += bool(flag)
+        print(f"{label:<44} p95 {before['p95_ms']:8.1f} -> {s['p95_ms']:8.1f} ms ({change:+6.1f}%)"
+              f"  rps {before['rps']:8.1f} -> {s['rps']:8.1f}{flag}")
+    return regressions
+
+
+# ------------------- Scenarios -------------------
+class Context:
+    def __init__(self, client, recorder, rng):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.menu = load_menu()
+        self.kitchens = list(self.menu)
+        self.customers = load_users('customer')
+        self.drivers = load_users('driver')
+        if not (self.kitchens and self.customers and self.drivers):
+            sys.exit("No benchmark data found; run bench/seed.py first")
+        self.customer_tokens = {}
+        self.driver_tokens = {}
+
+    def _token(self, cache, users, role):
+        uid, email = self.rng.choice(users)
+        if uid not in cache:
+            # mint directly: measuring bcrypt is the login scenario's job, not every request's
+            from routers.auth import create_access_token
+            cache[uid] = create_access_token(email, role, uid, timedelta(hours=2))
+        return {'Authorization': f"Bearer {cache[uid]}"}
+
+    def customer(self):
+        return self._token(self.customer_tokens, self.customers, 'customer')
+
+    def driver(self):
+        return self._token(self.driver_tokens, self.drivers, 'driver')
+
+    async def call(self, label, method, url, **kwargs):
+        return await self.recorder.call(self.client, label, method, url, **kwargs)
+
+
+async def scenario_login(ctx):
+    _, email = ctx.rng.choice(ctx.customers)
+    await ctx.call('POST /auth/token', 'POST', '/auth/token',
+                   data={'username': email, 'password': BENCH_PASSWORD})
+
+
+async def scenario_browse(ctx):
+    headers = ctx.customer()
+    await ctx.call('GET /homekitchens/', 'GET', '/homekitchens/', params={'limit': 50}, headers=headers)
+    kitchen_id = ctx.rng.choice(ctx.kitchens)
+    await ctx.call('GET /homekitchens/{id}/menuitems', 'GET', f'/homekitchens/{kitchen_id}/menuitems', headers=headers)
+    await ctx.call('GET /homekitchens/{id}/mealplans', 'GET', f'/homekitchens/{kitchen_id}/mealplans', headers=headers)
+
+
+async def scenario_order(ctx):
+    kitchen_id = ctx.rng.choice(ctx.kitchens)
+    items = ctx.rng.sample(ctx.menu[kitchen_id], k=min(ctx.rng.randint(1, 4), len(ctx.menu[kitchen_id])))
+    return await ctx.call('POST /order/', 'POST', '/order/', headers=ctx.customer(), json={
+        'KitchenID': kitchen_id,
+        'Items': [{'ItemID': item_id, 'Quantity': ctx.rng.randint(1, 3)} for item_id in items],
+        'ETA': '01:00:00',
+        'TotalPrice': ctx.rng.randint(10, 90),
+    })
+
+
+async def scenario_claim(ctx):
+    headers = ctx.driver()
+    response = await ctx.call('GET /driver/orders', 'GET', '/driver/orders',
+                              params={'status': 'Pending', 'limit': 20}, headers=headers)
+    if response is None or response.status_code != 200 or not response.json():
+        return
+    order = ctx.rng.choice(response.json())
+    await ctx.call('POST /driver/orders/{id}/claim', 'POST', f"/driver/orders/{order['OrderID']}/claim", headers=headers)
+
+
+SCENARIOS = {
+    'login': scenario_login,
+    'browse': scenario_browse,
+    'order': scenario_order,
+    'claim': scenario_claim,
+}
+
+
+async def claim_race(ctx, racers):
+    """Places one order, then has `racers` distinct drivers claim it at the same moment."""
+    placed = await scenario_order(ctx)
+    if placed is None or placed.status_code != 201:
+        sys.exit("Could not place the order to race for")
+    order_id = placed.json()['OrderID']
+
+    drivers = ctx.rng.sample(ctx.drivers, k=min(racers, len(ctx.drivers)))
+    from routers.auth import create_access_token
+    tokens = [create_access_token(email, 'driver', uid, timedelta(minutes=5)) for uid, email in drivers]
+    responses = await asyncio.gather(*[
+        ctx.call('POST /driver/orders/{id}/claim', 'POST', f'/driver/orders/{order_id}/claim',
+                 headers={'Authorization': f'Bearer {token}'})
+        for token in tokens
+    ])
+    winners = sum(1 for r in responses if r is not None and r.status_code == 200)
+    print(f"order {order_id}: {len(tokens)} drivers raced, {winners} won")
+    return winners == 1
+
+
+# ------------------- Runner -------------------
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def worker(ctx, mix, deadline):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        await SCENARIOS[ctx.rng.choices(names, weights=weights)[0]](ctx)
+
+
+def make_client(base_url):
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=30)
+    os.chdir(API_DIR)  # main.py serves uploads/ relative to the api directory
+    from main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench', timeout=30)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    recorder = Recorder()
+    async with make_client(args.base_url) as client:
+        ctx = Context(client, recorder, random.Random(args.random_seed))
+        if args.scenario == 'claim-race':
+            return 0 if await claim_race(ctx, args.racers) else 1
+
+        mix = parse_mix(args.mix)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*[worker(ctx, mix, deadline) for _ in range(args.concurrency)])
+        elapsed = time.perf_counter() - started
+
+    summary = summarize(recorder, elapsed)
+    print_summary(summary)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    out = args.out or os.path.join(RESULTS_DIR, f"{stamp}.json")
+    with open(out, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': stamp,
+                'git': git_revision(),
+                'concurrency': args.concurrency,
+                'duration': args.duration,
+                'mix': args.mix,
+                'target': args.base_url or 'in-process',
+            },
+            'endpoints': summary,
+        }, f, indent=2)
+    print(f"\nresults written to {out}")
+
+    if args.compare:
+        return 1 if compare(summary, args.compare, args.threshold) else 0
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', help='benchmark a running server instead of the in-process app')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=20, help='seconds')
+    parser.add_argument('--mix', default='login=1,browse=6,order=2,claim=1', help='scenario=weight,...')
+    parser.add_argument('--scenario', choices=['mix', 'claim-race'], default='mix')
+    parser.add_argument('--racers', type=int, default=50, help='drivers in the claim-race scenario')
+    parser.add_argument('--out', help='results file (default: bench/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='earlier results file to diff against')
+    parser.add_argument('--threshold', type=float, default=10, help='p95 regression threshold in percent')
+    parser.add_argument('--random-seed', type=int, default=1)
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Search index benchmark: builds the in-process index over synthetic kitchens
+and menu items, then times exact, prefix, typo and multi-word queries, plus
+the cost of single-item writes against the full index.
+
+Run from backend/:
+
+    python bench/search.py [--items 100000] [--kitchens 2000] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from utils.search import SearchIndex
+
+DISHES = ['biryani', 'curry', 'dal', 'samosa', 'pakora', 'naan', 'roti', 'paneer', 'korma', 'tikka',
+          'jollof', 'suya', 'plantain', 'egusi', 'injera', 'shawarma', 'falafel', 'hummus', 'kebab',
+          'dumplings', 'noodles', 'ramen', 'pho', 'bibimbap', 'kimchi', 'tacos', 'burrito', 'tamales',
+          'lasagna', 'risotto', 'gnocchi', 'pierogi', 'goulash', 'jerk', 'oxtail', 'pupusa', 'empanada']
+STYLES = ['chicken', 'lamb', 'goat', 'beef', 'veg', 'fish', 'prawn', 'tofu', 'spicy', 'smoky', 'crispy',
+          'creamy', 'homestyle', 'grandma', 'street', 'festive', 'classic', 'fiery', 'mild', 'garlic']
+WORDS = ['slow', 'cooked', 'with', 'fresh', 'herbs', 'served', 'rice', 'bread', 'sauce', 'yogurt',
+         'chutney', 'pickled', 'onions', 'roasted', 'peppers', 'tomato', 'coconut', 'ginger', 'lime']
+
+
+def build(items, kitchens, rng):
+    index = SearchIndex()
+    start = time.perf_counter()
+    for k in range(1, kitchens + 1):
+        index.add_kitchen(k, f"{rng.choice(STYLES).title()} {rng.choice(DISHES).title()} Kitchen {k}",
+                          round(rng.uniform(2.5, 5.0), 1))
+    for i in range(1, items + 1):
+        name = f"{rng.choice(STYLES)} {rng.choice(DISHES)}"
+        description = ' '.join(rng.choice(WORDS) for _ in range(8))
+        index.add_item(i, rng.randint(1, kitchens), name, description, round(rng.uniform(5, 30), 2))
+    return index, time.perf_counter() - start
+
+
+def typo(word, rng):
+    i = rng.randrange(len(word))
+    return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + rng.choice('aeiou') + word[i + 1:]
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def run(name, index, queries):
+    samples, hits = [], 0
+    for q in queries:
+        start = time.perf_counter()
+        hits += len(index.search(q, 20))
+        samples.append(time.perf_counter() - start)
+    print(f"{name:<10} n={len(queries):<6} p50={percentile(samples, 0.5) * 1000:7.3f} ms"
+          f"  p95={percentile(samples, 0.95) * 1000:7.3f} ms  p99={percentile(samples, 0.99) * 1000:7.3f} ms"
+          f"  avg hits={hits / len(queries):5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100000)
+    parser.add_argument('--kitchens', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index, seconds = build(args.items, args.kitchens, rng)
+    print(f"built      docs={len(index)} terms={len(index._postings)} in {seconds:.2f} s")
+
+    n = args.queries
+    run('exact', index, [rng.choice(DISHES) for _ in range(n)])
+    run('prefix', index, [rng.choice(DISHES)[:3] for _ in range(n)])
+    run('typo', index, [typo(rng.choice([d for d in DISHES if len(d) >= 5]), rng) for _ in range(n)])
+    run('two-word', index, [f"{rng.choice(STYLES)} {rng.choice(DISHES)}" for _ in range(n)])
+
+    start = time.perf_counter()
+    for i in range(args.items + 1, args.items + 1 + n):
+        index.add_item(i, 1, f"{rng.choice(STYLES)} {rng.choice(DISHES)}", 'fresh herbs', 9.99)
+        index.remove(('item', i))
+    print(f"write      add+remove p_avg={(time.perf_counter() - start) / n * 1000:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
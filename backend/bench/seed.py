@@ -0,0 +1,167 @@
+"""
+Seeds a MySQL database with benchmark data through the app's own db module.
+
+All seeded users have emails ending in @bench.example and share one password
+(BENCH_PASSWORD), so seeding does a single bcrypt hash no matter how many
+users it creates. Re-running with the same sizes is a no-op.
+
+    python bench/seed.py --customers 5000 --drivers 200 --kitchens 300 --items 25 --orders 20000
+    python bench/seed.py --reset   # remove everything seeded here
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from db import execute_query, transaction
+from deps import bcrypt_context
+
+BENCH_DOMAIN = '@bench.example'
+BENCH_PASSWORD = 'bench-password'
+BATCH = 1000
+
+
+def _chunks(rows, size=BATCH):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _insert_many(query, rows):
+    for chunk in _chunks(rows):
+        with transaction() as cursor:
+            cursor.executemany(query, chunk)
+
+
+def _bench_uids(prefix):
+    rows = execute_query("SELECT UID FROM USERS WHERE Email LIKE %s ORDER BY UID", (f"{prefix}%{BENCH_DOMAIN}",), fetch=True)
+    return [row[0] for row in rows]
+
+
+def _create_users(prefix, count, hashed):
+    existing = len(_bench_uids(prefix))
+    rows = [
+        ('Bench', f"{prefix.title()} {i}", f"{prefix}{i}{BENCH_DOMAIN}", f"555{i:07d}", hashed)
+        for i in range(existing, count)
+    ]
+    _insert_many("INSERT INTO USERS (FirstName, LastName, Email, PhoneNo, HashedPassword) VALUES (%s, %s, %s, %s, %s)", rows)
+    return _bench_uids(prefix)[:count], len(rows)
+
+
+def seed(customers, drivers, kitchens, items, orders, rng):
+    started = time.perf_counter()
+    hashed = bcrypt_context.hash(BENCH_PASSWORD)
+
+    customer_uids, new = _create_users('customer', customers, hashed)
+    if new:
+        _insert_many("INSERT INTO CUSTOMERS (CustomerUID) VALUES (%s)", [(uid,) for uid in customer_uids[-new:]])
+        _insert_many("INSERT INTO CUSTOMERADDRESSES (CustomerUID, Address) VALUES (%s, %s)",
+                     [(uid, f"{uid} Bench Avenue") for uid in customer_uids[-new:]])
+
+    driver_uids, new = _create_users('driver', drivers, hashed)
+    if new:
+        _insert_many("INSERT INTO DRIVERS (DriverUID, ApprovalStatus) VALUES (%s, 'approved')", [(uid,) for uid in driver_uids[-new:]])
+
+    owner_uids, new = _create_users('owner', kitchens, hashed)
+    if new:
+        new_owners = owner_uids[-new:]
+        _insert_many("INSERT INTO KITCHENOWNERS (OwnerUID) VALUES (%s)", [(uid,) for uid in new_owners])
+        _insert_many(
+            "INSERT INTO HOMEKITCHENS (OwnerUID, Name, Address, AverageRating, ApprovalStatus) VALUES (%s, %s, %s, %s, 'approved')",
+            [(uid, f"Bench Kitchen {uid}", f"{uid} Bench Road", round(rng.uniform(3, 5), 1)) for uid in new_owners]
+        )
+        kitchen_ids = [row[0] for row in execute_query(
+            f"SELECT KitchenID FROM HOMEKITCHENS WHERE OwnerUID IN ({', '.join(['%s'] * len(new_owners))})",
+            tuple(new_owners), fetch=True)]
+        _insert_many(
+            "INSERT INTO MENUITEMS (KitchenID, Name, Description, Price, Image) VALUES (%s, %s, %s, %s, %s)",
+            [(kid, f"Dish {n}", f"Bench dish {n} from kitchen {kid}", round(rng.uniform(5, 30), 2), f"/uploads/item{n % 13 + 1}.png")
+             for kid in kitchen_ids for n in range(items)]
+        )
+
+    menu = load_menu()
+    existing_orders = execute_query(
+        "SELECT COUNT(*) FROM ORDERS WHERE CustomerUID IN (SELECT UID FROM USERS WHERE Email LIKE %s)",
+        (f"%{BENCH_DOMAIN}",), fetch=True)[0][0]
+    kitchen_ids = list(menu)
+    for chunk in _chunks(range(existing_orders, orders)):
+        with transaction() as cursor:
+            for _ in chunk:
+                kid = rng.choice(kitchen_ids)
+                picked = rng.sample(menu[kid], k=min(3, len(menu[kid])))
+                cursor.execute(
+                    "INSERT INTO ORDERS (TotalPrice, ETA, CustomerUID, KitchenID, Status) VALUES (%s, %s, %s, %s, %s)",
+                    (rng.randint(10, 90), '01:00:00', rng.choice(customer_uids), kid,
+                     rng.choices(['Pending', 'Claimed', 'Completed'], weights=[1, 1, 8])[0])
+                )
+                order_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO ORDERCONTAINS (OrderID, KitchenID, ItemID, Quantity) VALUES (%s, %s, %s, %s)",
+                    [(order_id, kid, item_id, rng.randint(1, 3)) for item_id in picked]
+                )
+
+    print(f"seeded in {time.perf_counter() - started:.1f}s: {len(customer_uids)} customers, {len(driver_uids)} drivers, "
+          f"{len(kitchen_ids)} kitchens, {sum(len(v) for v in menu.values())} menu items, {max(orders, existing_orders)} orders")
+
+
+def load_menu():
+    """{KitchenID: [ItemID, ...]} for every seeded kitchen."""
+    rows = execute_query(
+        """
+        SELECT m.KitchenID, m.ItemID FROM MENUITEMS m
+        JOIN HOMEKITCHENS k ON k.KitchenID = m.KitchenID
+        JOIN USERS u ON u.UID = k.OwnerUID
+        WHERE u.Email LIKE %s
+        """, (f"%{BENCH_DOMAIN}",), fetch=True)
+    menu = {}
+    for kitchen_id, item_id in rows:
+        menu.setdefault(kitchen_id, []).append(item_id)
+    return menu
+
+
+def load_users(prefix):
+    """[(UID, Email), ...] for seeded users of one kind: 'customer', 'driver' or 'owner'."""
+    rows = execute_query("SELECT UID, Email FROM USERS WHERE Email LIKE %s ORDER BY UID", (f"{prefix}%{BENCH_DOMAIN}",), fetch=True)
+    return [tuple(row) for row in rows]
+
+
+def reset():
+    like = (f"%{BENCH_DOMAIN}",)
+    users = "SELECT UID FROM USERS WHERE Email LIKE %s"
+    kitchens = f"SELECT KitchenID FROM HOMEKITCHENS WHERE OwnerUID IN ({users})"
+    with transaction() as cursor:
+        # MySQL will not let a DELETE read the table it deletes from, hence the derived tables
+        cursor.execute(f"DELETE FROM ORDERCONTAINS WHERE KitchenID IN (SELECT * FROM ({kitchens}) k)", like)
+        cursor.execute(f"DELETE FROM ORDERS WHERE KitchenID IN (SELECT * FROM ({kitchens}) k)", like)
+        cursor.execute(f"DELETE FROM MEALPLANITEMS WHERE KitchenID IN (SELECT * FROM ({kitchens}) k)", like)
+        cursor.execute(f"DELETE FROM MEALPLANS WHERE KitchenID IN (SELECT * FROM ({kitchens}) k)", like)
+        cursor.execute(f"DELETE FROM MENUITEMS WHERE KitchenID IN (SELECT * FROM ({kitchens}) k)", like)
+        cursor.execute(f"DELETE FROM HOMEKITCHENS WHERE OwnerUID IN (SELECT * FROM ({users}) u)", like)
+        for table, column in (('CUSTOMERADDRESSES', 'CustomerUID'), ('CUSTOMERS', 'CustomerUID'),
+                              ('DRIVERS', 'DriverUID'), ('KITCHENOWNERS', 'OwnerUID')):
+            cursor.execute(f"DELETE FROM {table} WHERE {column} IN (SELECT * FROM ({users}) u)", like)
+        cursor.execute("DELETE FROM USERS WHERE Email LIKE %s", like)
+    print("removed benchmark data")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--customers', type=int, default=2000)
+    parser.add_argument('--drivers', type=int, default=100)
+    parser.add_argument('--kitchens', type=int, default=200)
+    parser.add_argument('--items', type=int, default=20, help='menu items per kitchen')
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--random-seed', type=int, default=1)
+    parser.add_argument('--reset', action='store_true')
+    args = parser.parse_args()
+
+    if args.reset:
+        reset()
+    else:
+        seed(args.customers, args.drivers, args.kitchens, args.items, args.orders, random.Random(args.random_seed))
+
+
+if __name__ == '__main__':
+    main()
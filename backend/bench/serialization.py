@@ -0,0 +1,72 @@
+"""
+Serialization benchmark: raw `SELECT *` tuples through jsonable_encoder +
+JSONResponse (how list endpoints used to respond) versus projected dicts
+through a response model + ORJSONResponse (how they respond now).
+
+Run from backend/:
+
+    python bench/serialization.py [--rows 10000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from routers.homekitchen import HomeKitchenOut
+from routers.order import OrderOut
+from utils.projection import as_dicts
+
+
+def kitchen_rows(n):
+    return tuple(
+        (i, 1000 + i % 50, f"Kitchen {i}", f"{i} Main Street", Decimal('4.5'), None, 'approved', f"/uploads/kitchen{i}.png")
+        for i in range(1, n + 1)
+    )
+
+
+def order_rows(n):
+    return tuple(
+        (i, Decimal('24.99'), 2000 + i % 500, 1 + i % 50, None, timedelta(hours=1, minutes=i % 60), 'Pending')
+        for i in range(1, n + 1)
+    )
+
+
+def old_path(rows):
+    return JSONResponse(content=jsonable_encoder(rows)).body
+
+
+def new_path(adapter, model, rows):
+    # what FastAPI does for a route with response_model: validate, dump to JSON types, render
+    validated = adapter.validate_python(as_dicts(model, rows))
+    return ORJSONResponse(content=adapter.dump_python(validated, mode='json')).body
+
+
+def run(name, model, rows, repeat):
+    adapter = TypeAdapter(List[model])
+    old = min(timeit.repeat(lambda: old_path(rows), number=1, repeat=repeat))
+    new = min(timeit.repeat(lambda: new_path(adapter, model, rows), number=1, repeat=repeat))
+    print(f"{name:<10} rows={len(rows):<7} before={old * 1000:8.1f} ms ({len(old_path(rows)):>9} B)"
+          f"  after={new * 1000:8.1f} ms ({len(new_path(adapter, model, rows)):>9} B)  speedup={old / new:4.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    run('kitchens', HomeKitchenOut, kitchen_rows(args.rows), args.repeat)
+    run('orders', OrderOut, order_rows(args.rows), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -88,9 +88,9 @@ export default function AccountPage() {
                     <li
                       key={i}
                       className="text-gray-600 hover:text-green-600 cursor-pointer"
-                      onClick={() => router.push(`/restaurants/${k[0]}`)}
+                      onClick={() => router.push(`/restaurants/${k.KitchenID}`)}
                     >
-                      {k[2] /* assuming column 1 is kitchen name */}
+                      {k.Name}
                     </li>
                   ))}
                 </ul>
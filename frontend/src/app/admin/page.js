@@ -31,21 +31,31 @@ export default function Page() {
       });
   }, []);
 
-  const loadDashboard = async (token) => {
-    const [driversRes, kitchensRes, usersRes] = await Promise.all([
-      fetch(process.env.NEXT_PUBLIC_API_URL + "/admin/pending-drivers", {
-        headers: { Authorization: `Bearer ${token}` },
-      }),
-      fetch(process.env.NEXT_PUBLIC_API_URL + "/admin/pending-kitchens", {
+  // these lists are paginated; follow X-Next-After until the last page
+  const fetchAll = async (path, token) => {
+    let rows = [];
+    let after = null;
+    do {
+      const params = new URLSearchParams({ limit: "500" });
+      if (after !== null) params.set("after", after);
+      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}${path}?${params}`, {
         headers: { Authorization: `Bearer ${token}` },
-      }),
-      fetch(process.env.NEXT_PUBLIC_API_URL + "/admin/all-users", {
-        headers: { Authorization: `Bearer ${token}` },
-      }),
+      });
+      rows = [...rows, ...(await res.json())];
+      after = res.headers.get("X-Next-After");
+    } while (after);
+    return rows;
+  };
+
+  const loadDashboard = async (token) => {
+    const [driversList, kitchensList, usersList] = await Promise.all([
+      fetchAll("/admin/pending-drivers", token),
+      fetchAll("/admin/pending-kitchens", token),
+      fetchAll("/admin/all-users", token),
     ]);
-    setDrivers(await driversRes.json());
-    setKitchens(await kitchensRes.json());
-    setUsers(await usersRes.json());
+    setDrivers(driversList);
+    setKitchens(kitchensList);
+    setUsers(usersList);
     setLoading(false);
   };
 
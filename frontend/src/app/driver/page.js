@@ -8,6 +8,7 @@ export default function DriverDashboard() {
   const [token, setToken] = useState("");
   const [tab, setTab] = useState("claimed"); // default: active orders
   const [orders, setOrders] = useState([]);
+  const [nextAfter, setNextAfter] = useState(null); // X-Next-After of the last page, null when there is no more
   const [loading, setLoading] = useState(true);
 
   const tabs = [
@@ -40,16 +41,20 @@ export default function DriverDashboard() {
     if (token) fetchOrders(tab, token);
   }, [tab]);
 
-  const fetchOrders = async (status, token) => {
-    setLoading(true);
+  // pass `after` to append the next page instead of starting over
+  const fetchOrders = async (status, token, after = null) => {
+    if (after === null) setLoading(true);
+    const params = new URLSearchParams({ status: status[0].toUpperCase() + status.slice(1) });
+    if (after !== null) params.set("after", after);
     const res = await fetch(
-      `${process.env.NEXT_PUBLIC_API_URL}/driver/orders?status=${status[0].toUpperCase() + status.slice(1)}`,
+      `${process.env.NEXT_PUBLIC_API_URL}/driver/orders?${params}`,
       {
         headers: { Authorization: `Bearer ${token}` },
       }
     );
     const data = await res.json();
-    setOrders(data);
+    setOrders(prev => (after === null ? data : [...prev, ...data]));
+    setNextAfter(res.headers.get("X-Next-After"));
     setLoading(false);
   };
 
@@ -145,6 +150,15 @@ export default function DriverDashboard() {
           ))}
         </ul>
       )}
+
+      {!loading && nextAfter && (
+        <button
+          onClick={() => fetchOrders(tab, token, nextAfter)}
+          className="mt-6 px-4 py-2 bg-gray-200 text-gray-700 rounded hover:bg-gray-300"
+        >
+          Load more
+        </button>
+      )}
     </div>
   );
 }
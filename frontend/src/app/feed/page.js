@@ -42,32 +42,38 @@ export default function RestaurantFeed() {
         }
       });
 
-    // 2) Fetch all kitchens
-    fetch(`${process.env.NEXT_PUBLIC_API_URL}/homekitchens/`, {
-      headers: { Authorization: `Bearer ${token}` },
-    })
-      .then(async res => {
-        if (res.status === 401) {
-          router.replace("/login");
-          throw new Error("unauth");
-        }
-        if (!res.ok) {
-          const err = await res.json();
-          throw new Error(err.detail || "Failed to load home kitchens");
-        }
-        return res.json();
-      })
+    // 2) Fetch all kitchens, following X-Next-After until the last page
+    const fetchKitchens = async (after = null, all = []) => {
+      const params = new URLSearchParams({ limit: "500" });
+      if (after !== null) params.set("after", after);
+      const res = await fetch(`${process.env.NEXT_PUBLIC_API_URL}/homekitchens/?${params}`, {
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      if (res.status === 401) {
+        router.replace("/login");
+        throw new Error("unauth");
+      }
+      if (!res.ok) {
+        const err = await res.json();
+        throw new Error(err.detail || "Failed to load home kitchens");
+      }
+      const page = [...all, ...(await res.json())];
+      const next = res.headers.get("X-Next-After");
+      return next ? fetchKitchens(next, page) : page;
+    };
+
+    fetchKitchens()
       .then(data => {
         setKitchens(
           data.map(row => ({
-            id:             row[0],
-            ownerUID:       row[1],
-            name:           row[2],
-            address:        row[3],
-            averageRating:  row[4],
-            verifiedBy:     row[5],
-            approvalStatus: row[6],
-            logo:           row[7],
+            id:             row.KitchenID,
+            ownerUID:       row.OwnerUID,
+            name:           row.Name,
+            address:        row.Address,
+            averageRating:  row.AverageRating,
+            verifiedBy:     row.VerifiedBy,
+            approvalStatus: row.ApprovalStatus,
+            logo:           row.Logo,
           }))
         );
       })
@@ -41,7 +41,7 @@ export default function KitchenPage() {
       return;
     }
 
-    // fetch /me and list of kitchens to find this one
+    // fetch /me and this kitchen
     Promise.all([
       fetch(`${API}/me/`, { headers: { Authorization: `Bearer ${token}` } })
         .then(res => {
@@ -49,23 +49,24 @@ export default function KitchenPage() {
           return res.json();
         })
         .then(u => ({ uid: u.UID, role: u.Role })),
-      fetch(`${API}/homekitchens/`, { headers: { Authorization: `Bearer ${token}` } })
-        .then(res => res.json())
+      fetch(`${API}/homekitchens/${kitchenId}`, { headers: { Authorization: `Bearer ${token}` } })
+        .then(res => {
+          if (res.status === 401) throw new Error("unauth");
+          if (res.status === 404) throw new Error("Kitchen not found");
+          return res.json();
+        })
     ])
-      .then(([u, list]) => {
+      .then(([u, r]) => {
         setUser(u);
-        const found = list
-          .map(r => ({
-            id:             r[0],
-            ownerUID:       r[1],
-            name:           r[2],
-            address:        r[3],
-            averageRating:  r[4],
-            approvalStatus: r[6],
-            logo:           r[7],
-          }))
-          .find(k => k.id === Number(kitchenId));
-        if (!found) throw new Error("Kitchen not found");
+        const found = {
+          id:             r.KitchenID,
+          ownerUID:       r.OwnerUID,
+          name:           r.Name,
+          address:        r.Address,
+          averageRating:  r.AverageRating,
+          approvalStatus: r.ApprovalStatus,
+          logo:           r.Logo,
+        };
         setKitchen(found);
         return { token, kitchenId };
       })
@@ -105,7 +106,7 @@ export default function KitchenPage() {
     if (activeTab !== "meal") return;
     const token = localStorage.getItem("access_token");
     mealPlans.forEach(plan => {
-      const planId = plan[0];
+      const planId = plan.MealPlanID;
       if (planItems[planId] !== undefined) return;
       fetch(`${API}/homekitchens/${kitchenId}/${planId}/items`, {
         headers: { Authorization: `Bearer ${token}` }
@@ -169,15 +170,15 @@ export default function KitchenPage() {
   // Customer: add menu item to cart
   const addToCart = item => {
     const cart = JSON.parse(localStorage.getItem("cart") || "[]");
-    const idx  = cart.findIndex(ci => ci.ItemID === item[0]);
+    const idx  = cart.findIndex(ci => ci.ItemID === item.ItemID);
     if (idx > -1) cart[idx].quantity++;
     else cart.push({
-      ItemID:   item[0],
+      ItemID:   item.ItemID,
       KitchenID: kitchenId,
       Kitchen:  kitchen.name,
-      name:     item[2],
-      price:    item[4],
-      image:    item[5],
+      name:     item.Name,
+      price:    item.Price,
+      image:    item.Image,
       quantity: 1
     });
     localStorage.setItem("cart", JSON.stringify(cart));
@@ -188,13 +189,13 @@ export default function KitchenPage() {
   const closeModal = ()       => setShowModal(false);
 
   const subscribePlan = async () => {
-    const plan = mealPlans.find(p => p[0] === modalPlanId);
+    const plan = mealPlans.find(p => p.MealPlanID === modalPlanId);
     const ETA  = new Date().toTimeString().split(" ")[0];
     const payload = {
       KitchenID:  Number(kitchenId),
-      Items:      (planItems[modalPlanId] || []).map(item => ({ ItemID: item[0], Quantity: selectedQty })),
+      Items:      (planItems[modalPlanId] || []).map(item => ({ ItemID: item.ItemID, Quantity: selectedQty })),
       ETA,
-      TotalPrice: plan[3] * selectedQty
+      TotalPrice: plan.TotalPrice * selectedQty
     };
     const res = await fetch(`${API}/order/`, {
       method:  "POST",
@@ -247,14 +248,14 @@ export default function KitchenPage() {
               ) : (
                 <ul className="space-y-2">
                   {menuItems.map(mi => (
-                    <li key={mi[0]} className="flex items-center space-x-4 border p-2 rounded">
-                      <span className="font-mono text-sm text-gray-500">#{mi[0]}</span>
-                      <img src={mi[5]} alt={mi[2]} className="w-12 h-12 object-cover rounded" />
+                    <li key={mi.ItemID} className="flex items-center space-x-4 border p-2 rounded">
+                      <span className="font-mono text-sm text-gray-500">#{mi.ItemID}</span>
+                      <img src={mi.Image} alt={mi.Name} className="w-12 h-12 object-cover rounded" />
                       <div className="flex-1">
-                        <h3 className="font-semibold">{mi[2]}</h3>
-                        <p className="text-sm text-gray-600">{mi[3]}</p>
+                        <h3 className="font-semibold">{mi.Name}</h3>
+                        <p className="text-sm text-gray-600">{mi.Description}</p>
                       </div>
-                      <span className="font-semibold text-green-600">${mi[4]}</span>
+                      <span className="font-semibold text-green-600">${mi.Price}</span>
                     </li>
                   ))}
                 </ul>
@@ -370,13 +371,13 @@ export default function KitchenPage() {
             <div className="p-4 space-y-4">
               {activeTab === "menu"
                 ? menuItems.map(item => (
-                    <div key={item[0]} className="flex items-center justify-between space-x-4">
+                    <div key={item.ItemID} className="flex items-center justify-between space-x-4">
                       <div className="flex items-center space-x-4">
-                        <img src={item[5]} alt={item[2]} className="w-16 h-16 object-cover rounded" />
+                        <img src={item.Image} alt={item.Name} className="w-16 h-16 object-cover rounded" />
                         <div>
-                          <h3 className="font-semibold text-black">{item[2]}</h3>
-                          <p className="text-sm text-gray-600">{item[3]}</p>
-                          <p className="text-green-600 font-semibold">${item[4]}</p>
+                          <h3 className="font-semibold text-black">{item.Name}</h3>
+                          <p className="text-sm text-gray-600">{item.Description}</p>
+                          <p className="text-green-600 font-semibold">${item.Price}</p>
                         </div>
                       </div>
                       <button
@@ -391,10 +392,10 @@ export default function KitchenPage() {
                     </div>
                   ))
                 : mealPlans.map(plan => {
-                    const planId   = plan[0];
-                    const name     = plan[2];
-                    const price    = plan[3];
-                    const imageUrl = plan[4];
+                    const planId   = plan.MealPlanID;
+                    const name     = plan.Name;
+                    const price    = plan.TotalPrice;
+                    const imageUrl = plan.Image;
 
                     return (
                       <div key={planId} className="border p-4 rounded space-y-2">
@@ -410,8 +411,8 @@ export default function KitchenPage() {
                           {planItems[planId] ? (
                             <ul className="list-disc list-inside space-y-1">
                               {planItems[planId].map(item => (
-                                <li key={item[0]}>
-                                  <strong>{item[2]}</strong> — {item[3]}
+                                <li key={item.ItemID}>
+                                  <strong>{item.Name}</strong> — {item.Description}
                                 </li>
                               ))}
                             </ul>
@@ -437,8 +438,8 @@ export default function KitchenPage() {
             <h2 className="text-xl font-bold">Subscribe to Plan</h2>
             <ul className="list-disc pl-5 max-h-40 overflow-auto">
               {planItems[modalPlanId]?.map(item => (
-                <li key={item[0]}>
-                  <strong>{item[2]}</strong> — {item[3]} (${item[4].toFixed(2)})
+                <li key={item.ItemID}>
+                  <strong>{item.Name}</strong> — {item.Description} (${item.Price.toFixed(2)})
                 </li>
               )) || <p>Loading…</p>}
             </ul>
@@ -448,7 +449,7 @@ export default function KitchenPage() {
                 {[4,5,6].map(n => <option key={n} value={n}>{n}</option>)}
               </select>
             </div>
-            <p>Total: ${(mealPlans.find(p=>p[0]===modalPlanId)[3] * (selectedQty/5)).toFixed(2)}</p>
+            <p>Total: ${(mealPlans.find(p=>p.MealPlanID===modalPlanId).TotalPrice * (selectedQty/5)).toFixed(2)}</p>
             <div className="flex justify-end space-x-2">
               <button onClick={closeModal} className="px-4 py-2 bg-gray-200 rounded hover:scale-110 hover:ring-2 hover:ring-green-500 hover:ring-offset-1">Cancel</button>
               <button onClick={subscribePlan} className="px-4 py-2 bg-green-600 text-white rounded hover:scale-110 hover:ring-2 hover:ring-green-500 hover:ring-offset-1">Select This Plan</button>